@@ -1,16 +1,59 @@
+import importlib
 import os
 
 import click
-from src.commands.models import models
-from src.commands.shell import shell
-from src.commands.transcribe import transcribe
 
 MODELS_DIR = os.environ.get(
     "WSCRIBE_MODELS_DIR", os.path.expanduser("~/.cache/huggingface/hub")
 )
 
+# Command name -> "module:attribute", imported only when the command is used
+COMMANDS = {
+    "bench": "src.commands.bench:bench",
+    "clips": "src.commands.clips:clips",
+    "convert": "src.commands.convert:convert",
+    "edit": "src.commands.edit:edit",
+    "export": "src.commands.export:export",
+    "index": "src.commands.archive:index",
+    "models": "src.commands.models:models",
+    "peaks": "src.commands.peaks:peaks",
+    "preview": "src.commands.preview:preview",
+    "search": "src.commands.archive:search",
+    "serve-editor": "src.commands.serve:serve_editor",
+    "shell": "src.commands.shell:shell",
+    "spectrogram": "src.commands.spectrogram:spectrogram",
+    "status": "src.commands.batch:status",
+    "transcribe": "src.commands.transcribe:transcribe",
+    "transcribe-batch": "src.commands.batch:transcribe_batch",
+    "tune": "src.commands.tune:tune",
+    "watch": "src.commands.watch:watch",
+}
 
-@click.group(context_settings={"help_option_names": ["-h", "--help"]})
+
+class LazyGroup(click.Group):
+    """Click group that imports each command's module on first use"""
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[cmd_name].split(":")
+            self.add_command(
+                getattr(importlib.import_module(module_name), attr), cmd_name
+            )
+        return super().get_command(ctx, cmd_name)
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_commands=COMMANDS,
+    context_settings={"help_option_names": ["-h", "--help"]},
+)
 def cli():
     """🛫🎙️ AeroLex CLI: Making Airwaves Understandable
 
@@ -19,10 +62,5 @@ def cli():
     os.makedirs(MODELS_DIR, exist_ok=True)
 
 
-# Add commands
-cli.add_command(models)
-cli.add_command(transcribe)
-cli.add_command(shell)
-
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+import time
+from dataclasses import asdict
+
+import click
+
+from ..core.archive import (
+    ARCHIVE_DB,
+    TranscriptArchive,
+    list_archive_files,
+)
+from ..core.formatters import format_timestamp, parse_time
+from ..core.readers import READERS
+
+db_option = click.option(
+    "--db",
+    "db_path",
+    type=click.Path(dir_okay=False),
+    default=ARCHIVE_DB,
+    show_default=True,
+    help="Archive database (or set WSCRIBE_ARCHIVE_DB)",
+)
+
+
+def parse_time_ms(value: str) -> int:
+    """HH:MM:SS.mmm or plain seconds to milliseconds"""
+    return round(parse_time(value) * 1000)
+
+
+@click.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@db_option
+@click.option(
+    "--from",
+    "input_format",
+    type=click.Choice(sorted(READERS)),
+    default=None,
+    help="Input format (default: from each file's extension)",
+)
+@click.option("--force", is_flag=True, help="Re-index files even if unchanged")
+def index(paths, db_path, input_format, force):
+    """Add transcripts to the searchable archive
+
+    PATHS are transcript files (json, jsonl, lbs, tsv, alx, and the LLM
+    analysis JSON) or directories of them. Only new and changed files are
+    read; files deleted from an indexed directory are dropped.
+    """
+    start_time = time.perf_counter()
+    indexed = skipped = failed = segments = removed = 0
+    with TranscriptArchive(db_path) as archive:
+        for path in list_archive_files(paths):
+            if not force and archive.is_current(path):
+                skipped += 1
+                continue
+            try:
+                segments += archive.ingest(path, input_format)
+                indexed += 1
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                failed += 1
+                click.echo(f"Skipping {path}: {str(e)}", err=True)
+        for path in paths:
+            if os.path.isdir(path):
+                removed += archive.remove_missing(path)
+        total_files, total_segments = archive.stats()
+
+    click.echo(
+        f"Indexed {indexed} files ({segments} segments), {skipped} unchanged, "
+        f"{failed} unreadable, {removed} removed in "
+        f"{time.perf_counter() - start_time:.1f}s"
+    )
+    click.echo(f"Archive {db_path}: {total_files} files, {total_segments} segments")
+
+
+@click.command()
+@click.argument("query", nargs=-1)
+@db_option
+@click.option("--speaker", default=None, help="Only this speaker, e.g. DAL209")
+@click.option("--listener", default=None, help="Only this listener")
+@click.option(
+    "--file", "path", default=None, help="Only files whose path contains this"
+)
+@click.option(
+    "--start",
+    "start",
+    default=None,
+    help="Only segments ending after this time (HH:MM:SS.mmm or seconds)",
+)
+@click.option(
+    "--end",
+    "end",
+    default=None,
+    help="Only segments starting before this time (HH:MM:SS.mmm or seconds)",
+)
+@click.option("-n", "--limit", type=int, default=50, show_default=True)
+@click.option(
+    "--raw", is_flag=True, help="Pass QUERY to FTS5 as is (phrases, OR, NEAR, x*)"
+)
+@click.option("--json", "as_json", is_flag=True, help="Print hits as JSON lines")
+def search(query, db_path, speaker, listener, path, start, end, limit, raw, as_json):
+    """Search the transcript archive
+
+    QUERY words must all appear in a segment's text (or its standardized
+    PUNE text), e.g. 'search delta 209'. Hit times are in milliseconds.
+    """
+    if not os.path.exists(db_path):
+        click.echo(f"Error: No archive at {db_path}; run 'index' first", err=True)
+        raise click.Abort()
+    try:
+        start_ms = parse_time_ms(start) if start else None
+        end_ms = parse_time_ms(end) if end else None
+    except ValueError:
+        click.echo("Error: Times must be HH:MM:SS.mmm or seconds", err=True)
+        raise click.Abort()
+
+    with TranscriptArchive(db_path) as archive:
+        try:
+            hits = archive.search(
+                " ".join(query),
+                speaker=speaker,
+                listener=listener,
+                path=path,
+                start_ms=start_ms,
+                end_ms=end_ms,
+                limit=limit,
+                raw=raw,
+            )
+        except sqlite3.OperationalError as e:
+            click.echo(f"Error: Invalid query: {str(e)}", err=True)
+            raise click.Abort()
+
+    for hit in hits:
+        if as_json:
+            click.echo(json.dumps(asdict(hit), ensure_ascii=False))
+            continue
+        parties = f"{hit.speaker or '?'} → {hit.listener or '?'}"
+        click.echo(
+            f"{hit.path}  {hit.start_ms}-{hit.end_ms}ms "
+            f"({format_timestamp(hit.start_ms / 1000)})  {parties}"
+        )
+        click.echo(f"    {hit.snippet}")
+    if not as_json:
+        click.echo(f"\n{len(hits)} hits")
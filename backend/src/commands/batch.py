@@ -0,0 +1,258 @@
+import os
+import time
+from datetime import datetime
+
+import click
+
+from ..core.formatters import WRITERS
+from ..core.leases import SharedManifest, collect_status, run_worker
+from ..core.models import SUPPORTED_MODELS, get_model_snapshot
+from ..core.prefetch import prefetch_model
+from ..core.system import detect_device
+from ..core.watcher import list_media_files
+from .transcribe import load_whisper_model, resolve_decoding_options, transcribe_to_file
+
+MANIFEST_DIR_NAME = ".aerolex-manifest"
+
+
+def output_path_for(relative_path: str, output_dir: str, format: str) -> str:
+    """Mirror the corpus layout below the output directory"""
+    return os.path.join(output_dir, f"{os.path.splitext(relative_path)[0]}.{format}")
+
+
+def is_up_to_date(input_path: str, output_path: str) -> bool:
+    return os.path.exists(output_path) and os.path.getmtime(
+        output_path
+    ) >= os.path.getmtime(input_path)
+
+
+def format_hours(seconds: float) -> str:
+    return f"{seconds / 3600:.2f}h"
+
+
+@click.command(name="transcribe-batch")
+@click.argument(
+    "input_dir", type=click.Path(exists=True, file_okay=False, resolve_path=True)
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    required=True,
+    type=click.Path(file_okay=False, resolve_path=True),
+    help="Directory for transcripts, mirroring the input layout",
+)
+@click.option(
+    "-m",
+    "--model",
+    "model_size",
+    type=click.Choice(SUPPORTED_MODELS),
+    default=None,
+    help="Whisper model size to use (default: tuned profile, else medium.en)",
+)
+@click.option(
+    "-f",
+    "--format",
+    type=click.Choice(list(WRITERS.keys())),
+    default="json",
+    help=f"Output format ({', '.join(WRITERS)})",
+)
+@click.option("--beam-size", type=int, default=None, help="Decoding beam size")
+@click.option(
+    "--profile/--no-profile",
+    "use_profile",
+    default=True,
+    help="Use this host's tuned profile for unset options (see 'tune')",
+)
+@click.option(
+    "--shared-manifest",
+    is_flag=True,
+    help="Share the corpus with other nodes through lease files",
+)
+@click.option(
+    "--manifest-dir",
+    type=click.Path(file_okay=False, resolve_path=True),
+    default=None,
+    help=f"Shared manifest location (default: OUTPUT_DIR/{MANIFEST_DIR_NAME})",
+)
+@click.option(
+    "--lease-seconds",
+    type=float,
+    default=300,
+    show_default=True,
+    help="Lease lifetime; leases of nodes silent this long are reclaimed",
+)
+@click.option("--node-id", default=None, help="Worker name (default: host-pid)")
+@click.option("--retry-failed", is_flag=True, help="Retry files that failed before")
+def transcribe_batch(
+    input_dir: str,
+    output_dir: str,
+    model_size: str,
+    format: str,
+    beam_size: int,
+    use_profile: bool,
+    shared_manifest: bool,
+    manifest_dir: str,
+    lease_seconds: float,
+    node_id: str,
+    retry_failed: bool,
+):
+    """Transcribe every media file below INPUT_DIR"""
+    files = list_media_files(input_dir)
+    if not files:
+        click.echo(f"No media files found in {input_dir}")
+        return
+
+    if not shared_manifest:
+        files = [
+            f
+            for f in files
+            if not is_up_to_date(
+                os.path.join(input_dir, f), output_path_for(f, output_dir, format)
+            )
+        ]
+        if not files:
+            click.echo("All transcripts are up to date")
+            return
+
+    device = detect_device()
+    options = resolve_decoding_options(
+        device, model_size, beam_size=beam_size, use_profile=use_profile
+    )
+    model_size = options["model_size"]
+    if not get_model_snapshot(model_size):
+        click.echo(
+            f"Error: Model '{model_size}' not found. Please download it first using:"
+        )
+        click.echo(f"python cli.py models download {model_size}")
+        raise click.Abort()
+
+    prefetch_model(model_size)
+    click.echo(f"Loading model {model_size}...")
+    model = load_whisper_model(
+        model_size,
+        device,
+        options["compute_type"],
+        options["cpu_threads"],
+        options["num_workers"],
+    )
+
+    def process(relative_path: str):
+        input_path = os.path.join(input_dir, relative_path)
+        output_path = output_path_for(relative_path, output_dir, format)
+        duration = transcribe_to_file(
+            model, input_path, output_path, format, options["beam_size"]
+        )
+        return {
+            "output": os.path.relpath(output_path, output_dir),
+            "duration": duration,
+        }
+
+    def report(relative_path: str, result, error):
+        if error:
+            click.echo(f"Error transcribing {relative_path}: {error}", err=True)
+        else:
+            click.echo(
+                f"{relative_path}: {result['duration']:.0f}s of audio in "
+                f"{result['elapsed']:.1f}s"
+            )
+
+    if not shared_manifest:
+        for relative_path in files:
+            start_time = time.time()
+            try:
+                result = process(relative_path)
+            except Exception as e:
+                report(relative_path, None, str(e))
+                continue
+            report(relative_path, {**result, "elapsed": time.time() - start_time}, None)
+        return
+
+    manifest = SharedManifest(
+        manifest_dir or os.path.join(output_dir, MANIFEST_DIR_NAME),
+        node_id=node_id,
+        lease_seconds=lease_seconds,
+    )
+    manifest.write_manifest(
+        {"input_dir": input_dir, "output_dir": output_dir, "files": len(files)}
+    )
+    click.echo(f"Node {manifest.node_id} joining {len(files)} files in {input_dir}")
+    stats = run_worker(
+        manifest, files, process, retry_failed=retry_failed, on_result=report
+    )
+    click.echo(
+        f"\nNode finished: {stats['files_done']} done, {stats['files_failed']} failed, "
+        f"{format_hours(stats['audio_seconds'])} of audio"
+    )
+    if stats["files_lost"]:
+        click.echo(
+            f"{stats['files_lost']} files were taken over by other nodes after "
+            "this node's lease expired"
+        )
+
+
+@click.command()
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+def status(directory: str):
+    """Show progress of a shared transcribe-batch run
+
+    DIRECTORY is the batch output directory or the manifest directory itself.
+    """
+    if os.path.isdir(os.path.join(directory, MANIFEST_DIR_NAME)):
+        directory = os.path.join(directory, MANIFEST_DIR_NAME)
+    info = collect_status(directory)
+    if not info["manifest"]:
+        click.echo(f"Error: No batch manifest found in {directory}", err=True)
+        raise click.Abort()
+
+    now = time.time()
+    total = info["manifest"]["files"]
+    done = len(info["done"])
+    expired = sum(1 for lease in info["leases"] if lease["expires_at"] < now)
+    audio_seconds = sum(r.get("duration", 0.0) for r in info["done"])
+
+    click.echo(f"\nCorpus: {info['manifest']['input_dir']}")
+    click.echo(
+        f"Progress: {done}/{total} ({done / total:.0%}), {len(info['failed'])} failed,"
+        f" {len(info['leases'])} in progress ({expired} expired)"
+    )
+    if info["done"] and info["nodes"]:
+        # Wall-clock window from the first node start to the latest completion
+        started = min(node["started_at"] for node in info["nodes"])
+        wall = max(r["finished_at"] for r in info["done"]) - started
+        if wall > 0:
+            click.echo(
+                f"Throughput: {format_hours(audio_seconds)} of audio in "
+                f"{format_hours(wall)}, {audio_seconds / wall:.2f}x realtime, "
+                f"{done / wall * 3600:.1f} files/hour"
+            )
+
+    click.echo(
+        f"\n{'Node':30} {'Done':>6} {'Failed':>6} {'Audio':>8} {'Speed':>8} "
+        f"{'Last seen':>10}  Current"
+    )
+    click.echo("-" * 90)
+    for node in sorted(info["nodes"], key=lambda n: n["node"]):
+        speed = (
+            f"{node['audio_seconds'] / node['busy_seconds']:.2f}x"
+            if node["busy_seconds"]
+            else "-"
+        )
+        last_seen = (
+            "finished"
+            if node.get("finished_at")
+            else f"{now - node['updated_at']:.0f}s ago"
+        )
+        click.echo(
+            f"{node['node']:30} {node['files_done']:>6} {node['files_failed']:>6} "
+            f"{format_hours(node['audio_seconds']):>8} {speed:>8} {last_seen:>10}  "
+            f"{node['current'] or ''}"
+        )
+    if info["failed"]:
+        click.echo("\nFailed files:")
+        for record in info["failed"]:
+            failed_at = datetime.fromtimestamp(record["failed_at"])
+            click.echo(
+                f"  {record['path']} ({record['node']}, {failed_at:%Y-%m-%d %H:%M}): "
+                f"{record['error']}"
+            )
+    click.echo("")
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+DEFAULT_TRANSCRIPT = Path(__file__).parents[1] / "data" / "text" / "log.json"
+
+
+def scaled_table(records, scale: int):
+    """Repeat a transcript back to back to stand in for a long archive"""
+    from ..core.transcript import TranscriptBuilder, TranscriptTable
+
+    table = TranscriptTable.from_records(records)
+    duration = float(table.segment_end.max()) if len(table) else 0.0
+    builder = TranscriptBuilder()
+    for copy in range(scale):
+        shift = copy * round(duration + 1)
+        for segment in table:
+            builder.add_segment(
+                segment.text,
+                segment.start + shift,
+                segment.end + shift,
+                segment.score,
+                [
+                    (word.text, word.start + shift, word.end + shift, word.score)
+                    for word in segment.words
+                ],
+            )
+    return builder.build()
+
+
+def best_of(repeat: int, function):
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), result
+
+
+@click.command()
+@click.argument(
+    "transcript", type=click.Path(exists=True, dir_okay=False), required=False
+)
+@click.option(
+    "--scale",
+    type=int,
+    default=100,
+    show_default=True,
+    help="Repeat the transcript this many times to simulate a long recording",
+)
+@click.option("--repeat", type=int, default=3, show_default=True, help="Runs per step")
+def bench(transcript: str, scale: int, repeat: int):
+    """Compare transcript storage formats on size and load speed
+
+    TRANSCRIPT is a JSON transcript as written by 'transcribe -f json'
+    (default: the bundled sample).
+    """
+    from ..core.container import TranscriptFile, read_container, write_container
+    from ..core.formatters import write_transcript
+    from ..core.transcript import TranscriptTable
+
+    with open(transcript or DEFAULT_TRANSCRIPT, "r", encoding="utf-8") as f:
+        table = scaled_table(json.load(f), scale)
+    click.echo(f"\n{len(table)} segments, {table.word_count} words\n")
+
+    def write_json(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(table.to_records(), f, indent=2, ensure_ascii=False)
+
+    def write_jsonl(path):
+        with open(path, "w", encoding="utf-8") as f:
+            for record in table.to_records():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def load_json(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def container_texts(path):
+        with TranscriptFile(path) as container:
+            return container.segment_texts()
+
+    formats = [
+        (
+            "json",
+            write_json,
+            lambda path: TranscriptTable.from_records(load_json(path)),
+            lambda path: [record["text"] for record in load_json(path)],
+        ),
+        (
+            "jsonl",
+            write_jsonl,
+            lambda path: TranscriptTable.from_records(load_jsonl(path)),
+            lambda path: [record["text"] for record in load_jsonl(path)],
+        ),
+        (
+            "alx",
+            lambda path: write_container(path, table),
+            read_container,
+            container_texts,
+        ),
+    ]
+    try:
+        import zstandard  # noqa: F401
+
+        formats.append(
+            (
+                "alx+zstd",
+                lambda path: write_container(path, table, compression="zstd"),
+                read_container,
+                container_texts,
+            )
+        )
+    except ImportError:
+        click.echo("zstandard not installed, skipping compressed container\n")
+
+    expected_records = table.to_records()
+    expected_texts = [segment.text for segment in table]
+    click.echo(f"{'Format':10} {'Size':>10} {'Write':>9} {'Load':>9} {'Text only':>10}")
+    click.echo("-" * 52)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, write, load, load_texts in formats:
+            path = os.path.join(directory, f"transcript.{name}")
+            write_time, _ = best_of(repeat, lambda: write(path))
+            load_time, loaded = best_of(repeat, lambda: load(path))
+            text_time, texts = best_of(repeat, lambda: load_texts(path))
+            # Every format must give back exactly what was written
+            if loaded.to_records() != expected_records or texts != expected_texts:
+                click.echo(f"Error: {name} did not round-trip losslessly", err=True)
+                raise click.Abort()
+            click.echo(
+                f"{name:10} {os.path.getsize(path) / 1e6:>8.2f}MB "
+                f"{write_time * 1000:>7.1f}ms {load_time * 1000:>7.1f}ms "
+                f"{text_time * 1000:>8.1f}ms"
+            )
+
+        # Subtitles rendered from the container match those from the JSON
+        srt_paths = [os.path.join(directory, f"{n}.srt") for n in ("json", "alx")]
+        write_transcript(
+            TranscriptTable.from_records(expected_records), srt_paths[0], "srt"
+        )
+        write_transcript(
+            read_container(os.path.join(directory, "transcript.alx")),
+            srt_paths[1],
+            "srt",
+        )
+        if Path(srt_paths[0]).read_bytes() != Path(srt_paths[1]).read_bytes():
+            click.echo("Error: SRT from the container differs", err=True)
+            raise click.Abort()
+    click.echo("")
@@ -0,0 +1,97 @@
+import os
+import time
+
+import click
+
+from ..core.clips import CHUNK_SECONDS, CLIP_FORMATS, PADDING_SECONDS, SAMPLE_RATE
+from ..core.readers import READERS
+from .convert import time_window_options
+
+
+@click.command()
+@click.argument("audio_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("transcript_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-o",
+    "--output",
+    "output_dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Clip directory (default: AUDIO without extension, plus _clips)",
+)
+@click.option(
+    "-f",
+    "--format",
+    type=click.Choice(sorted(CLIP_FORMATS)),
+    default="wav",
+    show_default=True,
+)
+@click.option(
+    "--padding",
+    type=click.FloatRange(0),
+    default=PADDING_SECONDS,
+    show_default=True,
+    help="Seconds of audio kept before and after each segment",
+)
+@click.option(
+    "--from",
+    "input_format",
+    type=click.Choice(sorted(READERS)),
+    default=None,
+    help="Transcript format (default: from the file extension)",
+)
+@click.option("--sample-rate", type=int, default=SAMPLE_RATE, show_default=True)
+@click.option(
+    "-j", "--jobs", type=int, default=None, help="Encoder threads (default: CPUs)"
+)
+@time_window_options
+def clips(
+    audio_path,
+    transcript_path,
+    output_dir,
+    format,
+    padding,
+    input_format,
+    sample_rate,
+    jobs,
+    start,
+    end,
+):
+    """Cut one audio clip per transcript segment
+
+    TRANSCRIPT_PATH is any transcript 'convert' reads; for .lbs files and
+    the LLM analysis JSON each header span becomes a clip named by its id.
+    AUDIO_PATH is decoded once and every clip is cut from that single pass,
+    then encoded in parallel. manifest.json in the output directory links
+    each segment id to its clip file, times and text.
+    """
+    from ..core.audio import iter_audio_chunks
+    from ..core.clips import extract_clips
+    from ..core.readers import read_transcript
+    from ..core.system import cpu_count
+
+    output_dir = output_dir or os.path.splitext(audio_path)[0] + "_clips"
+    start_time = time.perf_counter()
+    try:
+        rows = list(read_transcript(transcript_path, input_format, start, end))
+        manifest = extract_clips(
+            iter_audio_chunks(audio_path, CHUNK_SECONDS, sample_rate),
+            rows,
+            output_dir,
+            format=format,
+            padding=padding,
+            sample_rate=sample_rate,
+            jobs=max(1, jobs or cpu_count()),
+            metadata={
+                "source": os.path.basename(audio_path),
+                "transcript": os.path.basename(transcript_path),
+            },
+        )
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        click.echo(f"Error: Failed to cut clips: {str(e)}", err=True)
+        raise click.Abort()
+
+    click.echo(
+        f"{len(manifest['clips'])} clips written to {output_dir} in "
+        f"{time.perf_counter() - start_time:.1f}s"
+    )
@@ -0,0 +1,124 @@
+from prompt_toolkit.completion import Completer, Completion
+
+from ..core.formatters import WRITERS
+from .models import SUPPORTED_MODELS
+
+
+class CommandCompleter(Completer):
+    """Custom completer for shell commands"""
+
+    def __init__(self):
+        self.file_extensions = [
+            "mp3",
+            "wav",
+            "mp4",
+            "avi",
+            "mov",
+        ] + list(WRITERS.keys())
+        self.models_subcommands = ["list", "download", "update", "delete", "fetch"]
+
+    def get_completions(self, document, complete_event):
+        text = document.text
+        words = text.split()
+
+        # Handle base commands when no command is typed yet
+        if len(words) == 0 or (len(words) == 1 and not text.endswith(" ")):
+            commands = ["transcribe", "models", "help", "exit"]
+            for command in commands:
+                if command.startswith(text):
+                    yield Completion(command, start_position=-len(text))
+            return
+
+        # Handle models command completions
+        if words[0] == "models":
+            # If we just typed models, show subcommands
+            if len(words) == 1 and text.endswith(" "):
+                for subcmd in self.models_subcommands:
+                    yield Completion(subcmd, start_position=0)
+                return
+
+            # If we're typing a subcommand, show matching ones
+            if len(words) == 2 and not text.endswith(" "):
+                for subcmd in self.models_subcommands:
+                    if subcmd.startswith(words[1]):
+                        yield Completion(subcmd, start_position=-len(words[1]))
+                return
+
+            # Handle model names after download/delete/update/fetch
+            if len(words) == 2 and text.endswith(" "):
+                if words[1] in ["download", "delete", "update", "fetch"]:
+                    for model in SUPPORTED_MODELS:
+                        yield Completion(model, start_position=0)
+                return
+
+            if len(words) == 3 and not text.endswith(" "):
+                if words[1] in ["download", "delete", "update", "fetch"]:
+                    for model in SUPPORTED_MODELS:
+                        if model.startswith(words[2]):
+                            yield Completion(model, start_position=-len(words[2]))
+                return
+
+        # Handle transcribe command completions
+        if words[0] == "transcribe":
+            # If we just typed transcribe, show flags
+            if len(words) == 1 and text.endswith(" "):
+                flags = [
+                    "-i",
+                    "--input",
+                    "-o",
+                    "--output",
+                    "-m",
+                    "--model",
+                    "-f",
+                    "--format",
+                ]
+                for flag in flags:
+                    yield Completion(flag, start_position=0)
+                return
+
+            # If we're after a flag, show appropriate completions
+            if len(words) >= 2:
+                last_word = words[-1] if not text.endswith(" ") else ""
+                prev_word = words[-2] if len(words) > 1 else ""
+
+                # Handle file path completions after -i/--input or -o/--output
+                if prev_word in ["-i", "--input", "-o", "--output"]:
+                    for ext in self.file_extensions:
+                        if ext.startswith(last_word):
+                            yield Completion(ext, start_position=-len(last_word))
+                    return
+
+                # Handle model completions after -m/--model
+                elif prev_word in ["-m", "--model"]:
+                    for model in SUPPORTED_MODELS:
+                        if model.startswith(last_word):
+                            yield Completion(model, start_position=-len(last_word))
+                    return
+
+                # Handle format completions after -f/--format
+                elif prev_word in ["-f", "--format"]:
+                    for fmt in WRITERS.keys():
+                        if fmt.startswith(last_word):
+                            yield Completion(fmt, start_position=-len(last_word))
+                    return
+
+                # Show remaining flags
+                used_flags = set(w for w in words if w.startswith("-"))
+                remaining_flags = [
+                    f
+                    for f in [
+                        "-i",
+                        "--input",
+                        "-o",
+                        "--output",
+                        "-m",
+                        "--model",
+                        "-f",
+                        "--format",
+                    ]
+                    if f not in used_flags
+                ]
+
+                for flag in remaining_flags:
+                    if flag.startswith(last_word):
+                        yield Completion(flag, start_position=-len(last_word))
@@ -0,0 +1,222 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import click
+
+from ..core.conversion import (
+    OUTPUT_FORMATS,
+    convert_file,
+    is_newer,
+    load_state,
+    plan_conversions,
+    save_state,
+)
+from ..core.formatters import parse_time
+from ..core.readers import READERS
+from ..core.system import cpu_count
+
+
+def time_window_options(function):
+    """--start/--end options, parsed to seconds"""
+
+    def parse(ctx, param, value):
+        if value is None:
+            return None
+        try:
+            return parse_time(value)
+        except ValueError:
+            raise click.BadParameter("must be HH:MM:SS.mmm or seconds")
+
+    function = click.option(
+        "--end",
+        callback=parse,
+        default=None,
+        help="Only segments starting before this time (HH:MM:SS.mmm or seconds)",
+    )(function)
+    return click.option(
+        "--start",
+        callback=parse,
+        default=None,
+        help="Only segments ending after this time (HH:MM:SS.mmm or seconds)",
+    )(function)
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, resolve_path=True))
+@click.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=click.Path(resolve_path=True),
+    default=None,
+    help="Output file, or directory mirroring the input tree "
+    "(default: next to the input)",
+)
+@click.option(
+    "-f",
+    "--format",
+    required=True,
+    type=click.Choice(OUTPUT_FORMATS),
+    help=f"Output format ({', '.join(OUTPUT_FORMATS)})",
+)
+@click.option(
+    "--from",
+    "input_format",
+    type=click.Choice(sorted(READERS)),
+    default=None,
+    help="Input format (default: from the file extension)",
+)
+@click.option(
+    "-j", "--jobs", type=int, default=None, help="Parallel conversions (default: CPUs)"
+)
+@click.option(
+    "--check",
+    type=click.Choice(["mtime", "hash"]),
+    default="mtime",
+    show_default=True,
+    help="How to tell an output is up to date",
+)
+@click.option("--force", is_flag=True, help="Convert even up-to-date outputs")
+@time_window_options
+def convert(
+    input_path, output_path, format, input_format, jobs, check, force, start, end
+):
+    """Convert transcripts between formats
+
+    INPUT_PATH is a transcript or a directory tree of them. Files are streamed
+    record by record, so archives of any length convert in constant memory.
+    --start/--end cut a single file down to a time window; .alx inputs seek
+    straight to it.
+    """
+    window = start is not None or end is not None
+    if os.path.isfile(input_path):
+        base, _ = os.path.splitext(input_path)
+        target = output_path or f"{base}.{format}"
+        if os.path.isdir(target):
+            target = os.path.join(
+                target, f"{os.path.splitext(os.path.basename(input_path))[0]}.{format}"
+            )
+        if target == input_path:
+            click.echo("Error: Input and output are the same file", err=True)
+            raise click.Abort()
+        if (
+            not window
+            and not force
+            and check == "mtime"
+            and is_newer(input_path, target)
+        ):
+            click.echo(f"{target} is up to date")
+            return
+        # Hashes live in the output directory's state file, keyed like a
+        # directory conversion would key them; a window always converts
+        use_state = check == "hash" and not window
+        state_dir = os.path.dirname(target)
+        state_key = os.path.relpath(input_path, state_dir)
+        state = load_state(state_dir) if use_state else {}
+        try:
+            result = convert_file(
+                input_path,
+                target,
+                format,
+                input_format,
+                ("" if force else state.get(state_key, "")) if use_state else None,
+                start=start,
+                end=end,
+            )
+        except (OSError, ValueError, KeyError) as e:
+            click.echo(f"Error: Failed to convert {input_path}: {str(e)}", err=True)
+            raise click.Abort()
+        if use_state:
+            state[state_key] = result["hash"]
+            save_state(state_dir, state)
+        if result["skipped"]:
+            click.echo(f"{target} is up to date")
+        else:
+            click.echo(f"Wrote {result['segments']} segments to {target}")
+        return
+
+    if window:
+        click.echo("Error: --start/--end apply to a single file", err=True)
+        raise click.Abort()
+
+    output_dir = output_path or input_path
+    state = load_state(output_dir) if check == "hash" else {}
+    planned = [
+        (relative_path, source, target)
+        for relative_path, source, target in plan_conversions(
+            input_path, output_dir, format
+        )
+        if not input_format or os.path.splitext(source)[1].lstrip(".") == input_format
+    ]
+    # a.json and a.srt would both become a.<format>; refuse rather than let
+    # whichever finishes last win
+    sources_by_target = {}
+    for relative_path, _, target in planned:
+        sources_by_target.setdefault(target, []).append(relative_path)
+    clashes = {t: s for t, s in sources_by_target.items() if len(s) > 1}
+    if clashes:
+        for target, sources in sorted(clashes.items()):
+            click.echo(
+                f"Error: {', '.join(sources)} would all be written to "
+                f"{os.path.relpath(target, output_dir)}",
+                err=True,
+            )
+        click.echo("Use --from to convert one input format at a time", err=True)
+        raise click.Abort()
+
+    pending = []
+    skipped = 0
+    for relative_path, source, target in planned:
+        if not force and check == "mtime" and is_newer(source, target):
+            skipped += 1
+            continue
+        pending.append((relative_path, source, target))
+
+    if not pending:
+        click.echo(f"All outputs are up to date ({skipped} skipped)")
+        return
+
+    jobs = max(1, min(jobs or cpu_count(), len(pending)))
+    click.echo(f"Converting {len(pending)} transcripts to {format} with {jobs} jobs")
+    converted = failed = 0
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=get_context("spawn")
+    ) as executor:
+        futures = {
+            executor.submit(
+                convert_file,
+                source,
+                target,
+                format,
+                input_format,
+                # An empty known hash makes the worker hash but never skip
+                None if check != "hash" else ("" if force else state.get(rel, "")),
+            ): rel
+            for rel, source, target in pending
+        }
+        for future in as_completed(futures):
+            relative_path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                click.echo(f"Error: {relative_path}: {str(e)}", err=True)
+                continue
+            if result["hash"]:
+                state[relative_path] = result["hash"]
+            if result["skipped"]:
+                skipped += 1
+            else:
+                converted += 1
+
+    if check == "hash":
+        save_state(output_dir, state)
+    click.echo(
+        f"{converted} converted, {skipped} up to date, {failed} failed "
+        f"in {time.perf_counter() - start_time:.1f}s"
+    )
+    if failed:
+        raise click.Abort()
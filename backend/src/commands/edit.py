@@ -0,0 +1,52 @@
+import json
+
+import click
+
+
+@click.command()
+@click.argument("transcript", type=click.Path(exists=True, dir_okay=False))
+@click.argument("patch", type=click.File("r", encoding="utf-8"), required=False)
+@click.option(
+    "--compact", is_flag=True, help="Fold the logged edits into the transcript now"
+)
+def edit(transcript, patch, compact):
+    """Apply segment edits to a transcript without rewriting it
+
+    PATCH is a JSON file ('-' for stdin) of the form {"version": N, "ops": [...]}
+    with text, split, merge and retime operations. It is appended to the
+    transcript's edit log and rejected if the transcript is no longer at
+    version N. Without PATCH the current version is printed.
+    """
+    from ..core.edits import EditableTranscript, EditConflict, EditLogError
+
+    try:
+        editable = EditableTranscript(transcript)
+    except (ValueError, EditLogError) as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        raise click.Abort()
+
+    try:
+        if patch is not None:
+            body = json.load(patch)
+            version = editable.apply(body["version"], body["ops"])
+            click.echo(f"Applied {len(body['ops'])} edits, now at version {version}")
+        if compact:
+            editable.compact()
+            click.echo(f"Compacted {transcript} at version {editable.version}")
+    except EditConflict as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        raise click.Abort()
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        click.echo(f"Error: Invalid patch: {str(e)}", err=True)
+        raise click.Abort()
+    except ValueError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        raise click.Abort()
+    finally:
+        editable.close()
+
+    if patch is None and not compact:
+        click.echo(
+            f"{transcript}: version {editable.version}, "
+            f"{len(editable.patches)} edits in the log"
+        )
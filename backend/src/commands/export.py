@@ -0,0 +1,63 @@
+import os
+
+import click
+
+from ..core.readers import READERS
+from .convert import time_window_options
+
+EDITOR_BUNDLE_SUFFIX = ".editor.json"
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=f"Output file (default: INPUT with a {EDITOR_BUNDLE_SUFFIX} suffix)",
+)
+@click.option(
+    "--editor-bundle",
+    is_flag=True,
+    help="Integer-ms times, validated order and precomputed transcript groups, "
+    "ready for the web editor to open without re-parsing",
+)
+@click.option(
+    "--from",
+    "input_format",
+    type=click.Choice(sorted(READERS)),
+    default=None,
+    help="Input format (default: from the file extension)",
+)
+@time_window_options
+def export(input_path, output_path, editor_bundle, input_format, start, end):
+    """Export a transcript for other tools
+
+    INPUT_PATH is a transcript in any format 'convert' reads.
+    """
+    from ..core.editor_bundle import write_editor_bundle
+    from ..core.readers import read_transcript
+    from ..core.transcript import TranscriptTable
+
+    if not editor_bundle:
+        click.echo("Error: Choose what to export (--editor-bundle)", err=True)
+        raise click.Abort()
+
+    output_path = output_path or (
+        os.path.splitext(input_path)[0] + EDITOR_BUNDLE_SUFFIX
+    )
+    try:
+        table = TranscriptTable.from_dicts(
+            read_transcript(input_path, input_format, start, end)
+        )
+        bundle = write_editor_bundle(table, output_path)
+    except (OSError, ValueError, KeyError) as e:
+        click.echo(f"Error: Failed to export {input_path}: {str(e)}", err=True)
+        raise click.Abort()
+
+    click.echo(
+        f"Wrote {len(table)} segments in {len(bundle['groups']['start'])} "
+        f"groups to {output_path}"
+    )
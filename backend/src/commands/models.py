@@ -5,7 +5,6 @@ from pathlib import Path
 from typing import Dict
 
 import click
-from huggingface_hub import HfApi, list_repo_refs, snapshot_download
 
 from src.core.models import MODEL_REPO_IDS, MODEL_SIZES, SUPPORTED_MODELS
 
@@ -39,6 +38,8 @@ def save_custom_models(models: Dict[str, float]):
 
 def get_model_size(repo_id: str) -> float:
     """Get total size of model in MB"""
+    from huggingface_hub import HfApi
+
     api = HfApi()
     try:
         model_info = api.model_info(repo_id=repo_id, files_metadata=True)
@@ -52,6 +53,8 @@ def get_model_size(repo_id: str) -> float:
 
 def is_valid_hf_model(repo_id: str) -> bool:
     """Check if a repository ID exists on HuggingFace"""
+    from huggingface_hub import HfApi
+
     api = HfApi()
     try:
         api.model_info(repo_id=repo_id)
@@ -62,6 +65,8 @@ def is_valid_hf_model(repo_id: str) -> bool:
 
 def display_model_info(repo_id: str):
     """Display detailed information about a model"""
+    from huggingface_hub import HfApi
+
     api = HfApi()
     try:
         model_info = api.model_info(repo_id=repo_id, files_metadata=True)
@@ -89,6 +94,8 @@ def check_model_updates(repo_id: str) -> bool:
     """Check if there are updates available for a model
     Returns True if updates are available, False otherwise
     """
+    from huggingface_hub import list_repo_refs
+
     try:
         # Get the local model path
         model_path = Path(MODELS_DIR) / repo_id.replace("/", "--") / "snapshots"
@@ -176,6 +183,8 @@ def download(model_name: str):
     MODEL_NAME can be either a short name (e.g., tiny, small.en) or
     full repository ID (e.g., Systran/faster-whisper-tiny)
     """
+    from huggingface_hub import snapshot_download
+
     # Handle both short and full model names
     if "/" in model_name:
         if not is_valid_hf_model(model_name):
@@ -235,6 +244,8 @@ def update(model_name: str = None):
     If MODEL_NAME is provided, only that model will be updated.
     Otherwise, all downloaded models will be checked for updates.
     """
+    from huggingface_hub import snapshot_download
+
     models_to_check = []
 
     if model_name:
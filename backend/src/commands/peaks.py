@@ -0,0 +1,78 @@
+import os
+import time
+
+import click
+
+from ..core.peaks import (
+    BASE_SAMPLES_PER_PIXEL,
+    CHUNK_SECONDS,
+    LEVELS,
+    SAMPLE_RATE,
+    compute_peaks,
+    peaks_path_for,
+    write_peaks,
+)
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Sidecar path (default: INPUT with a .peaks or .peaks.json suffix)",
+)
+@click.option(
+    "-f",
+    "--format",
+    type=click.Choice(["bin", "json"]),
+    default="bin",
+    show_default=True,
+    help="Memory-mappable binary, or JSON with one entry per level",
+)
+@click.option(
+    "--levels",
+    type=click.IntRange(1, 16),
+    default=LEVELS,
+    show_default=True,
+    help=f"Zoom levels, from {BASE_SAMPLES_PER_PIXEL} samples per pixel doubling",
+)
+@click.option(
+    "--sample-rate",
+    type=int,
+    default=SAMPLE_RATE,
+    show_default=True,
+    help="Rate the audio is decoded at",
+)
+def peaks(input_path, output_path, format, levels, sample_rate):
+    """Precompute waveform peaks for the editor
+
+    Decodes INPUT_PATH chunk by chunk and writes min/max peaks at several
+    zoom levels, so the editor can draw long recordings without decoding them.
+    """
+    from ..core.audio import iter_audio_chunks
+
+    output_path = output_path or peaks_path_for(input_path, format)
+    start_time = time.perf_counter()
+    try:
+        pyramid = compute_peaks(
+            iter_audio_chunks(input_path, CHUNK_SECONDS, sample_rate),
+            sample_rate,
+            levels,
+        )
+        write_peaks(
+            output_path,
+            pyramid,
+            format,
+            metadata={"source": os.path.basename(input_path)},
+        )
+    except Exception as e:
+        click.echo(f"Error: Failed to compute peaks: {str(e)}", err=True)
+        raise click.Abort()
+
+    click.echo(
+        f"{pyramid.duration:.1f}s of audio, {levels} levels, written to "
+        f"{output_path} in {time.perf_counter() - start_time:.1f}s"
+    )
@@ -0,0 +1,59 @@
+import os
+import time
+
+import click
+
+from ..core.preview import CODECS, PREVIEW_DIR
+
+
+@click.command()
+@click.argument(
+    "input_paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "-c",
+    "--codec",
+    type=click.Choice(sorted(CODECS)),
+    default="opus",
+    show_default=True,
+)
+@click.option(
+    "-b", "--bitrate", default=None, help="Bitrate, e.g. 16k (default: per codec)"
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=PREVIEW_DIR,
+    show_default=True,
+    help="Preview cache (or set WSCRIBE_PREVIEW_DIR)",
+)
+@click.option("--force", is_flag=True, help="Rebuild previews that are cached")
+def preview(input_paths, codec, bitrate, cache_dir, force):
+    """Build small mono previews of recordings for the editor
+
+    Each input is transcoded by a single streaming ffmpeg process into a
+    low-bitrate mono rendition, cached by content hash. serve-editor serves
+    it at /api/preview/<path> in place of the source, on the same timeline.
+    """
+    from ..core.preview import build_preview
+
+    failed = 0
+    for input_path in input_paths:
+        start_time = time.perf_counter()
+        try:
+            result = build_preview(input_path, codec, bitrate, cache_dir, force)
+        except (OSError, RuntimeError) as e:
+            failed += 1
+            click.echo(f"Error: {input_path}: {str(e)}", err=True)
+            continue
+        if result["cached"]:
+            click.echo(f"{input_path}: cached at {result['path']}")
+            continue
+        source_size = os.path.getsize(input_path)
+        preview_size = os.path.getsize(result["path"])
+        click.echo(
+            f"{input_path}: {source_size / 1e6:.1f}MB -> {preview_size / 1e6:.1f}MB "
+            f"in {time.perf_counter() - start_time:.1f}s, {result['path']}"
+        )
+    if failed:
+        raise click.Abort()
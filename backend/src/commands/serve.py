@@ -0,0 +1,46 @@
+import click
+
+from ..core.preview import PREVIEW_DIR
+
+
+@click.command("serve-editor")
+@click.argument(
+    "root", type=click.Path(exists=True, file_okay=False), default=".", required=False
+)
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("-p", "--port", type=int, default=8000, show_default=True)
+@click.option("-q", "--quiet", is_flag=True, help="Do not log requests")
+@click.option(
+    "--preview-dir",
+    type=click.Path(file_okay=False),
+    default=PREVIEW_DIR,
+    show_default=True,
+    help="Preview cache built by 'preview' (or set WSCRIBE_PREVIEW_DIR)",
+)
+def serve_editor(root, host, port, quiet, preview_dir):
+    """Serve audio, transcripts and sidecars to the web editor
+
+    Everything below ROOT is available at /files/<path> with byte ranges, so
+    audio streams and seeks instead of downloading up front. Transcripts are
+    paged by time window at /api/transcript/<path>?start=&end=, peaks at
+    /api/peaks/<path> and spectrogram tiles at /api/spectrogram/<path>.
+    Audio previews from 'preview' are at /api/preview/<audio path>.
+    JSON is gzipped and every response carries an ETag.
+    """
+    from ..core.editor_server import make_server
+
+    try:
+        server = make_server(root, host, port, quiet, preview_dir)
+    except OSError as e:
+        click.echo(f"Error: Cannot listen on {host}:{port}: {str(e)}", err=True)
+        raise click.Abort()
+
+    click.echo(
+        f"Serving {server.RequestHandlerClass.data.root} on http://{host}:{port}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
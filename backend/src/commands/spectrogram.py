@@ -0,0 +1,70 @@
+import os
+import time
+
+import click
+
+from ..core.spectrogram import (
+    CHUNK_SECONDS,
+    LEVELS,
+    N_MELS,
+    SAMPLE_RATE,
+    SPECTROGRAM_EXTENSION,
+    write_spectrogram,
+)
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=f"Output path (default: INPUT with a {SPECTROGRAM_EXTENSION} suffix)",
+)
+@click.option(
+    "--levels",
+    type=click.IntRange(1, 16),
+    default=LEVELS,
+    show_default=True,
+    help="Zoom levels, each half the time resolution of the previous",
+)
+@click.option("--mels", type=int, default=N_MELS, show_default=True, help="Mel bands")
+@click.option(
+    "--sample-rate",
+    type=int,
+    default=SAMPLE_RATE,
+    show_default=True,
+    help="Rate the audio is decoded at",
+)
+def spectrogram(input_path, output_path, levels, mels, sample_rate):
+    """Precompute a tiled mel spectrogram for the editor
+
+    Decodes INPUT_PATH chunk by chunk and writes fixed-width uint8 tiles per
+    zoom level, so the editor only fetches the tiles in view.
+    """
+    from ..core.audio import iter_audio_chunks
+
+    output_path = output_path or (
+        os.path.splitext(input_path)[0] + SPECTROGRAM_EXTENSION
+    )
+    start_time = time.perf_counter()
+    try:
+        header = write_spectrogram(
+            output_path,
+            iter_audio_chunks(input_path, CHUNK_SECONDS, sample_rate),
+            sample_rate,
+            levels,
+            mels,
+            metadata={"source": os.path.basename(input_path)},
+        )
+    except Exception as e:
+        click.echo(f"Error: Failed to compute spectrogram: {str(e)}", err=True)
+        raise click.Abort()
+
+    tiles = sum(level["tiles"] for level in header["levels"])
+    click.echo(
+        f"{header['duration']:.1f}s of audio, {tiles} tiles in {levels} levels, "
+        f"written to {output_path} in {time.perf_counter() - start_time:.1f}s"
+    )
@@ -3,32 +3,33 @@ import subprocess
 import tempfile
 import time
 from pathlib import Path
+from typing import Dict, Optional
 
 import click
-import structlog
-import torch
-from faster_whisper import WhisperModel
-from rich.console import Console
-from rich.progress import (
-    BarColumn,
-    Progress,
-    SpinnerColumn,
-    TextColumn,
-)
 
-from ..core.formatters import FORMATTERS
+from ..core.budget import parse_memory_size, plan_memory
+from ..core.formatters import WRITERS, get_writer
+from ..core.models import get_model_snapshot
+from ..core.prefetch import prefetch_model
+from ..core.system import default_compute_type, detect_device, peak_rss_mb
+from ..core.tuning import load_profile
 from .models import SUPPORTED_MODELS
 
 MODELS_DIR = os.environ.get(
     "WSCRIBE_MODELS_DIR", os.path.expanduser("~/.cache/huggingface/hub")
 )
-logger = structlog.get_logger()
-
-console = Console()
 
 
 class TranscriptionProgressCallback:
     def __init__(self):
+        from rich.console import Console
+        from rich.progress import (
+            BarColumn,
+            Progress,
+            SpinnerColumn,
+            TextColumn,
+        )
+
         self.progress = Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -38,7 +39,7 @@ class TranscriptionProgressCallback:
             TextColumn("[bold blue]{task.fields[time_info]}"),
             TextColumn("•"),
             TextColumn("Speed: {task.fields[speed]:.1f}x"),
-            console=console,
+            console=Console(),
             refresh_per_second=10,  # Limit refresh rate
             transient=True,  # Don't leave progress lines in terminal
         )
@@ -165,6 +166,126 @@ def convert_video_to_audio(video_path: str) -> str:
         raise click.Abort()
 
 
+def iter_chunked_segments(model, input_path: str, chunk_seconds: int, **options):
+    """Transcribe audio one chunk at a time, shifting segment times to file offsets"""
+    from ..core.audio import iter_audio_chunks
+
+    previous_text = None
+    for offset, chunk in iter_audio_chunks(input_path, chunk_seconds):
+        # Carry the last segment over as prompt to keep context across chunks
+        segments, _ = model.transcribe(chunk, initial_prompt=previous_text, **options)
+        for segment in segments:
+            segment.start += offset
+            segment.end += offset
+            for word in segment.words or []:
+                word.start += offset
+                word.end += offset
+            previous_text = segment.text
+            yield segment
+
+
+def resolve_decoding_options(
+    device: str,
+    model_size: str = None,
+    compute_type: str = None,
+    cpu_threads: int = None,
+    num_workers: int = None,
+    beam_size: int = None,
+    use_profile: bool = True,
+) -> Dict:
+    """Fill unset decoding options from the host's tuned profile, then defaults"""
+    profile = load_profile() if use_profile else None
+    if profile and profile.get("device") != device:
+        profile = None
+    if profile:
+        model_size = model_size or profile["model"]
+        compute_type = compute_type or profile["compute_type"]
+        cpu_threads = profile["cpu_threads"] if cpu_threads is None else cpu_threads
+        num_workers = profile["num_workers"] if num_workers is None else num_workers
+        beam_size = profile["beam_size"] if beam_size is None else beam_size
+    return {
+        "model_size": model_size or "medium.en",
+        "compute_type": compute_type or default_compute_type(device),
+        "cpu_threads": 0 if cpu_threads is None else cpu_threads,
+        "num_workers": 1 if num_workers is None else num_workers,
+        "beam_size": 5 if beam_size is None else beam_size,
+        "profile": profile,
+    }
+
+
+def load_whisper_model(
+    model_size: str,
+    device: str,
+    compute_type: str,
+    cpu_threads: int = 0,
+    num_workers: int = 1,
+):
+    """Load a downloaded model from its snapshot directory"""
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(
+        model_size_or_path=str(get_model_snapshot(model_size)),
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
+
+
+def transcribe_to_file(
+    model, input_path: str, output_path: str, format: str, beam_size: int = 5
+) -> float:
+    """Transcribe with an already loaded model; returns the media duration"""
+    segments, info = model.transcribe(
+        input_path,
+        beam_size=beam_size,
+        word_timestamps=True,
+        condition_on_previous_text=True,
+    )
+
+    # Stream next to the target and rename so readers never see partial output;
+    # the unique temp name keeps concurrent writers of one output apart
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, partial_path = tempfile.mkstemp(
+        dir=output_dir, prefix=f".{os.path.basename(output_path)}.", suffix=".part"
+    )
+    name = os.path.splitext(os.path.basename(output_path))[0]
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", buffering=1 << 20) as f:
+            with get_writer(format, f, name=name) as writer:
+                writer.write_all(segments)
+        os.replace(partial_path, output_path)
+    except BaseException:
+        os.unlink(partial_path)
+        raise
+    return info.duration
+
+
+def write_peaks_sidecar(
+    input_path: str, output_path: str, audio=None, source: Optional[str] = None
+) -> str:
+    """
+    Peaks next to the transcript, from the decoded audio when there is one;
+    source names the original media when input_path is audio extracted from it
+    """
+    from ..core import peaks
+
+    if audio is not None:
+        chunks = peaks.array_chunks(audio)
+    else:
+        from ..core.audio import iter_audio_chunks
+
+        chunks = iter_audio_chunks(input_path, peaks.CHUNK_SECONDS)
+    path = peaks.peaks_path_for(output_path)
+    peaks.write_peaks(
+        path,
+        peaks.compute_peaks(chunks),
+        metadata={"source": os.path.basename(source or input_path)},
+    )
+    return path
+
+
 @click.command()
 @click.option(
     "-i", "--input", "input_path", required=True, help="Input audio file path"
@@ -181,20 +302,67 @@ def convert_video_to_audio(video_path: str) -> str:
     "--model",
     "model_size",
     type=click.Choice(SUPPORTED_MODELS),
-    default="medium.en",
-    help="Whisper model size to use",
+    default=None,
+    help="Whisper model size to use (default: tuned profile, else medium.en)",
 )
 @click.option(
     "-f",
     "--format",
-    type=click.Choice(list(FORMATTERS.keys())),
+    type=click.Choice(list(WRITERS.keys())),
     default="json",
-    help="Output format (json, srt, vtt)",
+    help=f"Output format ({', '.join(WRITERS)})",
+)
+@click.option("--compute-type", default=None, help="CTranslate2 compute type")
+@click.option("--cpu-threads", type=int, default=None, help="CPU threads to use")
+@click.option("--num-workers", type=int, default=None, help="Model worker count")
+@click.option("--beam-size", type=int, default=None, help="Decoding beam size")
+@click.option(
+    "--profile/--no-profile",
+    "use_profile",
+    default=True,
+    help="Use this host's tuned profile for unset options (see 'tune')",
+)
+@click.option(
+    "--max-memory",
+    default=None,
+    help="Memory budget (e.g. 2G, 1500M): picks model, compute type and chunk "
+    "size to fit and decodes the audio chunk by chunk",
+)
+@click.option(
+    "--peaks",
+    "write_peaks",
+    is_flag=True,
+    help="Also write waveform peaks for the editor (see 'peaks')",
 )
-def transcribe(input_path: str, output_path: str, model_size: str, format: str):
+@click.option(
+    "--preview",
+    "write_preview",
+    is_flag=True,
+    help="Also build a low-bitrate preview for the editor (see 'preview')",
+)
+def transcribe(
+    input_path: str,
+    output_path: str,
+    model_size: str,
+    format: str,
+    compute_type: str = None,
+    cpu_threads: int = None,
+    num_workers: int = None,
+    beam_size: int = None,
+    use_profile: bool = True,
+    max_memory: str = None,
+    write_peaks: bool = False,
+    write_preview: bool = False,
+):
     """Transcribe an audio file to text"""
+    import structlog
+    from faster_whisper import decode_audio
+
+    from ..core.audio import get_audio_duration
+
     # Initialize temp_audio_path at the start
     temp_audio_path = None
+    source_path = input_path
 
     # Check if output file exists and handle overwriting
     if os.path.exists(output_path):
@@ -208,6 +376,58 @@ def transcribe(input_path: str, output_path: str, model_size: str, format: str):
         click.echo(f"Error: Input file '{input_path}' not found", err=True)
         raise click.Abort()
 
+    # Fill unset decoding options from the tuned profile, then from defaults
+    device = detect_device()
+    options = resolve_decoding_options(
+        device,
+        model_size,
+        compute_type,
+        cpu_threads,
+        num_workers,
+        beam_size,
+        use_profile,
+    )
+    if options["profile"]:
+        click.echo(f"Using tuned profile from {options['profile']['tuned_at']}")
+    model_size = options["model_size"]
+    compute_type = options["compute_type"]
+    cpu_threads = options["cpu_threads"]
+    num_workers = options["num_workers"]
+    beam_size = options["beam_size"]
+
+    # Fit model, compute type and chunk size into the memory budget
+    chunk_seconds = None
+    if max_memory:
+        try:
+            budget_mb = parse_memory_size(max_memory)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            raise click.Abort()
+        plan = plan_memory(budget_mb, model_size, compute_type)
+        if plan is None:
+            click.echo(f"Error: No downloaded model fits in {budget_mb}MB", err=True)
+            raise click.Abort()
+        model_size, compute_type = plan.model, plan.compute_type
+        chunk_seconds = plan.chunk_seconds
+        click.echo(
+            f"Memory budget {budget_mb}MB: {model_size} ({compute_type}), "
+            f"{chunk_seconds}s chunks, ~{plan.estimated_mb:.0f}MB estimated"
+        )
+
+    # Check if model is downloaded
+    model_path = (
+        Path(MODELS_DIR) / f"models--Systran--faster-whisper-{model_size}" / "snapshots"
+    )
+    if not model_path.exists() or not any(model_path.iterdir()):
+        click.echo(
+            f"Error: Model '{model_size}' not found. Please download it first using:"
+        )
+        click.echo(f"python cli.py models download {model_size}")
+        raise click.Abort()
+
+    # Warm the page cache with the weights while audio is being prepared
+    prefetch_model(model_size)
+
     # Check ffmpeg for video files
     is_video = input_path.lower().endswith((".mp4", ".avi", ".mov", ".mkv", ".webm"))
     if is_video:
@@ -222,73 +442,86 @@ def transcribe(input_path: str, output_path: str, model_size: str, format: str):
         input_path = temp_audio_path
         click.echo("Audio extraction complete.")
 
-    # Check if model is downloaded
-    model_path = (
-        Path(MODELS_DIR) / f"models--Systran--faster-whisper-{model_size}" / "snapshots"
-    )
-    if not model_path.exists() or not any(model_path.iterdir()):
-        click.echo(
-            f"Error: Model '{model_size}' not found. Please download it first using:"
-        )
-        click.echo(f"python cli.py models download {model_size}")
-        raise click.Abort()
-
     try:
-        click.echo(f"Loading model {model_size}...")
-
-        # Auto-detect GPU availability
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
+        # Decode up front so it overlaps with the weights prefetch
+        audio = None
+        decode_time = 0.0
+        if not chunk_seconds:
+            click.echo(f"Analyzing {'video' if is_video else 'audio'} file...")
+            decode_start = time.perf_counter()
+            try:
+                audio = decode_audio(input_path)
+            except Exception as e:
+                click.echo(
+                    f"\nError: Failed to load {'video' if is_video else 'audio'} "
+                    f"file: {str(e)}"
+                )
+                raise click.Abort()
+            decode_time = time.perf_counter() - decode_start
 
-        click.echo(f"Using device: {device.upper()}")
-        if device == "cuda":
-            click.echo(f"GPU: {torch.cuda.get_device_name()}")
+        click.echo(f"Loading model {model_size}...")
 
-        # Get the actual model path from snapshots directory
-        model_snapshots = list(model_path.iterdir())
-        if not model_snapshots:
-            click.echo(f"Error: Model snapshots not found in {model_path}")
-            raise click.Abort()
+        click.echo(f"Using device: {device.upper()} ({compute_type})")
 
-        model = WhisperModel(
-            model_size_or_path=str(model_snapshots[0]),
-            device=device,
-            compute_type=compute_type,
+        load_start = time.perf_counter()
+        model = load_whisper_model(
+            model_size, device, compute_type, cpu_threads, num_workers
         )
+        load_time = time.perf_counter() - load_start
 
-        # Get media duration and start transcription
-        click.echo(f"Analyzing {'video' if is_video else 'audio'} file...")
+        # Create output directory if it doesn't exist
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
 
         try:
-            # First get duration without callback
-            segments, info = model.transcribe(
-                input_path,
-                beam_size=5,
-                word_timestamps=True,
-                condition_on_previous_text=True,
-                initial_prompt=None,
-            )
+            # Language detection and features run before the first segment
+            transcribe_start = time.perf_counter()
+            first_segment_latency = None
+            if chunk_seconds:
+                # Decode lazily per chunk; duration comes from the container header
+                segments = iter_chunked_segments(
+                    model,
+                    input_path,
+                    chunk_seconds,
+                    beam_size=beam_size,
+                    word_timestamps=True,
+                    condition_on_previous_text=True,
+                )
+                total_duration = get_audio_duration(input_path)
+            else:
+                # First get duration without callback
+                segments, info = model.transcribe(
+                    audio,
+                    beam_size=beam_size,
+                    word_timestamps=True,
+                    condition_on_previous_text=True,
+                    initial_prompt=None,
+                )
 
-            if not info or not hasattr(info, "duration"):
-                click.echo("Error: Could not determine media duration")
-                raise click.Abort()
+                if not info or not hasattr(info, "duration"):
+                    click.echo("Error: Could not determine media duration")
+                    raise click.Abort()
 
-            total_duration = info.duration
+                total_duration = info.duration
             click.echo(f"\nDuration: {total_duration:.2f} seconds")
             click.echo("Starting transcription...")
 
-            # Process segments with progress updates
-            segments_list = []
+            # Write each segment as it arrives so memory stays flat; flushed
+            # once a second so the output is readable mid-run and after a crash
             start_time = time.time()  # Move start_time here
             progress_callback = TranscriptionProgressCallback()
 
-            with progress_callback.progress:
-                for segment in segments:
-                    segments_list.append(segment)
-                    current_duration = segment.end
-                    progress_callback(current_duration, total_duration)
-
-            segments = segments_list  # Store processed segments
+            name = os.path.splitext(os.path.basename(output_path))[0]
+            with open(output_path, "w", encoding="utf-8") as f:
+                with get_writer(format, f, name=name, flush_interval=1.0) as writer:
+                    with progress_callback.progress:
+                        for segment in segments:
+                            if first_segment_latency is None:
+                                first_segment_latency = (
+                                    time.perf_counter() - transcribe_start
+                                )
+                            writer.write(segment)
+                            current_duration = segment.end
+                            progress_callback(current_duration, total_duration)
 
         except RuntimeError as e:
             if "Failed to load audio" in str(e):
@@ -298,24 +531,40 @@ def transcribe(input_path: str, output_path: str, model_size: str, format: str):
                 raise click.Abort()
             raise e
 
-        # Format and save output
-        click.echo("\nFormatting output...")
-        formatter = FORMATTERS[format]
-        output_text = formatter(segments)
-
-        # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-
-        # Write output with overwrite
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(output_text)
-
         # Show summary
         elapsed_time = time.time() - start_time  # Use local start_time
+        if write_peaks:
+            peaks_path = write_peaks_sidecar(
+                input_path, output_path, audio, source=source_path
+            )
+            click.echo(f"Waveform peaks saved to: {peaks_path}")
+        if write_preview:
+            from ..core.preview import build_preview
+
+            # From the original media, so its hash matches what the editor serves
+            try:
+                preview = build_preview(source_path)
+                click.echo(f"Preview saved to: {preview['path']}")
+            except (OSError, RuntimeError) as e:
+                click.echo(f"Warning: Preview not built: {str(e)}", err=True)
         click.echo("\nTranscription completed!")
         click.echo(f"Media duration: {total_duration:.2f} seconds")
         click.echo(f"Processing time: {elapsed_time:.2f} seconds")
         click.echo(f"Processing speed: {total_duration / elapsed_time:.2f}x realtime")
+        if decode_time:
+            click.echo(f"Audio decode time: {decode_time:.2f} seconds")
+        click.echo(f"Model load time: {load_time:.2f} seconds")
+        if first_segment_latency is not None:
+            click.echo(f"First segment after: {first_segment_latency:.2f} seconds")
+        click.echo(f"Peak memory: {peak_rss_mb():.0f}MB")
+        structlog.get_logger().info(
+            "transcription_timings",
+            model=model_size,
+            audio_decode=decode_time,
+            model_load=load_time,
+            first_segment=first_segment_latency,
+            total=elapsed_time,
+        )
         click.echo(f"Output saved to: {output_path}")
 
     except Exception as e:
@@ -0,0 +1,158 @@
+import os
+from pathlib import Path
+
+import click
+
+from ..core.models import SUPPORTED_MODELS, get_model_snapshot
+from ..core.system import detect_device, host_id
+from ..core.tuning import (
+    PROFILES_FILE,
+    candidate_configs,
+    default_thread_counts,
+    load_reference_text,
+    run_trial_isolated,
+    save_profile,
+    select_best,
+    supported_compute_types,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+DEFAULT_CLIP = str(DATA_DIR / "audio" / "log.mp3")
+DEFAULT_REFERENCE = str(DATA_DIR / "text" / "log.json")
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input",
+    "input_path",
+    default=DEFAULT_CLIP,
+    help="Reference audio clip (default: bundled log.mp3)",
+)
+@click.option(
+    "-r",
+    "--reference",
+    "reference_path",
+    default=DEFAULT_REFERENCE,
+    help="Reference transcript as JSON segments or text (default: bundled log.json)",
+)
+@click.option(
+    "--max-wer",
+    type=float,
+    default=0.2,
+    show_default=True,
+    help="Maximum word error rate against the reference",
+)
+@click.option(
+    "-m",
+    "--model",
+    "models",
+    multiple=True,
+    type=click.Choice(SUPPORTED_MODELS),
+    help="Model to sweep (repeatable, default: all downloaded models)",
+)
+@click.option(
+    "--compute-type",
+    "compute_types",
+    multiple=True,
+    help="Compute type to sweep (repeatable)",
+)
+@click.option(
+    "--cpu-threads", multiple=True, type=int, help="CPU thread count to sweep"
+)
+@click.option(
+    "--beam-size",
+    "beam_sizes",
+    multiple=True,
+    type=int,
+    default=(1, 5),
+    show_default=True,
+    help="Beam size to sweep",
+)
+@click.option(
+    "--save/--no-save",
+    default=True,
+    help="Persist the best configuration as this host's profile",
+)
+def tune(
+    input_path: str,
+    reference_path: str,
+    max_wer: float,
+    models: tuple,
+    compute_types: tuple,
+    cpu_threads: tuple,
+    beam_sizes: tuple,
+    save: bool,
+):
+    """Benchmark decoding configurations and pick the fastest acceptable one"""
+    for path in (input_path, reference_path):
+        if not os.path.exists(path):
+            click.echo(f"Error: File '{path}' not found", err=True)
+            raise click.Abort()
+
+    if not models:
+        models = tuple(m for m in SUPPORTED_MODELS if get_model_snapshot(m))
+    missing = [m for m in models if not get_model_snapshot(m)]
+    if missing or not models:
+        click.echo(
+            "Error: No downloaded model to tune. Please download one first using:"
+            if not models
+            else f"Error: Model(s) not downloaded: {', '.join(missing)}"
+        )
+        click.echo("python cli.py models download <model>")
+        raise click.Abort()
+
+    device = detect_device()
+    configs = list(
+        candidate_configs(
+            models=models,
+            device=device,
+            compute_types=compute_types or supported_compute_types(device),
+            cpu_threads=cpu_threads or default_thread_counts(device),
+            beam_sizes=beam_sizes,
+        )
+    )
+    reference_text = load_reference_text(reference_path)
+
+    click.echo(f"Using device: {device.upper()}")
+    click.echo(f"Sweeping {len(configs)} configurations on {input_path}\n")
+    header = (
+        f"{'Model':18} {'Compute':14} {'Threads':>7} {'Beam':>4}"
+        f" {'RTF':>7} {'WER':>6} {'Peak RSS':>10}"
+    )
+    click.echo(header)
+    click.echo("-" * len(header))
+
+    results = []
+    for config in configs:
+        result = run_trial_isolated(config, input_path, reference_text)
+        results.append(result)
+        row = (
+            f"{config.model:18} {config.compute_type:14} {config.cpu_threads:>7}"
+            f" {config.beam_size:>4}"
+        )
+        if result.error:
+            click.echo(f"{row} failed: {result.error}")
+        else:
+            click.echo(
+                f"{row} {result.realtime_factor:>7.3f} {result.wer:>6.3f}"
+                f" {result.peak_rss_mb:>8.0f}MB"
+            )
+
+    best = select_best(results, max_wer)
+    if best is None:
+        click.echo(f"\nNo configuration stayed within the WER budget of {max_wer}")
+        raise click.Abort()
+
+    config = best.config
+    click.echo(
+        f"\nBest: {config.model} {config.compute_type}, {config.cpu_threads} threads,"
+        f" beam {config.beam_size}"
+    )
+    click.echo(
+        f"Processing speed: {1 / best.realtime_factor:.2f}x realtime,"
+        f" WER {best.wer:.3f}, peak RSS {best.peak_rss_mb:.0f}MB"
+    )
+    if save:
+        save_profile(best, max_wer)
+        click.echo(f"Saved profile for host '{host_id()}' to {PROFILES_FILE}")
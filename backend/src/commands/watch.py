@@ -0,0 +1,169 @@
+import os
+import queue
+import time
+
+import click
+
+from ..core.formatters import WRITERS
+from ..core.models import SUPPORTED_MODELS, get_model_snapshot
+from ..core.prefetch import prefetch_model
+from ..core.system import detect_device
+from ..core.watcher import DirectoryWatcher, PollingWakeup, WatchStateDB
+from .transcribe import load_whisper_model, resolve_decoding_options, transcribe_to_file
+
+STATE_DB_NAME = ".aerolex-watch.sqlite"
+
+
+def output_path_for(input_path: str, output_dir: str, format: str) -> str:
+    """Output file named after the input, next to it or in output_dir"""
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    directory = output_dir or os.path.dirname(input_path)
+    return os.path.join(directory, f"{stem}.{format}")
+
+
+@click.command()
+@click.argument(
+    "directory", type=click.Path(exists=True, file_okay=False, resolve_path=True)
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(file_okay=False, resolve_path=True),
+    default=None,
+    help="Directory for transcripts (default: next to each input)",
+)
+@click.option(
+    "-m",
+    "--model",
+    "model_size",
+    type=click.Choice(SUPPORTED_MODELS),
+    default=None,
+    help="Whisper model size to use (default: tuned profile, else medium.en)",
+)
+@click.option(
+    "-f",
+    "--format",
+    type=click.Choice(list(WRITERS.keys())),
+    default="json",
+    help=f"Output format ({', '.join(WRITERS)})",
+)
+@click.option("--beam-size", type=int, default=None, help="Decoding beam size")
+@click.option(
+    "--profile/--no-profile",
+    "use_profile",
+    default=True,
+    help="Use this host's tuned profile for unset options (see 'tune')",
+)
+@click.option(
+    "--settle",
+    type=float,
+    default=5.0,
+    show_default=True,
+    help="Seconds a file's size must stay unchanged before it is picked up",
+)
+@click.option(
+    "--interval",
+    type=float,
+    default=2.0,
+    show_default=True,
+    help="Seconds between directory scans",
+)
+@click.option(
+    "--queue-size",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Files queued ahead of transcription before new ones are held back",
+)
+@click.option("--poll", is_flag=True, help="Disable inotify and only poll")
+@click.option("--once", is_flag=True, help="Process completed files and exit")
+def watch(
+    directory: str,
+    output_dir: str,
+    model_size: str,
+    format: str,
+    beam_size: int,
+    use_profile: bool,
+    settle: float,
+    interval: float,
+    queue_size: int,
+    poll: bool,
+    once: bool,
+):
+    """Watch DIRECTORY and transcribe new recordings as they complete"""
+    device = detect_device()
+    options = resolve_decoding_options(
+        device, model_size, beam_size=beam_size, use_profile=use_profile
+    )
+    model_size = options["model_size"]
+    if not get_model_snapshot(model_size):
+        click.echo(
+            f"Error: Model '{model_size}' not found. Please download it first using:"
+        )
+        click.echo(f"python cli.py models download {model_size}")
+        raise click.Abort()
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    state = WatchStateDB(os.path.join(output_dir or directory, STATE_DB_NAME))
+    jobs = queue.Queue(maxsize=queue_size)
+    watcher = DirectoryWatcher(
+        directory, jobs, state, settle=settle, interval=interval, polling=poll
+    )
+
+    # Keep one warm model for every file
+    prefetch_model(model_size)
+    click.echo(f"Loading model {model_size}...")
+    model = load_whisper_model(
+        model_size,
+        device,
+        options["compute_type"],
+        options["cpu_threads"],
+        options["num_workers"],
+    )
+
+    def process(input_path: str):
+        output_path = output_path_for(input_path, output_dir, format)
+        start_time = time.time()
+        try:
+            duration = transcribe_to_file(
+                model, input_path, output_path, format, options["beam_size"]
+            )
+            state.record(input_path, "done", output=output_path)
+            elapsed = time.time() - start_time
+            click.echo(
+                f"{os.path.basename(input_path)}: {duration:.0f}s of audio in "
+                f"{elapsed:.1f}s -> {output_path}"
+            )
+        except Exception as e:
+            # Recorded as failed so it is retried only once the file changes
+            state.record(input_path, "failed", error=str(e))
+            click.echo(f"Error transcribing {input_path}: {str(e)}", err=True)
+        finally:
+            watcher.done(input_path)
+
+    try:
+        if once:
+            watcher.scan()
+            while not jobs.empty():
+                while not jobs.empty():
+                    process(jobs.get())
+                watcher.scan()
+            return
+
+        mode = "polling" if isinstance(watcher.wakeup, PollingWakeup) else "inotify"
+        click.echo(f"Watching {directory} ({mode}), press Ctrl+C to stop")
+        watcher.start()
+        while True:
+            try:
+                input_path = jobs.get(timeout=interval)
+            except queue.Empty:
+                continue
+            process(input_path)
+            if watcher.deferred:
+                click.echo(f"Backlog: {watcher.deferred} file(s) waiting")
+    except KeyboardInterrupt:
+        click.echo("\nStopping watcher...")
+    finally:
+        watcher.stop()
+        state.close()
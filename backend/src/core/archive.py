@@ -0,0 +1,247 @@
+# Transcript archive - SQLite store with FTS5 search over segment text
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.core.readers import CONTAINER_FORMAT, detect_format, read_transcript
+
+ARCHIVE_DB = os.environ.get(
+    "WSCRIBE_ARCHIVE_DB", os.path.expanduser("~/.cache/aerolex/archive.sqlite")
+)
+# Formats worth indexing; subtitle copies of a transcript would only duplicate it
+INDEXED_FORMATS = ("json", "jsonl", "lbs", "tsv", CONTAINER_FORMAT)
+INSERT_BATCH = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    segments INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    speaker TEXT NOT NULL DEFAULT '',
+    listener TEXT NOT NULL DEFAULT '',
+    text TEXT NOT NULL,
+    pune TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS segments_file ON segments(file_id, start_ms);
+CREATE INDEX IF NOT EXISTS segments_speaker ON segments(speaker);
+CREATE INDEX IF NOT EXISTS segments_listener ON segments(listener);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, pune, content='segments', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_fts_insert AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text, pune) VALUES (new.id, new.text, new.pune);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_fts_delete AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text, pune)
+    VALUES ('delete', old.id, old.text, old.pune);
+END;
+"""
+
+
+@dataclass
+class SearchHit:
+    path: str
+    start_ms: int
+    end_ms: int
+    speaker: str
+    listener: str
+    text: str
+    pune: str
+    snippet: str
+    rank: float
+
+
+def fts_query(terms: str) -> str:
+    """Plain words to an FTS5 query matching all of them, in any order"""
+    tokens = re.findall(r"\w+", terms)
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+def list_archive_files(paths: Iterable[str]) -> Iterator[str]:
+    """Indexable transcripts under the given files and directories"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield os.path.abspath(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if not name.startswith(".") and detect_format(name) in INDEXED_FORMATS:
+                    yield os.path.abspath(os.path.join(root, name))
+
+
+class TranscriptArchive:
+    """
+    Segments of many transcripts in one SQLite file.
+
+    Rows carry file, start/end in ms, speaker, listener, text and the
+    standardized PUNE text of analysed .lbs/LLM JSON; both texts are in an
+    external-content FTS5 index. Files are re-read only when their size or
+    mtime changed.
+    """
+
+    def __init__(self, path: str = ARCHIVE_DB):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def is_current(self, path: str) -> bool:
+        stat = os.stat(path)
+        row = self.connection.execute(
+            "SELECT mtime_ns, size FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        return row is not None and tuple(row) == (stat.st_mtime_ns, stat.st_size)
+
+    def ingest(self, path: str, format: Optional[str] = None) -> int:
+        """(Re)index one transcript in a single transaction; returns segments"""
+        stat = os.stat(path)
+        rows = read_transcript(path, format)
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, mtime_ns, size, segments) "
+                "VALUES (?, ?, ?, 0)",
+                (path, stat.st_mtime_ns, stat.st_size),
+            ).lastrowid
+            count = 0
+            batch = []
+            for row in rows:
+                batch.append(
+                    (
+                        file_id,
+                        round(row["start"] * 1000),
+                        round(row["end"] * 1000),
+                        row.get("speaker") or "",
+                        row.get("listener") or "",
+                        row["text"].strip(),
+                        row.get("pune") or "",
+                    )
+                )
+                if len(batch) >= INSERT_BATCH:
+                    count += self._insert(batch)
+                    batch = []
+            count += self._insert(batch)
+            self.connection.execute(
+                "UPDATE files SET segments = ? WHERE id = ?", (count, file_id)
+            )
+        return count
+
+    def _insert(self, batch: List[Tuple]) -> int:
+        # Triggers keep the FTS index in step with the rows
+        self.connection.executemany(
+            "INSERT INTO segments (file_id, start_ms, end_ms, speaker, listener, "
+            "text, pune) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        return len(batch)
+
+    def remove(self, path: str):
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def remove_missing(self, root: str) -> int:
+        """Drop indexed files below root that no longer exist"""
+        prefix = os.path.join(os.path.abspath(root), "")
+        paths = [
+            path
+            for (path,) in self.connection.execute(
+                "SELECT path FROM files WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+            if not os.path.exists(path)
+        ]
+        for path in paths:
+            self.remove(path)
+        return len(paths)
+
+    def search(
+        self,
+        query: str,
+        speaker: Optional[str] = None,
+        listener: Optional[str] = None,
+        path: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        limit: int = 50,
+        raw: bool = False,
+    ) -> List[SearchHit]:
+        """
+        Best matches first. The query is a list of words unless raw, in which
+        case it is passed to FTS5 as is (phrases, OR, NEAR, prefix*).
+        start_ms/end_ms keep hits overlapping that time range.
+        """
+        match = query if raw else fts_query(query)
+        conditions = []
+        parameters = []
+        for column, value in (("s.speaker", speaker), ("s.listener", listener)):
+            if value:
+                conditions.append(f"{column} = ? COLLATE NOCASE")
+                parameters.append(value)
+        if path:
+            conditions.append("f.path LIKE ?")
+            parameters.append(f"%{path}%")
+        if start_ms is not None:
+            conditions.append("s.end_ms >= ?")
+            parameters.append(start_ms)
+        if end_ms is not None:
+            conditions.append("s.start_ms <= ?")
+            parameters.append(end_ms)
+
+        if match:
+            conditions.insert(0, "segments_fts MATCH ?")
+            parameters.insert(0, match)
+            sql = f"""
+                SELECT f.path, s.start_ms, s.end_ms, s.speaker, s.listener,
+                       s.text, s.pune,
+                       snippet(segments_fts, -1, '[', ']', '…', 12),
+                       bm25(segments_fts)
+                FROM segments_fts
+                JOIN segments s ON s.id = segments_fts.rowid
+                JOIN files f ON f.id = s.file_id
+                WHERE {" AND ".join(conditions)}
+                ORDER BY bm25(segments_fts), f.path, s.start_ms
+                LIMIT ?
+            """
+        else:
+            # No words: filter only, in archive order
+            sql = f"""
+                SELECT f.path, s.start_ms, s.end_ms, s.speaker, s.listener,
+                       s.text, s.pune, s.text, 0.0
+                FROM segments s
+                JOIN files f ON f.id = s.file_id
+                WHERE {" AND ".join(conditions) or "1"}
+                ORDER BY f.path, s.start_ms
+                LIMIT ?
+            """
+        parameters.append(limit)
+        return [SearchHit(*row) for row in self.connection.execute(sql, parameters)]
+
+    def stats(self) -> Tuple[int, int]:
+        files, segments = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(segments), 0) FROM files"
+        ).fetchone()
+        return files, segments
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,4 +1,6 @@
 # Renamed from sources.py - handles audio processing
+from typing import Iterator, Tuple
+
 import numpy as np
 import soundfile as sf
 
@@ -7,7 +9,7 @@ def decode_audio(path: str, sampling_rate: int = 16000) -> np.ndarray:
     """
     Decode audio file to numpy array
     """
-    audio, sr = sf.read(path)
+    audio, sr = sf.read(path, dtype="float32")
     # Convert stereo to mono if needed
     if len(audio.shape) > 1:
         audio = audio.mean(axis=1)
@@ -18,6 +20,57 @@ def decode_audio(path: str, sampling_rate: int = 16000) -> np.ndarray:
     return audio
 
 
+def get_audio_duration(path: str) -> float:
+    """Media duration in seconds from the container header, without decoding"""
+    import av
+
+    with av.open(path, mode="r", metadata_errors="ignore") as container:
+        if container.duration is None:
+            return 0.0
+        return container.duration / av.time_base
+
+
+def iter_audio_chunks(
+    path: str, chunk_seconds: float, sampling_rate: int = 16000
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Decode audio incrementally as mono float32 chunks of `chunk_seconds`.
+
+    Yields (offset_seconds, samples) so only one chunk is held in memory.
+    """
+    import av
+
+    chunk_size = int(chunk_seconds * sampling_rate)
+    resampler = av.audio.resampler.AudioResampler(
+        format="s16", layout="mono", rate=sampling_rate
+    )
+    pending = []
+    pending_size = 0
+    offset = 0
+
+    with av.open(path, mode="r", metadata_errors="ignore") as container:
+        for frame in container.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                samples = resampled.to_ndarray().reshape(-1)
+                pending.append(samples)
+                pending_size += len(samples)
+            while pending_size >= chunk_size:
+                buffer = np.concatenate(pending)
+                chunk = buffer[:chunk_size].astype(np.float32) / 32768.0
+                yield offset / sampling_rate, chunk
+                offset += chunk_size
+                pending = [buffer[chunk_size:]]
+                pending_size = len(pending[0])
+
+        for resampled in resampler.resample(None):
+            pending.append(resampled.to_ndarray().reshape(-1))
+
+    if pending:
+        buffer = np.concatenate(pending)
+        if len(buffer):
+            yield offset / sampling_rate, buffer.astype(np.float32) / 32768.0
+
+
 class AudioLoader:  # Renamed from LocalAudio for clarity
     def __init__(self, source: str, sampling_rate: int = 16000):
         self.source_path = source
@@ -0,0 +1,91 @@
+# Memory budget planning for transcription on small nodes
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from src.core.models import MODEL_SIZES, get_model_snapshot
+
+# Interpreter, CTranslate2 runtime and tokenizer before any model weights
+RUNTIME_OVERHEAD_MB = 350
+# Decoded float32 audio plus feature extraction intermediates per audio second
+AUDIO_MB_PER_SECOND = 0.35
+# Chunks are whole multiples of Whisper's 30 second window
+WINDOW_SECONDS = 30
+MAX_CHUNK_SECONDS = 600
+
+# In-memory weight size relative to the float16 checkpoint in MODEL_SIZES
+COMPUTE_TYPE_SCALE = {
+    "float32": 2.0,
+    "float16": 1.0,
+    "bfloat16": 1.0,
+    "int8_float32": 0.5,
+    "int8_float16": 0.5,
+    "int8_bfloat16": 0.5,
+    "int8": 0.5,
+}
+
+
+@dataclass
+class MemoryPlan:
+    model: str
+    compute_type: str
+    chunk_seconds: int
+    estimated_mb: float
+
+
+def parse_memory_size(value: str) -> int:
+    """Parse sizes such as '2G', '1500M' or '1500' (MB) into megabytes"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*", value.lower())
+    if not match:
+        raise ValueError(f"Invalid memory size: {value}")
+    number, unit = float(match.group(1)), match.group(2) or "m"
+    scale = {"k": 1 / 1024, "m": 1, "g": 1024, "t": 1024 * 1024}[unit]
+    return int(number * scale)
+
+
+def estimate_model_mb(model: str, compute_type: str) -> float:
+    """Approximate resident size of a model's weights for a compute type"""
+    return MODEL_SIZES[model] * COMPUTE_TYPE_SCALE.get(compute_type, 1.0)
+
+
+def fallback_models(model: str) -> List[str]:
+    """The model followed by smaller downloaded models of the same language family"""
+    english_only = model.endswith(".en")
+    smaller = sorted(
+        (
+            m
+            for m in MODEL_SIZES
+            if m.endswith(".en") == english_only
+            and MODEL_SIZES[m] < MODEL_SIZES[model]
+            and get_model_snapshot(m)
+        ),
+        key=lambda m: MODEL_SIZES[m],
+        reverse=True,
+    )
+    return [model] + smaller
+
+
+def plan_memory(budget_mb: int, model: str, compute_type: str) -> Optional[MemoryPlan]:
+    """
+    Pick the largest model/compute type that fits the budget with at least one
+    Whisper window of audio, then spend what is left on a longer chunk.
+    """
+    compute_types = [compute_type] + [ct for ct in ("int8",) if ct != compute_type]
+    for candidate in fallback_models(model):
+        for candidate_type in compute_types:
+            fixed_mb = RUNTIME_OVERHEAD_MB + estimate_model_mb(
+                candidate, candidate_type
+            )
+            audio_mb = budget_mb - fixed_mb
+            chunk_seconds = int(audio_mb / AUDIO_MB_PER_SECOND)
+            chunk_seconds -= chunk_seconds % WINDOW_SECONDS
+            if chunk_seconds < WINDOW_SECONDS:
+                continue
+            chunk_seconds = min(chunk_seconds, MAX_CHUNK_SECONDS)
+            return MemoryPlan(
+                model=candidate,
+                compute_type=candidate_type,
+                chunk_seconds=chunk_seconds,
+                estimated_mb=round(fixed_mb + chunk_seconds * AUDIO_MB_PER_SECOND),
+            )
+    return None
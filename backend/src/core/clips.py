@@ -0,0 +1,156 @@
+# Segment clips - one decode of the source, every segment cut from it
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.models import TranscribedData
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 30
+PADDING_SECONDS = 0.25
+MANIFEST_FILE = "manifest.json"
+# soundfile format per clip extension
+CLIP_FORMATS = {"wav": "WAV", "flac": "FLAC", "ogg": "OGG"}
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+def clip_id(row: TranscribedData) -> str:
+    """The .lbs header id when there is one, else the start in milliseconds"""
+    return row.get("id") or f"segment-{round(row['start'] * 1000):09d}"
+
+
+def clip_spans(
+    rows: Iterable[TranscribedData], padding: float, sample_rate: int
+) -> Tuple[List[TranscribedData], np.ndarray, np.ndarray]:
+    """Rows with their padded [first, last) sample spans, in start order"""
+    rows = sorted(rows, key=lambda row: row["start"])
+    starts = np.array([row["start"] for row in rows], dtype=np.float64)
+    ends = np.array([row["end"] for row in rows], dtype=np.float64)
+    first = np.floor(np.maximum(starts - padding, 0) * sample_rate).astype(np.int64)
+    last = np.ceil((ends + padding) * sample_rate).astype(np.int64)
+    return rows, first, np.maximum(last, first)
+
+
+def _cut(pieces: List[Tuple[int, np.ndarray]], start: int, stop: int) -> np.ndarray:
+    """Samples [start, stop) from the kept chunks, as far as they reach"""
+    parts = [
+        samples[max(start - offset, 0) : max(stop - offset, 0)]
+        for offset, samples in pieces
+        if offset < stop and offset + len(samples) > start
+    ]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+
+
+def iter_clips(
+    chunks: Iterable[Tuple[float, np.ndarray]], first: np.ndarray, last: np.ndarray
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    (span, samples) for every span, cut from one pass over the audio.
+
+    Spans must be sorted by first sample. Only the chunks from the earliest
+    span not yet cut are kept, and joined only when a span is cut, so memory
+    and copying follow the longest span rather than the recording. Spans
+    running past the end of the audio are cut short.
+    """
+    done = np.zeros(len(first), dtype=bool)
+    next_open = 0  # Spans before this one are all done
+    pieces: List[Tuple[int, np.ndarray]] = []  # (first sample, samples)
+    decoded = 0
+    for _, samples in chunks:
+        pieces.append((decoded, samples))
+        decoded += len(samples)
+        ready = np.flatnonzero(~done[next_open:] & (last[next_open:] <= decoded))
+        for span in (ready + next_open).tolist():
+            yield span, _cut(pieces, first[span], last[span])
+            done[span] = True
+        while next_open < len(first) and done[next_open]:
+            next_open += 1
+        keep_from = first[next_open] if next_open < len(first) else decoded
+        pieces = [
+            (offset, samples)
+            for offset, samples in pieces
+            if offset + len(samples) > keep_from
+        ]
+    for span in np.flatnonzero(~done).tolist():
+        yield span, _cut(pieces, min(first[span], decoded), last[span])
+
+
+def _write_clip(path: str, samples: np.ndarray, sample_rate: int, format: str):
+    import soundfile as sf
+
+    sf.write(path, samples, sample_rate, format=CLIP_FORMATS[format])
+
+
+def extract_clips(
+    chunks: Iterable[Tuple[float, np.ndarray]],
+    rows: Iterable[TranscribedData],
+    output_dir: str,
+    format: str = "wav",
+    padding: float = PADDING_SECONDS,
+    sample_rate: int = SAMPLE_RATE,
+    jobs: int = 1,
+    metadata: Optional[Dict] = None,
+) -> Dict:
+    """
+    Write one clip per row from a single pass over the decoded audio, with
+    the encoding spread over worker threads, and a manifest linking each
+    segment id to its clip. Returns the manifest.
+    """
+    rows, first, last = clip_spans(rows, padding, sample_rate)
+    os.makedirs(output_dir, exist_ok=True)
+    names = {}
+    entries = []
+    for index, row in enumerate(rows):
+        identifier = clip_id(row)
+        name = _UNSAFE.sub("_", identifier)
+        # Repeated ids (e.g. the same header twice) still get their own file
+        names[name] = names.get(name, 0) + 1
+        if names[name] > 1:
+            name = f"{name}-{names[name]}"
+        entry = {
+            "id": identifier,
+            "file": f"{name}.{format}",
+            "start": row["start"],
+            "end": row["end"],
+            "clip_start": int(first[index]) / sample_rate,
+            "clip_end": None,
+            "text": row["text"].strip(),
+        }
+        for key in ("speaker", "listener", "pune"):
+            if row.get(key):
+                entry[key] = row[key]
+        entries.append(entry)
+
+    # Bound the clips waiting for a worker so memory stays flat
+    in_flight = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for span, samples in iter_clips(chunks, first, last):
+            entry = entries[span]
+            # Cut short when the transcript runs past the end of the audio
+            entry["clip_end"] = entry["clip_start"] + len(samples) / sample_rate
+            path = os.path.join(output_dir, entry["file"])
+            in_flight.append(
+                executor.submit(_write_clip, path, samples, sample_rate, format)
+            )
+            if len(in_flight) >= jobs * 4:
+                in_flight.pop(0).result()
+        for future in in_flight:
+            future.result()
+
+    manifest = {
+        **(metadata or {}),
+        "sample_rate": sample_rate,
+        "padding": padding,
+        "format": format,
+        "clips": entries,
+    }
+    fd, partial_path = tempfile.mkstemp(dir=output_dir, suffix=".part")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(partial_path, os.path.join(output_dir, MANIFEST_FILE))
+    return manifest
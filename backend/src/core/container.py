@@ -0,0 +1,264 @@
+# Binary transcript container - header plus raw columns, memory-mappable
+import json
+import mmap
+import os
+import struct
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.core.transcript import TABLE_COLUMNS, TranscriptTable
+
+CONTAINER_EXTENSION = ".alx"
+MAGIC = b"ALXTRNS\x00"
+VERSION = 1
+# Columns start on 64-byte boundaries so they can be viewed in place
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sHxxxxxxQ")  # magic, version, header length
+# Span columns that address the text buffer; stored as UTF-8 byte spans
+_SPANS = (
+    ("segment_text_offset", "segment_text_length"),
+    ("word_text_offset", "word_text_length"),
+)
+
+
+def _utf8_char_offsets(text: str) -> Optional[np.ndarray]:
+    """Byte offset of every character (plus the end), None for ASCII text"""
+    if text.isascii():
+        return None
+    code_points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    widths = (
+        1 + (code_points >= 0x80) + (code_points >= 0x800) + (code_points >= 0x10000)
+    )
+    return np.concatenate([[0], np.cumsum(widths, dtype=np.int64)])
+
+
+def _zstandard(compression: str):
+    if compression != "zstd":
+        raise ValueError(f"Unsupported compression: {compression}")
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression needs the 'zstandard' package")
+    return zstandard
+
+
+def write_arrays(
+    path: str,
+    magic: bytes,
+    header: Dict,
+    arrays: Dict[str, np.ndarray],
+    compress: Optional[Callable[[bytes], bytes]] = None,
+):
+    """
+    Atomically write a preamble, a JSON header and aligned raw arrays.
+
+    The header gains a "columns" index of each array's offset, size, dtype,
+    element count and, past one dimension, shape; its "version" is repeated
+    in the preamble.
+    """
+    payloads = []
+    column_index = {}
+    position = 0
+    for name, values in arrays.items():
+        # Uncompressed arrays are written from their buffer, so np.memmap
+        # arrays are copied through the page cache rather than loaded
+        data = np.ascontiguousarray(values)
+        if compress is not None:
+            data = compress(data.tobytes())
+        column_index[name] = {
+            "offset": position,
+            "size": data.nbytes if compress is None else len(data),
+            "dtype": values.dtype.str,
+            "length": values.size,
+        }
+        if values.ndim > 1:
+            column_index[name]["shape"] = list(values.shape)
+        payloads.append(data)
+        position += column_index[name]["size"]
+        position += -position % ALIGNMENT
+
+    version = header["version"]
+    header = json.dumps({**header, "columns": column_index}).encode("utf-8")
+    data_start = _PREAMBLE.size + len(header)
+    data_start += -data_start % ALIGNMENT
+
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_PREAMBLE.pack(magic, version, len(header)))
+            f.write(header)
+            for name, data in zip(column_index, payloads):
+                f.seek(data_start + column_index[name]["offset"])
+                f.write(data)
+            # Trailing empty columns still need their offsets inside the file
+            f.truncate(data_start + position)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class MappedArrays:
+    """Memory-mapped file written by write_arrays; arrays are read lazily"""
+
+    magic = MAGIC
+    version = VERSION
+    description = "transcript container"
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(self._map)
+        if magic != self.magic:
+            self._map.close()
+            raise ValueError(f"{path} is not a {self.description}")
+        if version > self.version:
+            self._map.close()
+            raise ValueError(f"{path} uses unsupported {self.description} version")
+        header_end = _PREAMBLE.size + header_length
+        self.header = json.loads(self._map[_PREAMBLE.size : header_end])
+        self._data_start = header_end + (-header_end % ALIGNMENT)
+
+    def raw_column(self, name: str) -> memoryview:
+        """Stored bytes of one array"""
+        info = self.header["columns"][name]
+        start = self._data_start + info["offset"]
+        return memoryview(self._map)[start : start + info["size"]]
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one array"""
+        info = self.header["columns"][name]
+        values = np.frombuffer(
+            self._map,
+            dtype=info["dtype"],
+            count=info["length"],
+            offset=self._data_start + info["offset"],
+        )
+        return values.reshape(info["shape"]) if "shape" in info else values
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # Columns handed out still reference the map; it closes with them
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def write_container(
+    path: str,
+    table: TranscriptTable,
+    metadata: Optional[Dict] = None,
+    compression: Optional[str] = None,
+    level: int = 3,
+):
+    """
+    Write a table as a header followed by one raw column per array.
+
+    With compression="zstd" each column is compressed on its own, so readers
+    still only decode the columns they ask for.
+    """
+    compressor = None
+    if compression is not None:
+        compressor = _zstandard(compression).ZstdCompressor(level=level)
+    columns = {name: getattr(table, name) for name in TABLE_COLUMNS}
+    text = table.text.encode("utf-8")
+    char_offsets = _utf8_char_offsets(table.text)
+    if char_offsets is not None:
+        for offset_name, length_name in _SPANS:
+            offsets = columns[offset_name]
+            ends = char_offsets[offsets + columns[length_name]]
+            columns[offset_name] = char_offsets[offsets]
+            columns[length_name] = ends - columns[offset_name]
+    columns["text"] = np.frombuffer(text, dtype=np.uint8)
+
+    write_arrays(
+        path,
+        MAGIC,
+        {
+            "version": VERSION,
+            "compression": compression,
+            "segments": len(table),
+            "words": table.word_count,
+            "metadata": metadata or {},
+        },
+        columns,
+        compress=compressor.compress if compressor is not None else None,
+    )
+
+
+class TranscriptFile(MappedArrays):
+    """
+    Read access to a container without loading it.
+
+    Uncompressed columns are zero-copy views of a read-only memory map, so only
+    the pages of columns that are actually used are read from disk.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._decompressor = None
+        if self.header["compression"]:
+            zstandard = _zstandard(self.header["compression"])
+            self._decompressor = zstandard.ZstdDecompressor()
+
+    @property
+    def metadata(self) -> Dict:
+        return self.header["metadata"]
+
+    @property
+    def segment_count(self) -> int:
+        return self.header["segments"]
+
+    @property
+    def word_count(self) -> int:
+        return self.header["words"]
+
+    def column(self, name: str) -> np.ndarray:
+        if self._decompressor is None:
+            return super().column(name)
+        info = self.header["columns"][name]
+        data = self._decompressor.decompress(self.raw_column(name))
+        return np.frombuffer(data, dtype=info["dtype"], count=info["length"])
+
+    def segment_texts(self) -> List[str]:
+        """Segment text only; word columns are never read"""
+        text = memoryview(self.column("text"))
+        offsets = self.column("segment_text_offset").tolist()
+        lengths = self.column("segment_text_length").tolist()
+        return [
+            str(text[offset : offset + length], "utf-8")
+            for offset, length in zip(offsets, lengths)
+        ]
+
+    def to_table(self, copy: bool = True) -> TranscriptTable:
+        """Full table; with copy=False columns stay views of the open file"""
+        raw = self.column("text").tobytes()
+        text = raw.decode("utf-8")
+        columns = {name: self.column(name) for name in TABLE_COLUMNS}
+        if len(raw) != len(text):
+            # Map the stored byte spans back to character spans
+            char_offsets = _utf8_char_offsets(text)
+            for offset_name, length_name in _SPANS:
+                offsets = columns[offset_name]
+                ends = np.searchsorted(char_offsets, offsets + columns[length_name])
+                columns[offset_name] = np.searchsorted(char_offsets, offsets)
+                columns[length_name] = ends - columns[offset_name]
+        if copy:
+            # Copy out of the map so the table outlives this file
+            columns = {name: np.array(values) for name, values in columns.items()}
+        return TranscriptTable(text=text, **columns)
+
+
+def read_container(path: str) -> TranscriptTable:
+    with TranscriptFile(path) as transcript:
+        return transcript.to_table()
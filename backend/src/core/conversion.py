@@ -0,0 +1,138 @@
+# Transcript format conversion - reader registry in, writer registry out
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.core.formatters import WRITERS, get_writer
+from src.core.models import TranscribedData
+from src.core.readers import CONTAINER_FORMAT, READERS, read_transcript
+
+OUTPUT_FORMATS = sorted(set(WRITERS) | {CONTAINER_FORMAT})
+# Source hashes of converted outputs, kept at the root of the output tree
+STATE_FILE = ".aerolex-convert.json"
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_transcripts(directory: str, exclude_format: str) -> List[str]:
+    """Readable transcripts below a directory, relative to it"""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            extension = os.path.splitext(name)[1].lower().lstrip(".")
+            if name.startswith(".") or extension == exclude_format:
+                continue
+            if extension in READERS:
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(found)
+
+
+def is_newer(input_path: str, output_path: str) -> bool:
+    return os.path.exists(output_path) and os.path.getmtime(
+        output_path
+    ) >= os.path.getmtime(input_path)
+
+
+def convert_file(
+    input_path: str,
+    output_path: str,
+    output_format: str,
+    input_format: Optional[str] = None,
+    source_hash: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Dict:
+    """
+    Stream one transcript into another format, optionally only the segments
+    overlapping the start/end window in seconds.
+
+    With source_hash (the input's hash at the last conversion) the input is
+    hashed first and the conversion skipped when unchanged. Returns the
+    input's hash, whether it was skipped and the number of segments written.
+    """
+    digest = file_digest(input_path) if source_hash is not None else None
+    if digest is not None and digest == source_hash and os.path.exists(output_path):
+        return {"skipped": True, "hash": digest, "segments": 0}
+
+    rows = read_transcript(input_path, input_format, start, end)
+    segments = write_rows(
+        rows, output_path, output_format, source=os.path.basename(input_path)
+    )
+    return {"skipped": False, "hash": digest, "segments": segments}
+
+
+def write_rows(
+    rows: Iterable[TranscribedData],
+    output_path: str,
+    output_format: str,
+    source: Optional[str] = None,
+) -> int:
+    """Write rows atomically in one output format; returns the segment count"""
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    if output_format == CONTAINER_FORMAT:
+        from src.core.container import write_container
+        from src.core.transcript import TranscriptTable
+
+        # Columns are compact enough to build fully; the write is atomic
+        table = TranscriptTable.from_dicts(rows)
+        write_container(
+            output_path,
+            table,
+            metadata={"source": source or os.path.basename(output_path)},
+        )
+        return len(table)
+
+    fd, partial_path = tempfile.mkstemp(
+        dir=output_dir, prefix=f".{os.path.basename(output_path)}.", suffix=".part"
+    )
+    name = os.path.splitext(os.path.basename(output_path))[0]
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", buffering=1 << 20) as f:
+            with get_writer(output_format, f, name=name) as writer:
+                writer.write_all(rows)
+        os.replace(partial_path, output_path)
+    except BaseException:
+        os.unlink(partial_path)
+        raise
+    return writer.count
+
+
+def load_state(output_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(output_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(output_dir: str, state: Dict[str, str]):
+    path = os.path.join(output_dir, STATE_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def plan_conversions(
+    input_dir: str, output_dir: str, output_format: str
+) -> List[Tuple[str, str, str]]:
+    """(relative input, input path, output path) for every convertible file"""
+    extension = "." + output_format
+    return [
+        (
+            relative_path,
+            os.path.join(input_dir, relative_path),
+            os.path.join(output_dir, os.path.splitext(relative_path)[0] + extension),
+        )
+        for relative_path in list_transcripts(input_dir, output_format)
+    ]
@@ -0,0 +1,130 @@
+# Editor bundle - a transcript laid out the way the web editor consumes it
+import json
+import os
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List
+
+import numpy as np
+
+from src.core.formatters import format_timestamp
+from src.core.transcript import TranscriptTable
+
+BUNDLE_TYPE = "aerolex-editor-bundle"
+BUNDLE_VERSION = 1
+# Segments per transcript group, as in subtitleToTranscriptGroups
+GROUP_SIZE = 10
+
+
+def to_ms(seconds: np.ndarray) -> np.ndarray:
+    return np.rint(np.asarray(seconds, dtype=np.float64) * 1000).astype(np.int64)
+
+
+def round_score(value: float) -> float:
+    """Number.toFixed(2): the exact binary value, ties rounded away from zero"""
+    return float(Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def sort_segments(table: TranscriptTable) -> np.ndarray:
+    """Stable start-time order of the segments"""
+    return np.argsort(to_ms(table.segment_start), kind="stable")
+
+
+def verify_order(start_ms: np.ndarray, end_ms: np.ndarray):
+    """
+    The editor's verifyInputOrder, over every segment: each segment ends no
+    earlier than it starts and no later than the next one starts.
+    """
+    reversed_segments = np.flatnonzero(start_ms > end_ms)
+    if len(reversed_segments):
+        i = int(reversed_segments[0])
+        raise ValueError(
+            f"Segment {i + 1} ends before it starts "
+            f"({format_timestamp(start_ms[i] / 1000)} > "
+            f"{format_timestamp(end_ms[i] / 1000)})"
+        )
+    overlaps = np.flatnonzero(end_ms[:-1] > start_ms[1:])
+    if len(overlaps):
+        i = int(overlaps[0])
+        raise ValueError(
+            f"Segment {i + 1} overlaps the next one "
+            f"(ends {format_timestamp(end_ms[i] / 1000)}, next starts "
+            f"{format_timestamp(start_ms[i + 1] / 1000)})"
+        )
+
+
+def group_columns(
+    texts: List[str], start_ms: np.ndarray, end_ms: np.ndarray, scores: np.ndarray
+) -> Dict[str, list]:
+    """Transcript groups of GROUP_SIZE consecutive segments"""
+    count = len(texts)
+    firsts = np.arange(0, count, GROUP_SIZE)
+    lasts = np.minimum(firsts + GROUP_SIZE, count) - 1
+    # Sum in segment order, like the editor's reduce, so means match exactly
+    sums = np.zeros(len(firsts))
+    for k in range(GROUP_SIZE):
+        column = scores[k::GROUP_SIZE]
+        sums[: len(column)] += column
+    means = sums / (lasts - firsts + 1)
+    return {
+        "start": start_ms[firsts].tolist(),
+        "end": end_ms[lasts].tolist(),
+        "score": [round_score(mean) for mean in means.tolist()],
+        "text": [
+            " ".join(texts[first : first + GROUP_SIZE]).strip()
+            for first in firsts.tolist()
+        ],
+    }
+
+
+def build_editor_bundle(table: TranscriptTable) -> Dict:
+    """
+    Columnar bundle with integer-millisecond times, validated and ordered.
+
+    Word rows of segment i are words[segments.words[i]:segments.words[i + 1]];
+    group g spans segments g * groupSize up to (g + 1) * groupSize and the
+    words in between.
+    """
+    order = sort_segments(table)
+    start_ms = to_ms(table.segment_start)[order]
+    end_ms = to_ms(table.segment_end)[order]
+    verify_order(start_ms, end_ms)
+
+    # Carry each segment's word rows along with it
+    offsets = table.word_offsets
+    lengths = np.diff(offsets)[order]
+    word_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=word_offsets[1:])
+    word_order = np.repeat(offsets[:-1][order] - word_offsets[:-1], lengths)
+    word_order += np.arange(len(word_order), dtype=np.int64)
+
+    texts = [table.segment_text(i) for i in order.tolist()]
+    scores = table.segment_score[order]
+    return {
+        "type": BUNDLE_TYPE,
+        "version": BUNDLE_VERSION,
+        "groupSize": GROUP_SIZE,
+        "segments": {
+            "start": start_ms.tolist(),
+            "end": end_ms.tolist(),
+            "score": scores.tolist(),
+            "text": texts,
+            "words": word_offsets.tolist(),
+        },
+        "words": {
+            "start": to_ms(table.word_start)[word_order].tolist(),
+            "end": to_ms(table.word_end)[word_order].tolist(),
+            "score": table.word_score[word_order].tolist(),
+            "text": [table.word_text(i) for i in word_order.tolist()],
+        },
+        "groups": group_columns(texts, start_ms, end_ms, scores),
+    }
+
+
+def write_editor_bundle(table: TranscriptTable, path: str) -> Dict:
+    """Write the bundle as compact JSON, atomically; returns the bundle"""
+    bundle = build_editor_bundle(table)
+    partial_path = f"{path}.part"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(bundle, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(partial_path, path)
+    return bundle
@@ -0,0 +1,668 @@
+# Editor data server - audio by byte range, transcripts by time window, sidecars
+import gzip
+import hashlib
+import json
+import math
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.core.edits import EditableTranscript, EditConflict, EditLogError
+from src.core.formatters import parse_time
+from src.core.peaks import PEAKS_EXTENSION, PeaksFile
+from src.core.preview import PREVIEW_DIR, find_preview
+from src.core.readers import CONTAINER_FORMAT, READERS, detect_format
+from src.core.spectrogram import SPECTROGRAM_EXTENSION, SpectrogramFile
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".m4a", ".ogg", ".opus", ".aac")
+BUNDLE_SUFFIX = ".editor.json"
+COPY_CHUNK_SIZE = 1 << 20
+# Larger responses are never gzipped; audio is already compressed anyway
+GZIP_MAX_SIZE = 32 << 20
+GZIP_MIN_SIZE = 1024
+GZIP_CACHE_BYTES = 64 << 20
+OPEN_FILES = 16
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 2000
+MAX_PATCH_SIZE = 16 << 20
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/octet-stream")
+
+for extension, content_type in (
+    (".lbs", "text/plain"),
+    (".opus", "audio/ogg"),
+    (".vtt", "text/vtt"),
+    (".jsonl", "application/json"),
+    (f".{CONTAINER_FORMAT}", "application/octet-stream"),
+    (PEAKS_EXTENSION, "application/octet-stream"),
+    (SPECTROGRAM_EXTENSION, "application/octet-stream"),
+):
+    mimetypes.add_type(content_type, extension)
+
+
+class RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single byte range as an inclusive (first, last), or None to send the whole
+    file (no header, or several ranges). Raises RequestError when the range
+    cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length or not size:
+            raise RequestError(
+                HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, "Empty range"
+            )
+        return max(0, size - length), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or last < first:
+        raise RequestError(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, "Bad range")
+    return first, last
+
+
+def file_etag(path: str, stat: os.stat_result) -> str:
+    """
+    ETag of a resolved file: its path (hashed) as well as its mtime and size,
+    since two files can share those and the ETag also keys the gzip cache
+    """
+    path_hash = hashlib.sha1(path.encode("utf-8", "surrogateescape")).hexdigest()
+    return f'"{path_hash[:12]}-{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def derived_etag(path: str, stat: os.stat_result, *parts) -> str:
+    """ETag of a response computed from a file, changing with it and the query"""
+    key = "|".join([file_etag(path, stat), *map(str, parts)])
+    return f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match check; weak comparison, gzip variants included"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags or _gzip_etag(etag) in tags
+
+
+def _gzip_etag(etag: str) -> str:
+    return etag[:-1] + '-gz"'
+
+
+class _LRU:
+    """Small thread-safe LRU; evicted values are closed if they can be"""
+
+    def __init__(self, max_items: int = OPEN_FILES, max_bytes: Optional[int] = None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value, size: int = 0):
+        with self._lock:
+            if key in self._items:
+                self._discard(self._items.pop(key))
+            self._items[key] = value
+            self.bytes += size
+            while len(self._items) > self.max_items or (
+                self.max_bytes is not None
+                and self.bytes > self.max_bytes
+                and len(self._items) > 1
+            ):
+                self._discard(self._items.popitem(last=False)[1])
+
+    def _discard(self, value):
+        if isinstance(value, bytes):
+            self.bytes -= len(value)
+        elif hasattr(value, "close"):
+            value.close()
+
+
+class EditorData:
+    """
+    Files under one root, shaped for the web editor.
+
+    Transcripts are parsed once, kept current with their edit logs and paged
+    through their interval index; peaks and spectrogram sidecars stay memory mapped, so
+    only the part of a recording on screen is read and sent.
+    """
+
+    def __init__(self, root: str, preview_dir: str = PREVIEW_DIR):
+        self.root = os.path.realpath(root)
+        self.preview_dir = preview_dir
+        self._transcripts = _LRU()
+        self._lock = threading.Lock()
+        self._sidecars = _LRU()
+        self.gzip_cache = _LRU(max_items=1024, max_bytes=GZIP_CACHE_BYTES)
+
+    def resolve(self, relative_path: str) -> Tuple[str, os.stat_result]:
+        """Absolute path of a file below the root; never outside it"""
+        path = os.path.realpath(os.path.join(self.root, unquote(relative_path)))
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise RequestError(HTTPStatus.FORBIDDEN, "Outside the served directory")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"No such file: {relative_path}")
+        if not os.path.isfile(path):
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Not a file: {relative_path}")
+        return path, stat
+
+    def media(self) -> List[Dict]:
+        """Audio files with the transcripts and sidecars sharing their name"""
+        entries = []
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            names = set(files)
+            for name in sorted(files):
+                stem, extension = os.path.splitext(name)
+                if extension.lower() not in AUDIO_EXTENSIONS:
+                    continue
+                relative = os.path.relpath(directory, self.root)
+
+                def sibling(file_name: str) -> Optional[str]:
+                    if file_name not in names:
+                        return None
+                    return os.path.normpath(os.path.join(relative, file_name))
+
+                entries.append(
+                    {
+                        "audio": sibling(name),
+                        "transcripts": [
+                            sibling(stem + f".{format}")
+                            for format in sorted(READERS)
+                            if stem + f".{format}" in names
+                        ],
+                        "bundle": sibling(stem + BUNDLE_SUFFIX),
+                        "peaks": sibling(stem + PEAKS_EXTENSION)
+                        or sibling(stem + PEAKS_EXTENSION + ".json"),
+                        "spectrogram": sibling(stem + SPECTROGRAM_EXTENSION),
+                        "preview": find_preview(
+                            os.path.join(directory, name), self.preview_dir
+                        )
+                        is not None,
+                    }
+                )
+        return entries
+
+    def transcript(self, path: str) -> EditableTranscript:
+        """
+        One shared editable transcript per path, so every request sees the
+        logged edits; reloaded when the file or its log is changed by another
+        process, such as a CLI edit.
+        """
+        if detect_format(path) not in READERS:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Not a transcript")
+        with self._lock:
+            transcript = self._transcripts.get(path)
+            if transcript is None or transcript.is_stale():
+                try:
+                    transcript = EditableTranscript(path)
+                except (ValueError, KeyError, EditLogError) as e:
+                    raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+                self._transcripts.put(path, transcript)
+        return transcript
+
+    def transcript_page(
+        self,
+        transcript: EditableTranscript,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        offset: int = 0,
+        limit: int = PAGE_SIZE,
+    ) -> Dict:
+        """Segments overlapping [start, end] in start order, limit at a time"""
+        try:
+            table = transcript.table
+        except (ValueError, KeyError) as e:
+            raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        window_start = float("-inf") if start is None else start
+        window_end = float("inf") if end is None else end
+        segments = table.index.segments_between(window_start, window_end)
+        page = segments[offset : offset + limit]
+        following = offset + len(page)
+        return {
+            "version": transcript.version,
+            "start": start,
+            "end": end,
+            "total": len(segments),
+            "offset": offset,
+            "next_offset": following if following < len(segments) else None,
+            "segments": table.select(page).to_records(),
+        }
+
+    def apply_edits(self, transcript: EditableTranscript, patch) -> Dict:
+        if not (
+            isinstance(patch, dict)
+            and isinstance(patch.get("version"), int)
+            and isinstance(patch.get("ops"), list)
+        ):
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, 'Expected {"version": N, "ops": [...]}'
+            )
+        try:
+            version = transcript.apply(patch["version"], patch["ops"])
+        except EditConflict as e:
+            raise RequestError(HTTPStatus.CONFLICT, str(e), version=e.current)
+        except (EditLogError, KeyError, json.JSONDecodeError) as e:
+            # Raised catching up with a log another process wrote
+            raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+        except OSError as e:
+            raise RequestError(
+                HTTPStatus.INTERNAL_SERVER_ERROR, f"Could not save the edit: {e}"
+            )
+        return {"version": version}
+
+    def _sidecar(self, cls, path: str, stat: os.stat_result):
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        sidecar = self._sidecars.get(key)
+        if sidecar is None:
+            try:
+                sidecar = cls(path)
+            except ValueError as e:
+                raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+            self._sidecars.put(key, sidecar)
+        return sidecar
+
+    def peaks(
+        self,
+        path: str,
+        stat: os.stat_result,
+        samples_per_pixel: Optional[int] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Dict:
+        """One level's min/max pairs for a time window, audiowaveform style"""
+        peaks = self._sidecar(PeaksFile, path, stat)
+        available = peaks.samples_per_pixel
+        samples_per_pixel = samples_per_pixel or available[0]
+        if samples_per_pixel not in available:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, f"samples_per_pixel must be one of {available}"
+            )
+        level = peaks.level(samples_per_pixel)
+        pixels_per_second = peaks.header["sample_rate"] / samples_per_pixel
+        first = 0 if start is None else max(0, int(start * pixels_per_second))
+        last = len(level) if end is None else math.ceil(end * pixels_per_second)
+        window = level[first : max(first, last)]
+        return {
+            "sample_rate": peaks.header["sample_rate"],
+            "samples_per_pixel": samples_per_pixel,
+            "available": available,
+            "bits": peaks.header["bits"],
+            "channels": 1,
+            "duration": peaks.header["duration"],
+            "offset": first,
+            "length": len(window),
+            "data": window.reshape(-1).tolist(),
+        }
+
+    def spectrogram_header(self, path: str, stat: os.stat_result) -> Dict:
+        spectrogram = self._sidecar(SpectrogramFile, path, stat)
+        return {k: v for k, v in spectrogram.header.items() if k != "columns"}
+
+    def spectrogram_tile(
+        self, path: str, stat: os.stat_result, level: int, tile: int
+    ) -> bytes:
+        """Raw (n_mels, tile_width) uint8 tile, lowest band first"""
+        spectrogram = self._sidecar(SpectrogramFile, path, stat)
+        levels = spectrogram.levels
+        if not 0 <= level < len(levels) or not 0 <= tile < levels[level]["tiles"]:
+            raise RequestError(HTTPStatus.NOT_FOUND, "No such tile")
+        return spectrogram.tile(level, tile).tobytes()
+
+
+def _query_float(query: Dict, name: str) -> Optional[float]:
+    if name not in query:
+        return None
+    try:
+        return parse_time(query[name][0])
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {name}")
+
+
+def _query_int(query: Dict, name: str, default: Optional[int] = None) -> Optional[int]:
+    if name not in query:
+        return default
+    try:
+        value = int(query[name][0])
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {name}")
+    if value < 0:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {name}")
+    return value
+
+
+class EditorRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes:
+      GET /api/media                          audio files and their sidecars
+      GET /api/transcript/<path>?start=&end=&offset=&limit=
+      GET /api/edits/<path>                   current edit version
+      POST /api/edits/<path>                  {"version": N, "ops": [...]}
+      GET /api/peaks/<path>?samples_per_pixel=&start=&end=
+      GET /api/spectrogram/<path>             header (levels, tile counts)
+      GET /api/spectrogram/<path>?level=&tile=  one raw uint8 tile
+      GET /api/preview/<audio path>           cached preview, with Range support
+      GET /files/<path>                       any file, with Range support
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "AeroLexEditor/1.0"
+    data: EditorData
+    quiet = False
+
+    def do_OPTIONS(self):
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self._cors_headers()
+        self.send_header(
+            "Access-Control-Allow-Headers",
+            "Range, If-None-Match, If-Range, Content-Type",
+        )
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, POST, OPTIONS")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        try:
+            if not url.path.startswith("/api/edits/"):
+                raise RequestError(HTTPStatus.NOT_FOUND, "Not found")
+            path, _ = self.data.resolve(url.path[len("/api/edits/") :])
+            transcript = self.data.transcript(path)
+            self._send_json(self.data.apply_edits(transcript, self._read_json()), False)
+        except RequestError as e:
+            self._send_error(e, False)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            raise RequestError(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+        if length < 0:
+            # Where the body ends is unknown, so the connection cannot be reused
+            self.close_connection = True
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Negative Content-Length")
+        if length > MAX_PATCH_SIZE:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Patch too large")
+        try:
+            return json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body is not JSON")
+
+    def do_HEAD(self):
+        self._dispatch(head=True)
+
+    def do_GET(self):
+        self._dispatch(head=False)
+
+    def _dispatch(self, head: bool):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == "/api/media":
+                self._send_json(self.data.media(), head)
+            elif url.path.startswith("/files/"):
+                self._send_file(url.path[len("/files/") :], head)
+            elif url.path.startswith("/api/preview/"):
+                self._send_preview(url.path[len("/api/preview/") :], head)
+            elif url.path.startswith("/api/edits/"):
+                path, _ = self.data.resolve(url.path[len("/api/edits/") :])
+                transcript = self.data.transcript(path)
+                self._send_json(
+                    {
+                        "version": transcript.version,
+                        "base_version": transcript.base_version,
+                        "logged": len(transcript.patches),
+                        "compactable": transcript.compactable,
+                    },
+                    head,
+                )
+            elif url.path.startswith("/api/transcript/"):
+                self._send_transcript(url.path[len("/api/transcript/") :], query, head)
+            elif url.path.startswith("/api/peaks/"):
+                self._send_peaks(url.path[len("/api/peaks/") :], query, head)
+            elif url.path.startswith("/api/spectrogram/"):
+                self._send_spectrogram(
+                    url.path[len("/api/spectrogram/") :], query, head
+                )
+            else:
+                raise RequestError(HTTPStatus.NOT_FOUND, "Not found")
+        except RequestError as e:
+            self._send_error(e, head)
+        except (BrokenPipeError, ConnectionResetError):
+            # Players drop range requests all the time when seeking
+            self.close_connection = True
+
+    def _send_transcript(self, relative_path: str, query: Dict, head: bool):
+        path, stat = self.data.resolve(relative_path)
+        start, end = _query_float(query, "start"), _query_float(query, "end")
+        offset = _query_int(query, "offset", 0)
+        limit = min(_query_int(query, "limit", PAGE_SIZE), MAX_PAGE_SIZE)
+        transcript = self.data.transcript(path)
+        etag = derived_etag(
+            path, stat, "transcript", transcript.version, start, end, offset, limit
+        )
+        if self._not_modified(etag):
+            return
+        page = self.data.transcript_page(transcript, start, end, offset, limit)
+        self._send_json(page, head, etag)
+
+    def _send_peaks(self, relative_path: str, query: Dict, head: bool):
+        path, stat = self.data.resolve(relative_path)
+        samples_per_pixel = _query_int(query, "samples_per_pixel")
+        start, end = _query_float(query, "start"), _query_float(query, "end")
+        etag = derived_etag(path, stat, "peaks", samples_per_pixel, start, end)
+        if self._not_modified(etag):
+            return
+        peaks = self.data.peaks(path, stat, samples_per_pixel, start, end)
+        self._send_json(peaks, head, etag)
+
+    def _send_spectrogram(self, relative_path: str, query: Dict, head: bool):
+        path, stat = self.data.resolve(relative_path)
+        level, tile = _query_int(query, "level"), _query_int(query, "tile")
+        etag = derived_etag(path, stat, "spectrogram", level, tile)
+        if self._not_modified(etag):
+            return
+        if level is None or tile is None:
+            self._send_json(self.data.spectrogram_header(path, stat), head, etag)
+            return
+        body = self.data.spectrogram_tile(path, stat, level, tile)
+        self._send_body(body, "application/octet-stream", etag, head)
+
+    def _send_file(self, relative_path: str, head: bool):
+        path, stat = self.data.resolve(relative_path)
+        self._send_path(path, stat, head)
+
+    def _send_preview(self, relative_path: str, head: bool):
+        source, _ = self.data.resolve(relative_path)
+        path = find_preview(source, self.data.preview_dir)
+        if path is None:
+            raise RequestError(
+                HTTPStatus.NOT_FOUND, f"No preview of {relative_path}; run 'preview'"
+            )
+        path = os.path.realpath(path)
+        self._send_path(path, os.stat(path), head)
+
+    def _send_path(self, path: str, stat: os.stat_result, head: bool):
+        etag = file_etag(path, stat)
+        if self._not_modified(etag):
+            return
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        size = stat.st_size
+        byte_range = None
+        if_range = self.headers.get("If-Range")
+        if if_range is None or if_range.strip() == etag:
+            try:
+                byte_range = parse_range(self.headers.get("Range"), size)
+            except RequestError as e:
+                self.send_response(e.status)
+                self._cors_headers()
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        if byte_range is None and self._compressible(content_type, size):
+            with open(path, "rb") as f:
+                self._send_body(f.read(), content_type, etag, head, accept_ranges=True)
+            return
+
+        first, last = byte_range if byte_range else (0, size - 1)
+        length = last - first + 1
+        if byte_range:
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {first}-{last}/{size}")
+        else:
+            self.send_response(HTTPStatus.OK)
+        self._cors_headers()
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(max(length, 0)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if head or length <= 0:
+            return
+        with open(path, "rb") as f:
+            f.seek(first)
+            while length:
+                chunk = f.read(min(COPY_CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                length -= len(chunk)
+
+    def _compressible(self, content_type: str, size: int) -> bool:
+        return (
+            GZIP_MIN_SIZE <= size <= GZIP_MAX_SIZE
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+        )
+
+    def _not_modified(self, etag: str) -> bool:
+        if not etag_matches(self.headers.get("If-None-Match"), etag):
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self._cors_headers()
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _send_json(self, value, head: bool, etag: Optional[str] = None):
+        body = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+        if etag is None:
+            etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+            if self._not_modified(etag):
+                return
+        self._send_body(body, "application/json", etag, head)
+
+    def _send_body(
+        self,
+        body: bytes,
+        content_type: str,
+        etag: str,
+        head: bool,
+        accept_ranges: bool = False,
+    ):
+        """Whole response body, gzipped (and cached so) when the client allows"""
+        if self._compressible(content_type, len(body)):
+            etag = _gzip_etag(etag)
+            compressed = self.data.gzip_cache.get(etag)
+            if compressed is None:
+                compressed = gzip.compress(body, compresslevel=6, mtime=0)
+                self.data.gzip_cache.put(etag, compressed, len(compressed))
+            body = compressed
+            encoding = "gzip"
+        else:
+            encoding = None
+        self.send_response(HTTPStatus.OK)
+        self._cors_headers()
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _send_error(self, error: RequestError, head: bool):
+        body = json.dumps({"error": str(error), **error.details}).encode()
+        self.send_response(error.status)
+        self._cors_headers()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _cors_headers(self):
+        # The editor's dev server runs on another port
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header(
+            "Access-Control-Expose-Headers",
+            "Content-Range, Content-Length, Accept-Ranges, ETag",
+        )
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(
+    root: str,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    quiet: bool = False,
+    preview_dir: str = PREVIEW_DIR,
+) -> ThreadingHTTPServer:
+    handler = type(
+        "BoundEditorRequestHandler",
+        (EditorRequestHandler,),
+        {"data": EditorData(root, preview_dir), "quiet": quiet},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
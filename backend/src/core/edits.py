@@ -0,0 +1,472 @@
+# Transcript edits - append-only patch log over a stored transcript, compacted
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from src.core.conversion import file_digest, write_rows
+from src.core.models import TranscribedData
+from src.core.readers import (
+    CONTAINER_FORMAT,
+    READERS,
+    detect_format,
+    json_records,
+    jsonl_records,
+    read_transcript,
+)
+from src.core.transcript import TranscriptTable
+
+EDIT_LOG_TYPE = "aerolex-edit-log"
+EDIT_LOG_VERSION = 1
+EDIT_LOG_SUFFIX = ".edits.jsonl"
+COMPACTING_SUFFIX = ".compacting"
+# Patches kept in the log before the transcript itself is rewritten
+COMPACT_EVERY = 200
+# Formats the writers reproduce without losing anything the readers return;
+# edits to the others stay in the log
+COMPACTABLE_FORMATS = ("json", "jsonl", CONTAINER_FORMAT)
+# Record keys the JSON writers write back; a record with any other key (a
+# note, an LLM analysis) would lose it, so such files keep their edits logged
+ROUND_TRIP_KEYS = {"start", "end", "text", "score", "words", "speaker", "listener"}
+ROUND_TRIP_WORD_KEYS = {"start", "end", "text", "score"}
+OPERATIONS = ("text", "split", "merge", "retime")
+
+
+class EditConflict(Exception):
+    """The patch was made against another version than the current one"""
+
+    def __init__(self, expected: int, current: int):
+        super().__init__(
+            f"Patch is for version {expected} but the transcript is at {current}"
+        )
+        self.expected = expected
+        self.current = current
+
+
+class EditLogError(Exception):
+    pass
+
+
+class _BaseMoved(Exception):
+    """The transcript is not the log's base, seen without holding the lock"""
+
+
+def _segment(rows: List[TranscribedData], op: Dict, offset: int = 0) -> int:
+    index = op.get("segment")
+    if not isinstance(index, int) or not 0 <= index < len(rows) - offset:
+        raise ValueError(f"{op['op']}: no segment {index!r}")
+    return index
+
+
+def _time(op: Dict, key: str) -> float:
+    value = op.get(key)
+    if not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{op['op']}: {key} must be a time in seconds")
+    return float(value)
+
+
+def _without_pune(row: TranscribedData) -> TranscribedData:
+    # The standardized text no longer matches once the text changes
+    return {key: value for key, value in row.items() if key != "pune"}
+
+
+def _words_text(words: List[Dict]) -> str:
+    return "".join(word["text"] for word in words)
+
+
+def apply_ops(rows: List[TranscribedData], ops: List[Dict]) -> List[TranscribedData]:
+    """
+    New row list with the operations applied in order; rows are never
+    modified in place, so a failing patch leaves the input untouched.
+
+      {"op": "text", "segment": i, "text": " New text"}
+      {"op": "retime", "segment": i, "start": 1.5, "end": 3.0}
+      {"op": "split", "segment": i, "at": 2.0, "text": [" First", " second"]}
+      {"op": "merge", "segment": i}  (joins segment i and i + 1)
+
+    Split words go to the side their start falls on; without "text" the two
+    texts are rebuilt from those words. Raises ValueError on a bad operation.
+    """
+    rows = list(rows)
+    for op in ops:
+        if not isinstance(op, dict) or op.get("op") not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {op!r}")
+        kind = op["op"]
+        if kind == "text":
+            index = _segment(rows, op)
+            if not isinstance(op.get("text"), str):
+                raise ValueError("text: text must be a string")
+            rows[index] = {**_without_pune(rows[index]), "text": op["text"]}
+
+        elif kind == "retime":
+            index = _segment(rows, op)
+            row = rows[index]
+            start = _time(op, "start") if "start" in op else row["start"]
+            end = _time(op, "end") if "end" in op else row["end"]
+            if end < start:
+                raise ValueError("retime: end is before start")
+            # Segments stay ordered and apart, as the editor's verifyInputOrder
+            # demands; past the last one only the media length (unknown here)
+            # bounds the end
+            previous = rows[index - 1]["end"] if index else 0.0
+            following = rows[index + 1]["start"] if index + 1 < len(rows) else end
+            if not previous <= start <= end <= following:
+                raise ValueError("retime: segment would overlap a neighbour")
+            rows[index] = {**row, "start": start, "end": end}
+
+        elif kind == "split":
+            index = _segment(rows, op)
+            row = rows[index]
+            at = _time(op, "at")
+            if not row["start"] < at < row["end"]:
+                raise ValueError("split: time is outside the segment")
+            words = row.get("words") or []
+            first_words = [word for word in words if word["start"] < at]
+            second_words = words[len(first_words) :]
+            if "text" in op:
+                texts = op["text"]
+                if not (
+                    isinstance(texts, list)
+                    and len(texts) == 2
+                    and all(isinstance(text, str) for text in texts)
+                ):
+                    raise ValueError("split: text must be two strings")
+            elif first_words and second_words:
+                texts = [_words_text(first_words), _words_text(second_words)]
+            else:
+                raise ValueError("split: give the two texts, no words to split by")
+            base = _without_pune(row)
+            rows[index : index + 1] = [
+                {**base, "text": texts[0], "end": at, "words": first_words},
+                {**base, "text": texts[1], "start": at, "words": second_words},
+            ]
+
+        else:
+            index = _segment(rows, op, offset=1)
+            first, second = rows[index], rows[index + 1]
+            durations = [first["end"] - first["start"], second["end"] - second["start"]]
+            total = sum(durations)
+            weights = [d / total for d in durations] if total > 0 else [0.5, 0.5]
+            merged = {
+                key: value
+                for key, value in first.items()
+                if key != "pune" and second.get(key) == value
+            }
+            merged.update(
+                text=first["text"] + second["text"],
+                start=min(first["start"], second["start"]),
+                end=max(first["end"], second["end"]),
+                score=first["score"] * weights[0] + second["score"] * weights[1],
+                words=(first.get("words") or []) + (second.get("words") or []),
+            )
+            rows[index : index + 2] = [merged]
+    return rows
+
+
+def _hidden_sibling(path: str, suffix: str) -> str:
+    # Hidden, so directory conversions and indexing never take it for a transcript
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}{suffix}")
+
+
+def _round_trips(path: str, format: str) -> bool:
+    """Whether rewriting the transcript keeps every field of every record"""
+    if format == CONTAINER_FORMAT:
+        return True
+    records = json_records(path) if format == "json" else jsonl_records(path)
+    for record in records:
+        if not record.keys() <= ROUND_TRIP_KEYS:
+            return False
+        for word in record.get("words") or []:
+            if not word.keys() <= ROUND_TRIP_WORD_KEYS:
+                return False
+    return True
+
+
+class EditableTranscript:
+    """
+    A transcript plus its edit log, .<transcript>.edits.jsonl beside it.
+
+    The log starts with a header naming the digest of the transcript it
+    applies to; each further line is one patch, appended and fsynced, so a
+    save costs one short write however long the transcript is. Every
+    COMPACT_EVERY patches the transcript is rewritten with the patches
+    folded in and the log restarted. Versions count patches since the
+    transcript was first edited; a patch must name the version it was made
+    against or it is rejected with EditConflict. Writers hold an exclusive
+    flock on the log and first catch up with patches other processes (a CLI
+    edit beside a running editor) appended, so the check holds across them.
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None):
+        self.path = path
+        self.format = format or detect_format(path)
+        if self.format not in READERS:
+            raise ValueError(f"Cannot read transcript format of {path}")
+        self.log_path = _hidden_sibling(path, EDIT_LOG_SUFFIX)
+        self._compactable: Optional[bool] = None
+        self._lock = threading.Lock()
+        self._rows: Optional[List[TranscribedData]] = None
+        self._table: Optional[TranscriptTable] = None
+        self._file = None
+        self._held: List[BinaryIO] = []
+        try:
+            self._load()
+        except _BaseMoved:
+            # Mid-compaction or interrupted in one: settle it under the lock,
+            # which the compacting process holds until the transcript is in
+            self._log_state = None
+            with self._locked_log():
+                pass
+
+    def _load(self, locked: bool = False):
+        self.base_version = 0
+        self.patches: List[List[Dict]] = []
+        # Inode and length of the log as read, to notice other writers
+        self._log_state: Optional[Tuple[int, int]] = None
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            self.stat = os.stat(self.path)
+            return
+        with f:
+            data = f.read()
+            inode = os.fstat(f.fileno()).st_ino
+        # A patch cut short by a crash (or still being written) is left out;
+        # the next writer truncates it under the lock
+        complete = data[: data.rfind(b"\n") + 1]
+        self._log_state = (inode, len(complete))
+        lines = complete.decode("utf-8").splitlines()
+        if not lines:
+            raise EditLogError(f"{self.log_path} has no header")
+        header = json.loads(lines[0])
+        if header.get("type") != EDIT_LOG_TYPE:
+            raise EditLogError(f"{self.log_path} is not an edit log")
+        self._check_base(header["base"], locked)
+        self.base_version = header["base_version"]
+        for line in lines[1:]:
+            patch = json.loads(line)
+            if patch["version"] != self.base_version + len(self.patches) + 1:
+                raise EditLogError(f"{self.log_path} skips a version")
+            self.patches.append(patch["ops"])
+        self.stat = os.stat(self.path)
+
+    def _check_base(self, digest: str, locked: bool):
+        if file_digest(self.path) == digest:
+            return
+        if not locked:
+            raise _BaseMoved()
+        # Interrupted compaction: the log is new, the transcript not yet
+        pending = _hidden_sibling(self.path, COMPACTING_SUFFIX)
+        if os.path.exists(pending) and file_digest(pending) == digest:
+            os.replace(pending, self.path)
+            return
+        raise EditLogError(
+            f"{self.path} changed outside the editor since {self.log_path} "
+            "was written; remove the log to discard its edits"
+        )
+
+    @property
+    def compactable(self) -> bool:
+        """Whether the patches can be folded into the transcript losslessly"""
+        if self._compactable is None:
+            self._compactable = self.format in COMPACTABLE_FORMATS and _round_trips(
+                self.path, self.format
+            )
+        return self._compactable
+
+    @property
+    def version(self) -> int:
+        return self.base_version + len(self.patches)
+
+    @property
+    def rows(self) -> List[TranscribedData]:
+        """Current rows: the stored transcript with the logged patches applied"""
+        if self._rows is None:
+            rows = list(read_transcript(self.path, self.format))
+            for ops in self.patches:
+                rows = apply_ops(rows, ops)
+            self._rows = rows
+        return self._rows
+
+    @property
+    def table(self) -> TranscriptTable:
+        """Current rows as columns; unedited .alx stays memory mapped"""
+        with self._lock:
+            if self._table is None:
+                if not self.patches and self.format == CONTAINER_FORMAT:
+                    from src.core.container import TranscriptFile
+
+                    self._file = TranscriptFile(self.path)
+                    self._table = self._file.to_table(copy=False)
+                else:
+                    self._table = TranscriptTable.from_dicts(self.rows)
+            return self._table
+
+    def apply(self, version: int, ops: List[Dict]) -> int:
+        """Apply one patch made against version; returns the new version"""
+        with self._lock, self._locked_log() as log:
+            if version != self.version:
+                raise EditConflict(version, self.version)
+            rows = apply_ops(self.rows, ops)
+            line = json.dumps(
+                {"version": self.version + 1, "time": time.time(), "ops": ops},
+                ensure_ascii=False,
+            ).encode("utf-8")
+            log.write(line + b"\n")
+            log.flush()
+            os.fsync(log.fileno())
+            inode, length = self._log_state
+            self._log_state = (inode, length + len(line) + 1)
+            self.patches.append(ops)
+            self._rows = rows
+            self._close_table()
+            if self.compactable and len(self.patches) >= COMPACT_EVERY:
+                self._compact()
+            return self.version
+
+    @contextmanager
+    def _locked_log(self) -> Iterator[BinaryIO]:
+        """
+        The log open for appending under an exclusive flock, created if there
+        is none, with this object caught up on what other processes logged
+        """
+        while True:
+            try:
+                fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND)
+            except FileNotFoundError:
+                # Only one process gets to create it; the others retry
+                self._start_log(file_digest(self.path), replace=False)
+                continue
+            log = os.fdopen(fd, "ab")
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                current = os.path.samestat(os.fstat(fd), os.stat(self.log_path))
+            except FileNotFoundError:
+                current = False
+            if current:
+                break
+            # Replaced by a compaction while we waited
+            log.close()
+        try:
+            self._catch_up(log)
+            yield log
+        finally:
+            log.close()
+            for held in self._held:
+                held.close()
+            self._held = []
+
+    def _catch_up(self, log: BinaryIO):
+        stat = os.fstat(log.fileno())
+        if (stat.st_ino, stat.st_size) == self._log_state:
+            return
+        self._load(locked=True)
+        self._rows = None
+        self._close_table()
+        length = self._log_state[1]
+        if stat.st_size > length:
+            # A patch cut short by a crash was never acknowledged; drop it
+            log.truncate(length)
+
+    def compact(self):
+        """Fold the logged patches into the transcript and restart the log"""
+        with self._lock:
+            if self.format not in COMPACTABLE_FORMATS:
+                raise ValueError(
+                    f"{self.format} transcripts keep their edits in the log; "
+                    f"convert to one of {', '.join(COMPACTABLE_FORMATS)} to compact"
+                )
+            if not self.compactable:
+                raise ValueError(
+                    f"{self.path} has fields the transcript writers do not "
+                    "reproduce; its edits stay in the log"
+                )
+            if not os.path.exists(self.log_path):
+                return
+            with self._locked_log():
+                self._compact()
+
+    def _compact(self):
+        if not self.patches:
+            return
+        pending = _hidden_sibling(self.path, COMPACTING_SUFFIX)
+        write_rows(self.rows, pending, self.format, os.path.basename(self.path))
+        # Log first: until the transcript is swapped in, _check_base finishes
+        # the job from the pending file
+        self._start_log(file_digest(pending))
+        self._close_table()
+        os.replace(pending, self.path)
+        self.base_version = self.version
+        self.patches = []
+        self.stat = os.stat(self.path)
+
+    def _start_log(self, digest: str, replace: bool = True):
+        """
+        Atomically replace the log with a header for the current version, or
+        with replace False create it unless another process already has. The
+        new log is locked until the current _locked_log block ends.
+        """
+        header = {
+            "type": EDIT_LOG_TYPE,
+            "version": EDIT_LOG_VERSION,
+            "base": digest,
+            "base_version": self.version,
+        }
+        fd, partial_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.log_path)),
+            prefix=f".{os.path.basename(self.log_path)}.",
+            suffix=".part",
+        )
+        log = os.fdopen(fd, "wb")
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            line = json.dumps(header).encode("utf-8") + b"\n"
+            log.write(line)
+            log.flush()
+            os.fsync(fd)
+            if not replace:
+                try:
+                    os.link(partial_path, self.log_path)
+                except FileExistsError:
+                    pass
+                finally:
+                    log.close()
+                    os.unlink(partial_path)
+                return
+            os.replace(partial_path, self.log_path)
+        except BaseException:
+            log.close()
+            if os.path.exists(partial_path):
+                os.unlink(partial_path)
+            raise
+        self._held.append(log)
+        self._log_state = (os.fstat(fd).st_ino, len(line))
+
+    def is_stale(self) -> bool:
+        """Whether the transcript or its log was changed by something other than us"""
+        stat = os.stat(self.path)
+        if (stat.st_mtime_ns, stat.st_size) != (
+            self.stat.st_mtime_ns,
+            self.stat.st_size,
+        ):
+            return True
+        try:
+            log = os.stat(self.log_path)
+        except FileNotFoundError:
+            return self._log_state is not None
+        return (log.st_ino, log.st_size) != self._log_state
+
+    def _close_table(self):
+        self._table = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        with self._lock:
+            self._close_table()
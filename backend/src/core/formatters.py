@@ -1,126 +1,481 @@
 # Renamed from writers.py - handles output formatting
+import io
 import json
 import math
-from dataclasses import dataclass
-from typing import Iterator, List, TextIO
+import time
+from json.encoder import encode_basestring
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Type,
+    Union,
+)
 
-from faster_whisper.transcribe import Segment
+import numpy as np
 
 from src.core.models import TranscribedData
 
+if TYPE_CHECKING:
+    from faster_whisper.transcribe import Segment
 
-def format_timestamp(seconds: float) -> str:
+
+def format_timestamp(seconds: float, decimal_marker: str = ".") -> str:
     """Convert seconds to timestamp format HH:MM:SS.mmm"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}".replace(",", ".")
+    hours, millis = divmod(round(seconds * 1000), 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_marker}{millis:03d}"
+
+
+# Characters of "HH:MM:SS.mmm": (divisor, modulus) of a digit in milliseconds,
+# or a literal separator
+_TIMESTAMP_LAYOUT = [
+    (36_000_000, 10),
+    (3_600_000, 10),
+    ":",
+    (600_000, 6),
+    (60_000, 10),
+    ":",
+    (10_000, 6),
+    (1000, 10),
+    ".",
+    (100, 10),
+    (10, 10),
+    (1, 10),
+]
+
+
+def format_timestamps(seconds: Sequence[float], decimal_marker: str = ".") -> List[str]:
+    """Convert an array of seconds to HH:MM:SS.mmm timestamps in one pass"""
+    millis = np.round(np.asarray(seconds, dtype=np.float64) * 1000).astype(np.int64)
+    if millis.size == 0:
+        return []
+    if millis.min() < 0 or millis.max() >= 100 * 3_600_000:
+        # Outside the fixed-width layout, rare enough for the scalar path
+        return [format_timestamp(value, decimal_marker) for value in seconds]
+
+    # Fill a character matrix column by column, then view each row as a string
+    chars = np.empty((millis.size, len(_TIMESTAMP_LAYOUT)), dtype=np.uint8)
+    for column, spec in enumerate(_TIMESTAMP_LAYOUT):
+        if spec == ".":
+            chars[:, column] = ord(decimal_marker)
+        elif isinstance(spec, str):
+            chars[:, column] = ord(spec)
+        else:
+            divisor, modulus = spec
+            chars[:, column] = millis // divisor % modulus + ord("0")
+    return chars.view(f"S{chars.shape[1]}").ravel().astype(str).tolist()
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """Convert HH:MM:SS.mmm (or SRT's HH:MM:SS,mmm) back to seconds"""
+    hours, minutes, secs = timestamp.replace(",", ".").split(":")
+    seconds = int(hours) * 3600 + int(minutes) * 60 + float(secs)
+    # Same whole-millisecond value the vectorized parser produces
+    return round(seconds * 1000) / 1000
+
+
+def parse_time(value: str) -> float:
+    """Command-line time: HH:MM:SS.mmm or plain seconds"""
+    return parse_timestamp(value) if ":" in value else float(value)
+
+
+def parse_timestamps(timestamps: Sequence[str]) -> np.ndarray:
+    """Vectorized parse_timestamp for fixed-width HH:MM:SS.mmm strings"""
+    if not timestamps:
+        return np.empty(0, dtype=np.float64)
+    chars = np.array(timestamps, dtype="S")
+    width = len(_TIMESTAMP_LAYOUT)
+    if chars.dtype.itemsize != width or (np.char.str_len(chars) != width).any():
+        return np.array([parse_timestamp(t) for t in timestamps], dtype=np.float64)
+    digits = chars.view(np.uint8).reshape(-1, width).astype(np.int64)
+    digits -= ord("0")
+    millis = np.zeros(len(chars), dtype=np.int64)
+    for column, spec in enumerate(_TIMESTAMP_LAYOUT):
+        if not isinstance(spec, str):
+            millis += digits[:, column] * spec[0]
+    # Divide rather than multiply by 0.001 so times match float(secs) exactly
+    return millis / 1000
+
+
+# (start, end, text, score); plain tuples since there is one per word
+WordCue = Tuple[float, float, str, float]
+
+
+class Cue(NamedTuple):
+    """A segment as the writers see it, whatever it was produced by"""
+
+    start: float
+    end: float
+    text: str
+    score: float
+    words: List[WordCue]
+    speaker: str = ""
+    listener: str = ""
+
+
+def to_cue(segment: Union["Segment", TranscribedData], words: bool = True) -> Cue:
+    """Normalize a faster-whisper Segment or a TranscribedData-shaped row"""
+    if hasattr(segment, "avg_logprob"):
+        return Cue(
+            segment.start,
+            segment.end,
+            segment.text,
+            round(math.exp(segment.avg_logprob), 2),
+            [
+                (word.start, word.end, word.word, round(word.probability, 2))
+                for word in (segment.words or [])
+            ]
+            if words
+            else [],
+        )
+    # TranscribedData dicts and TranscriptTable rows; scores are kept as is
+    extra = segment if isinstance(segment, dict) else {}
+    return Cue(
+        segment["start"],
+        segment["end"],
+        segment["text"],
+        segment["score"],
+        [
+            (word["start"], word["end"], word["text"], word["score"])
+            for word in segment["words"]
+        ]
+        if words
+        else [],
+        extra.get("speaker", ""),
+        extra.get("listener", ""),
+    )
+
+
+class TranscriptWriter:
+    """
+    Writes segments to an open text file in one output format.
 
+    Accepts faster-whisper Segments or TranscribedData rows, one at a time as
+    they are produced (write) or in bulk (write_all), which formats them in
+    batches. Nothing is flushed per cue; pass flush_interval to push output to
+    disk at most that often so a running transcription can be followed.
+    Used as a context manager the output is always finished, even on errors.
+    """
 
-@dataclass
-class BaseFormatter:  # Renamed from ResultWriter
-    result: List[TranscribedData]
-    destination: str
+    extension = ""
+    batch_size = 512
+    # Formats without word timings skip normalizing the words
+    uses_words = False
 
-    def write(self):
-        with open(self.destination, "w", encoding="utf-8") as f:
-            self._write_result(self.result, f)
+    def __init__(
+        self, file: TextIO, name: Optional[str] = None, flush_interval: float = 0
+    ):
+        self.file = file
+        self.name = name or "transcript"
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._last_flush = time.monotonic()
+        self._write_header()
 
-    def _write_result(self, result: List[TranscribedData], file: TextIO):
+    def _write_header(self):
+        pass
+
+    def _write_cues(self, cues: List[Cue]):
         raise NotImplementedError
 
+    def _write_footer(self):
+        pass
 
-@dataclass
-class SubtitleFormatter(BaseFormatter):  # Renamed from SubtitlesWriter
-    decimal_marker: str = "."
+    def write(self, segment: Union["Segment", TranscribedData]):
+        self._write_cues([to_cue(segment, self.uses_words)])
+        self.count += 1
+        if self.flush_interval:
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
+                self.file.flush()
+                self._last_flush = now
 
-    def iterate_result(self, result: List[TranscribedData]):
-        for segment in result:
-            segment_start = format_timestamp(segment["start"])
-            segment_end = format_timestamp(segment["end"])
-            segment_text = segment["text"].strip()
-            yield segment_start, segment_end, segment_text
+    def write_all(self, segments: Iterable[Union["Segment", TranscribedData]]):
+        batch = []
+        for segment in segments:
+            batch.append(to_cue(segment, self.uses_words))
+            if len(batch) == self.batch_size:
+                self._write_cues(batch)
+                self.count += len(batch)
+                batch = []
+        if batch:
+            self._write_cues(batch)
+            self.count += len(batch)
 
+    def finish(self):
+        self._write_footer()
+        self.file.flush()
 
-@dataclass
-class SRTFormatter(SubtitleFormatter):  # Renamed from WriteSRT
-    decimal_marker: str = ","
+    def __enter__(self):
+        return self
 
-    def _write_result(self, result: List[TranscribedData], file: TextIO):
-        for i, (start, end, text) in enumerate(self.iterate_result(result), start=1):
-            print(f"{i}\n{start} --> {end}\n{text}\n", file=file, flush=True)
+    def __exit__(self, *args):
+        self.finish()
 
 
-@dataclass
-class VTTFormatter(SubtitleFormatter):  # Renamed from WriteVTT
-    decimal_marker: str = "."
+WRITERS: Dict[str, Type[TranscriptWriter]] = {}
 
-    def _write_result(self, result: List[TranscribedData], file: TextIO):
-        print("WEBVTT\n", file=file)
-        for start, end, text in self.iterate_result(result):
-            print(f"{start} --> {end}\n{text}\n", file=file, flush=True)
 
+def register_writer(
+    name: str,
+) -> Callable[[Type[TranscriptWriter]], Type[TranscriptWriter]]:
+    """Class decorator adding a writer to the registry under a format name"""
 
-@dataclass
-class JSONFormatter(BaseFormatter):  # Renamed from WriteJSON
-    def _write_result(self, result: List[TranscribedData], file: TextIO):
-        json.dump(result, file)
+    def decorator(cls: Type[TranscriptWriter]) -> Type[TranscriptWriter]:
+        if "extension" not in vars(cls):
+            cls.extension = f".{name}"
+        WRITERS[name] = cls
+        return cls
 
+    return decorator
 
-def format_json(segments: Iterator[Segment]) -> str:
-    """Format transcription as JSON with timestamps as strings"""
-    result = [
-        {
-            "start": format_timestamp(segment.start),
-            "end": format_timestamp(segment.end),
-            "text": segment.text,
-            "score": round(math.exp(segment.avg_logprob), 2),
+
+def cue_records(cues: List[Cue]) -> List[dict]:
+    """JSON records for cues, with every timestamp formatted in one batch"""
+    words = [word for cue in cues for word in cue.words]
+    timestamps = format_timestamps(
+        [cue.start for cue in cues]
+        + [cue.end for cue in cues]
+        + [word[0] for word in words]
+        + [word[1] for word in words]
+    )
+    n, m = len(cues), len(words)
+    word_starts = iter(timestamps[2 * n : 2 * n + m])
+    word_ends = iter(timestamps[2 * n + m :])
+    records = []
+    for cue, start, end in zip(cues, timestamps[:n], timestamps[n : 2 * n]):
+        record = {
+            "start": start,
+            "end": end,
+            "text": cue.text,
+            "score": cue.score,
             "words": [
                 {
-                    "start": format_timestamp(word.start),
-                    "end": format_timestamp(word.end),
-                    "text": word.word,
-                    "score": round(word.probability, 2),
+                    "start": next(word_starts),
+                    "end": next(word_ends),
+                    "text": text,
+                    "score": score,
                 }
-                for word in (segment.words or [])
+                for _, _, text, score in cue.words
             ],
         }
-        for segment in segments
-    ]
-    return json.dumps(result, indent=2, ensure_ascii=False)
+        if cue.speaker or cue.listener:
+            record["speaker"], record["listener"] = cue.speaker, cue.listener
+        records.append(record)
+    return records
 
 
-def format_srt(segments: Iterator[Segment]) -> str:
-    """Format transcription as SRT"""
-    output = []
-    for i, segment in enumerate(segments, start=1):
-        output.extend(
-            [
-                str(i),
-                f"{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}",
-                segment.text.strip(),
-                "",  # Empty line between segments
-            ]
+def _json_value(value) -> str:
+    """json.dumps for the strings and numbers in a record, minus its overhead"""
+    if type(value) is str:
+        return encode_basestring(value)
+    if type(value) is float and math.isfinite(value):
+        return repr(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+@register_writer("json")
+class JSONWriter(TranscriptWriter):
+    """Indented JSON array; a killed run leaves it unclosed but readable"""
+
+    uses_words = True
+
+    def _write_header(self):
+        self.file.write("[")
+
+    def _write_cues(self, cues: List[Cue]):
+        blocks = []
+        for i, record in enumerate(cue_records(cues)):
+            separator = ",\n" if self.count + i else "\n"
+            blocks.append(separator + self._render(record))
+        self.file.write("".join(blocks))
+
+    @staticmethod
+    def _render(record: dict) -> str:
+        """
+        Same text as json.dumps(record, indent=2) nested one level, but built
+        from templates since the pure-Python indenting encoder is the slowest
+        part of writing JSON transcripts.
+        """
+        if len(record) != 5:
+            # Records with speaker/listener take the generic path
+            text = json.dumps(record, indent=2, ensure_ascii=False)
+            return "  " + text.replace("\n", "\n  ")
+        words = ",\n".join(
+            f'      {{\n        "start": "{word["start"]}",\n'
+            f'        "end": "{word["end"]}",\n'
+            f'        "text": {_json_value(word["text"])},\n'
+            f'        "score": {_json_value(word["score"])}\n      }}'
+            for word in record["words"]
+        )
+        words = f"[\n{words}\n    ]" if words else "[]"
+        return (
+            f'  {{\n    "start": "{record["start"]}",\n'
+            f'    "end": "{record["end"]}",\n'
+            f'    "text": {_json_value(record["text"])},\n'
+            f'    "score": {_json_value(record["score"])},\n'
+            f'    "words": {words}\n  }}'
         )
-    return "\n".join(output)
 
+    def _write_footer(self):
+        self.file.write("\n]" if self.count else "]")
 
-def format_vtt(segments: Iterator[Segment]) -> str:
-    """Format transcription as WebVTT"""
-    output = ["WEBVTT\n"]
-    for segment in segments:
-        output.extend(
-            [
-                f"{format_timestamp(segment.start).replace(',', '.')} --> {format_timestamp(segment.end).replace(',', '.')}",
-                segment.text.strip(),
-                "",  # Empty line between segments
-            ]
+
+@register_writer("jsonl")
+class JSONLWriter(TranscriptWriter):
+    """One record per line; every complete line survives a crash"""
+
+    uses_words = True
+
+    def _write_cues(self, cues: List[Cue]):
+        self.file.write(
+            "".join(
+                json.dumps(record, ensure_ascii=False) + "\n"
+                for record in cue_records(cues)
+            )
+        )
+
+
+@register_writer("srt")
+class SRTWriter(TranscriptWriter):
+    decimal_marker = ","
+
+    def _write_cues(self, cues: List[Cue]):
+        starts = format_timestamps([cue.start for cue in cues], self.decimal_marker)
+        ends = format_timestamps([cue.end for cue in cues], self.decimal_marker)
+        blocks = []
+        for i, (cue, start, end) in enumerate(zip(cues, starts, ends)):
+            index = self.count + i + 1
+            separator = "\n" if index > 1 else ""
+            blocks.append(
+                f"{separator}{index}\n{start} --> {end}\n{cue.text.strip()}\n"
+            )
+        self.file.write("".join(blocks))
+
+
+@register_writer("vtt")
+class VTTWriter(TranscriptWriter):
+    decimal_marker = "."
+
+    def _write_header(self):
+        self.file.write("WEBVTT\n")
+
+    def _write_cues(self, cues: List[Cue]):
+        starts = format_timestamps([cue.start for cue in cues], self.decimal_marker)
+        ends = format_timestamps([cue.end for cue in cues], self.decimal_marker)
+        self.file.write(
+            "".join(
+                f"\n{start} --> {end}\n{cue.text.strip()}\n"
+                for cue, start, end in zip(cues, starts, ends)
+            )
         )
-    return "\n".join(output)
 
 
-FORMATTERS = {  # Renamed from WRITERS
-    "json": format_json,
-    "srt": format_srt,
-    "vtt": format_vtt,
-}
+@register_writer("txt")
+class TextWriter(TranscriptWriter):
+    """Plain text, one segment per line"""
+
+    def _write_cues(self, cues: List[Cue]):
+        self.file.write("".join(cue.text.strip() + "\n" for cue in cues))
+
+
+@register_writer("tsv")
+class TSVWriter(TranscriptWriter):
+    """start/end in integer milliseconds and text, tab separated"""
+
+    def _write_header(self):
+        self.file.write("start\tend\ttext\n")
+
+    def _write_cues(self, cues: List[Cue]):
+        starts = np.round(np.array([cue.start for cue in cues]) * 1000)
+        ends = np.round(np.array([cue.end for cue in cues]) * 1000)
+        self.file.write(
+            "".join(
+                f"{start}\t{end}\t{' '.join(cue.text.split())}\n"
+                for cue, start, end in zip(
+                    cues,
+                    starts.astype(np.int64).tolist(),
+                    ends.astype(np.int64).tolist(),
+                )
+            )
+        )
+
+
+@register_writer("lbs")
+class LBSWriter(TranscriptWriter):
+    """
+    Label blocks as read by src/data/proc: a header line with ids, speaker,
+    listener and times, followed by the ORIG transcript line.
+    """
+
+    def _write_cues(self, cues: List[Cue]):
+        blocks = []
+        for cue in cues:
+            clock = format_timestamp(cue.start)[:8].replace(":", "_")
+            speaker = cue.speaker or "UNK"
+            listener = cue.listener or "UNK"
+            blocks.append(
+                f"{{{self.name} 1 {self.name}__{speaker}__{listener}__{clock} "
+                f"{cue.start:.3f} {cue.end:.3f}}}\n"
+                f"ORIG: {' '.join(cue.text.split())}\n\n"
+            )
+        self.file.write("".join(blocks))
+
+
+def get_writer(format: str, file: TextIO, **options) -> TranscriptWriter:
+    try:
+        writer_class = WRITERS[format]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {format}")
+    return writer_class(file, **options)
+
+
+def format_transcript(
+    segments: Iterable[Union["Segment", TranscribedData]], format: str, **options
+) -> str:
+    """Render a whole transcript to a string"""
+    buffer = io.StringIO()
+    with get_writer(format, buffer, **options) as writer:
+        writer.write_all(segments)
+    return buffer.getvalue()
+
+
+def write_transcript(
+    segments: Iterable[Union["Segment", TranscribedData]],
+    destination: str,
+    format: str,
+    **options,
+):
+    """Write a whole transcript to a file through a large buffer"""
+    with open(destination, "w", encoding="utf-8", buffering=1 << 20) as f:
+        with get_writer(format, f, **options) as writer:
+            writer.write_all(segments)
+
+
+def format_json(segments: Iterable["Segment"]) -> str:
+    """Format transcription as JSON with timestamps as strings"""
+    return format_transcript(segments, "json")
+
+
+def format_jsonl(segments: Iterable["Segment"]) -> str:
+    """Format transcription as JSON Lines, one segment record per line"""
+    return format_transcript(segments, "jsonl")
+
+
+def format_srt(segments: Iterable["Segment"]) -> str:
+    """Format transcription as SRT"""
+    return format_transcript(segments, "srt")
+
+
+def format_vtt(segments: Iterable["Segment"]) -> str:
+    """Format transcription as WebVTT"""
+    return format_transcript(segments, "vtt")
@@ -0,0 +1,129 @@
+# Interval index - time-range lookups over segment and word times in O(log n)
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class IntervalIndex:
+    """
+    Sorted index over [start, end] intervals, queried with np.searchsorted.
+
+    Intervals are ordered by start; a running maximum of the ends bounds how
+    far back an interval reaching a given time can start, so overlap queries
+    touch only O(log n + hits) rows even when intervals overlap each other.
+    Query results are positions in the original arrays, in start order.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        if starts.shape != ends.shape:
+            raise ValueError("starts and ends differ in length")
+        # Segments usually arrive sorted; skip the permutation then
+        if len(starts) and np.any(starts[1:] < starts[:-1]):
+            self.order: Optional[np.ndarray] = np.argsort(starts, kind="stable")
+            starts, ends = starts[self.order], ends[self.order]
+        else:
+            self.order = None
+        self.starts = starts
+        self.ends = ends
+        self.max_ends = np.maximum.accumulate(ends) if len(ends) else ends
+        self._reach = _running_argmax(ends) if len(ends) else ends.astype(np.int64)
+        # Ends in start order are sorted for disjoint, ordered intervals
+        self.disjoint = bool(np.all(starts[1:] >= ends[:-1])) if len(ends) else True
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _positions(self, sorted_positions: np.ndarray) -> np.ndarray:
+        if self.order is None:
+            return sorted_positions
+        return self.order[sorted_positions]
+
+    def candidate_ranges(
+        self, t0: np.ndarray, t1: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sorted-position ranges [first, last) holding every interval that
+        overlaps [t0, t1], for arrays of windows at once. Exact when the
+        intervals are disjoint; otherwise some may end before t0.
+        """
+        first = np.searchsorted(self.max_ends, t0, side="left")
+        last = np.searchsorted(self.starts, t1, side="right")
+        return first, np.maximum(first, last)
+
+    def overlapping(self, t0: float, t1: float) -> np.ndarray:
+        """Intervals with start <= t1 and end >= t0"""
+        first, last = self.candidate_ranges(t0, t1)
+        positions = np.arange(first, last)
+        if not self.disjoint:
+            positions = positions[self.ends[first:last] >= t0]
+        return self._positions(positions)
+
+    def overlapping_many(self, t0: np.ndarray, t1: np.ndarray) -> List[np.ndarray]:
+        """overlapping() for each window; the bounds are found in one pass"""
+        firsts, lasts = self.candidate_ranges(
+            np.asarray(t0, dtype=np.float64), np.asarray(t1, dtype=np.float64)
+        )
+        results = []
+        for first, last, start in zip(firsts.tolist(), lasts.tolist(), t0):
+            positions = np.arange(first, last)
+            if not self.disjoint:
+                positions = positions[self.ends[first:last] >= start]
+            results.append(self._positions(positions))
+        return results
+
+    def containing(self, t: float) -> np.ndarray:
+        """Intervals with start <= t <= end"""
+        return self.overlapping(t, t)
+
+    def nearest(self, t) -> np.ndarray:
+        """
+        Interval closest to each time: one containing it, else the one with
+        the nearest edge (the earlier one on ties). -1 when the index is empty.
+        """
+        times = np.asarray(t, dtype=np.float64)
+        if not len(self):
+            return np.full(times.shape, -1, dtype=np.int64)
+        # Among intervals starting at or before t, the one reaching furthest
+        before = np.searchsorted(self.starts, times, side="right") - 1
+        previous = np.where(before >= 0, self._reach[np.maximum(before, 0)], -1)
+        following = np.minimum(before + 1, len(self) - 1)
+        gap_before = np.where(
+            previous >= 0, times - self.ends[np.maximum(previous, 0)], np.inf
+        )
+        gap_after = np.where(
+            before + 1 < len(self), self.starts[following] - times, np.inf
+        )
+        nearest = np.where(np.maximum(gap_before, 0) <= gap_after, previous, following)
+        return self._positions(nearest)
+
+
+def _running_argmax(values: np.ndarray) -> np.ndarray:
+    """Index of the maximum of values[:i + 1] for every i"""
+    running = np.maximum.accumulate(values)
+    is_new_max = np.concatenate([[True], values[1:] >= running[:-1]])
+    return np.maximum.accumulate(np.where(is_new_max, np.arange(len(values)), 0))
+
+
+class TranscriptIndex:
+    """Segment and word interval indexes over a TranscriptTable"""
+
+    def __init__(self, table):
+        self.table = table
+        self.segments = IntervalIndex(table.segment_start, table.segment_end)
+        self.words = IntervalIndex(table.word_start, table.word_end)
+
+    def segments_between(self, t0: float, t1: float) -> np.ndarray:
+        return self.segments.overlapping(t0, t1)
+
+    def words_between(self, t0: float, t1: float) -> np.ndarray:
+        return self.words.overlapping(t0, t1)
+
+    def segment_at(self, t: float) -> int:
+        """Segment playing at t, else the nearest one; -1 if there are none"""
+        return int(self.segments.nearest(t))
+
+    def segment_of_word(self, word: np.ndarray) -> np.ndarray:
+        """Segment each word row belongs to"""
+        return np.searchsorted(self.table.word_offsets, word, side="right") - 1
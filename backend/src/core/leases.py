@@ -0,0 +1,341 @@
+# File-level leases on a shared filesystem for multi-node corpus processing
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+# Manifest layout below the shared manifest directory
+LEASES_DIR = "leases"
+DONE_DIR = "done"
+FAILED_DIR = "failed"
+NODES_DIR = "nodes"
+MANIFEST_FILE = "manifest.json"
+
+
+def default_node_id() -> str:
+    """Unique per process so several workers can share one box"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def file_key(relative_path: str) -> str:
+    return hashlib.sha1(relative_path.encode("utf-8")).hexdigest()
+
+
+def read_json(path: str) -> Optional[Dict]:
+    """Read a JSON record, treating missing or half-written files as absent"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_json_atomic(path: str, data: Dict):
+    """Write via a uniquely named temp file and rename, never a partial record"""
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+class SharedManifest:
+    """
+    Coordinates workers through lease files in a shared directory.
+
+    A worker owns a file while it holds `leases/<key>.lease`, created with
+    O_CREAT | O_EXCL so exactly one node wins. Leases carry an expiry that the
+    owner keeps extending; an expired lease is moved aside with an atomic
+    rename and claimed again, so work held by a dead node is picked up.
+    """
+
+    def __init__(
+        self, root: str, node_id: Optional[str] = None, lease_seconds: float = 300
+    ):
+        self.root = root
+        self.node_id = node_id or default_node_id()
+        self.lease_seconds = lease_seconds
+        self.tokens: Dict[str, str] = {}
+        for name in (LEASES_DIR, DONE_DIR, FAILED_DIR, NODES_DIR):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    def _path(self, directory: str, relative_path: str, suffix: str) -> str:
+        return os.path.join(self.root, directory, file_key(relative_path) + suffix)
+
+    def lease_path(self, relative_path: str) -> str:
+        return self._path(LEASES_DIR, relative_path, ".lease")
+
+    def is_done(self, relative_path: str) -> bool:
+        return os.path.exists(self._path(DONE_DIR, relative_path, ".json"))
+
+    def is_failed(self, relative_path: str) -> bool:
+        return os.path.exists(self._path(FAILED_DIR, relative_path, ".json"))
+
+    def write_manifest(self, data: Dict):
+        write_json_atomic(os.path.join(self.root, MANIFEST_FILE), data)
+
+    def _lease_record(self, relative_path: str, token: str) -> Dict:
+        now = time.time()
+        return {
+            "path": relative_path,
+            "node": self.node_id,
+            "token": token,
+            "acquired_at": now,
+            "expires_at": now + self.lease_seconds,
+        }
+
+    def claim(self, relative_path: str) -> bool:
+        """Try to take the lease on a file; False if done or held by another node"""
+        if self.is_done(relative_path):
+            return False
+        lease_path = self.lease_path(relative_path)
+        token = uuid.uuid4().hex
+        try:
+            fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            if not self._reclaim_expired(lease_path):
+                return False
+            return self.claim(relative_path)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._lease_record(relative_path, token), f)
+        # A node may have finished it between our done check and the lease
+        if self.is_done(relative_path):
+            self._remove_lease(relative_path, lease_path, token)
+            return False
+        self.tokens[relative_path] = token
+        return True
+
+    def _reclaim_expired(self, lease_path: str) -> bool:
+        """Move an expired lease out of the way; True if the slot is free again"""
+        lease = read_json(lease_path)
+        if lease is None:
+            # Released, still being written, or left empty by a crashed creator
+            try:
+                age = time.time() - os.stat(lease_path).st_mtime
+            except FileNotFoundError:
+                return True
+            if age < self.lease_seconds:
+                return False
+            expected_token = None
+        elif lease["expires_at"] > time.time():
+            return False
+        else:
+            expected_token = lease["token"]
+
+        stale_path = f"{lease_path}.{self.node_id}.stale"
+        try:
+            os.rename(lease_path, stale_path)
+        except FileNotFoundError:
+            return False  # Another node reclaimed it first
+        moved = read_json(stale_path)
+        if moved is not None and moved.get("token") != expected_token:
+            # Raced with a fresh claim - put the live lease back
+            try:
+                os.link(stale_path, lease_path)
+            except FileExistsError:
+                pass
+            os.unlink(stale_path)
+            return False
+        os.unlink(stale_path)
+        return True
+
+    def owns(self, relative_path: str) -> bool:
+        lease = read_json(self.lease_path(relative_path))
+        return lease is not None and lease.get("token") == self.tokens.get(
+            relative_path
+        )
+
+    def renew(self, relative_path: str) -> bool:
+        """Extend our lease; False if it expired and another node took it"""
+        token = self.tokens.get(relative_path)
+        if token is None or not self.owns(relative_path):
+            return False
+        write_json_atomic(
+            self.lease_path(relative_path), self._lease_record(relative_path, token)
+        )
+        return True
+
+    def _remove_lease(self, relative_path: str, lease_path: str, token: str):
+        lease = read_json(lease_path)
+        if lease is not None and lease.get("token") == token:
+            try:
+                os.unlink(lease_path)
+            except FileNotFoundError:
+                pass
+        self.tokens.pop(relative_path, None)
+
+    def complete(self, relative_path: str, result: Dict):
+        """Record the file as done, then drop the lease"""
+        record = {"path": relative_path, "node": self.node_id, **result}
+        write_json_atomic(self._path(DONE_DIR, relative_path, ".json"), record)
+        try:
+            os.unlink(self._path(FAILED_DIR, relative_path, ".json"))
+        except FileNotFoundError:
+            pass
+        self._remove_lease(
+            relative_path,
+            self.lease_path(relative_path),
+            self.tokens.get(relative_path),
+        )
+
+    def fail(self, relative_path: str, error: str):
+        """Record a failure so other nodes skip the file, then drop the lease"""
+        record = {
+            "path": relative_path,
+            "node": self.node_id,
+            "error": error,
+            "failed_at": time.time(),
+        }
+        write_json_atomic(self._path(FAILED_DIR, relative_path, ".json"), record)
+        self._remove_lease(
+            relative_path,
+            self.lease_path(relative_path),
+            self.tokens.get(relative_path),
+        )
+
+    def abandon(self, relative_path: str):
+        """Forget a lease another node has taken over, leaving its records alone"""
+        self.tokens.pop(relative_path, None)
+
+    def update_node(self, status: Dict):
+        """Publish this node's progress for the status command"""
+        write_json_atomic(
+            os.path.join(self.root, NODES_DIR, f"{self.node_id}.json"),
+            {"node": self.node_id, "updated_at": time.time(), **status},
+        )
+
+
+class LeaseKeeper(threading.Thread):
+    """Renews the current lease in the background while a file is processed"""
+
+    def __init__(self, manifest: SharedManifest, relative_path: str):
+        super().__init__(name="lease-keeper", daemon=True)
+        self.manifest = manifest
+        self.relative_path = relative_path
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        interval = self.manifest.lease_seconds / 3
+        while not self._stop_event.wait(interval):
+            if not self.manifest.renew(self.relative_path):
+                self.lost = True
+                return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_worker(
+    manifest: SharedManifest,
+    files: List[str],
+    process: Callable[[str], Dict],
+    retry_failed: bool = False,
+    poll_interval: Optional[float] = None,
+    on_result: Optional[Callable[[str, Optional[Dict], Optional[str]], None]] = None,
+) -> Dict:
+    """
+    Claim and process files until every one is done (or failed).
+
+    `process` receives a path relative to the corpus root and returns a result
+    dict stored in the done record. Files leased by other nodes are revisited
+    every `poll_interval` seconds so leases of dead nodes get reclaimed. With
+    `retry_failed`, a failed file is tried once more per run, not until it
+    succeeds. A file whose lease was lost mid-way is left to the node that
+    took it over.
+    """
+    if poll_interval is None:
+        poll_interval = manifest.lease_seconds / 4
+    stats = {
+        "started_at": time.time(),
+        "files_done": 0,
+        "files_failed": 0,
+        "files_lost": 0,
+        "audio_seconds": 0.0,
+        "busy_seconds": 0.0,
+        "current": None,
+    }
+    manifest.update_node(stats)
+    failed_here = set()
+
+    while True:
+        pending = [
+            f
+            for f in files
+            if not manifest.is_done(f)
+            and f not in failed_here
+            and (retry_failed or not manifest.is_failed(f))
+        ]
+        if not pending:
+            break
+
+        claimed_any = False
+        for relative_path in pending:
+            if not manifest.claim(relative_path):
+                continue
+            claimed_any = True
+            stats["current"] = relative_path
+            manifest.update_node(stats)
+
+            keeper = LeaseKeeper(manifest, relative_path)
+            keeper.start()
+            start_time = time.time()
+            error = None
+            try:
+                result = process(relative_path)
+            except Exception as e:
+                error = str(e)
+            keeper.stop()
+            if keeper.lost or not manifest.owns(relative_path):
+                # Another node reclaimed the lease; its outcome is the one recorded
+                manifest.abandon(relative_path)
+                stats["files_lost"] += 1
+            elif error is not None:
+                manifest.fail(relative_path, error)
+                failed_here.add(relative_path)
+                stats["files_failed"] += 1
+                if on_result:
+                    on_result(relative_path, None, error)
+            else:
+                elapsed = time.time() - start_time
+                result = {**result, "elapsed": elapsed, "finished_at": time.time()}
+                manifest.complete(relative_path, result)
+                stats["files_done"] += 1
+                stats["audio_seconds"] += result.get("duration", 0.0)
+                stats["busy_seconds"] += elapsed
+                if on_result:
+                    on_result(relative_path, result, None)
+            stats["current"] = None
+            manifest.update_node(stats)
+
+        if not claimed_any:
+            # Everything left is leased elsewhere - wait for completion or expiry
+            time.sleep(poll_interval)
+
+    stats["finished_at"] = time.time()
+    manifest.update_node(stats)
+    return stats
+
+
+def collect_status(root: str) -> Dict:
+    """Aggregate done/failed records, live leases and node heartbeats"""
+
+    def records(directory: str, suffix: str) -> List[Dict]:
+        path = os.path.join(root, directory)
+        if not os.path.isdir(path):
+            return []
+        names = [name for name in os.listdir(path) if name.endswith(suffix)]
+        found = (read_json(os.path.join(path, name)) for name in names)
+        return [record for record in found if record]
+
+    return {
+        "manifest": read_json(os.path.join(root, MANIFEST_FILE)) or {},
+        "done": records(DONE_DIR, ".json"),
+        "failed": records(FAILED_DIR, ".json"),
+        "leases": records(LEASES_DIR, ".lease"),
+        "nodes": records(NODES_DIR, ".json"),
+    }
@@ -1,4 +1,10 @@
-from typing import Dict, List, TypedDict
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, TypedDict
+
+MODELS_DIR = os.environ.get(
+    "WSCRIBE_MODELS_DIR", os.path.expanduser("~/.cache/huggingface/hub")
+)
 
 
 # Data models for transcription results
@@ -71,3 +77,13 @@ SUPPORTED_MODELS = [
     "medium.en",
     "base.en",
 ]
+
+
+def get_model_snapshot(model_size: str) -> Optional[Path]:
+    """Return the local snapshot directory of a downloaded model, if any"""
+    snapshots = (
+        Path(MODELS_DIR) / f"models--Systran--faster-whisper-{model_size}" / "snapshots"
+    )
+    if not snapshots.exists():
+        return None
+    return next(snapshots.iterdir(), None)
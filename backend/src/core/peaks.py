@@ -0,0 +1,166 @@
+# Waveform peaks - min/max pyramid of the audio, so the editor never decodes it
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.core.container import MappedArrays, write_arrays
+
+PEAKS_MAGIC = b"ALXPEAKS"
+PEAKS_VERSION = 1
+PEAKS_EXTENSION = ".peaks"
+SAMPLE_RATE = 16000
+# Finest zoom level; each further level halves the resolution
+BASE_SAMPLES_PER_PIXEL = 256
+LEVELS = 7
+CHUNK_SECONDS = 60
+BITS = 8
+
+
+def quantize(values: np.ndarray) -> np.ndarray:
+    """[-1, 1] floats to int8, as audiowaveform's 8-bit data"""
+    return np.clip(np.rint(values * 127), -128, 127).astype(np.int8)
+
+
+class PeakPyramid:
+    """
+    Min/max peaks at several samples-per-pixel levels, fed chunk by chunk.
+
+    Samples are reduced in blocks of the coarsest level's pixel size, so
+    every level's pixels line up with the block edges; only the leftover of
+    each chunk is carried over. The last, partial pixels are reduced as they
+    are.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        base_samples_per_pixel: int = BASE_SAMPLES_PER_PIXEL,
+        levels: int = LEVELS,
+    ):
+        self.sample_rate = sample_rate
+        self.samples_per_pixel = [base_samples_per_pixel << i for i in range(levels)]
+        self.block = self.samples_per_pixel[-1]
+        self.sample_count = 0
+        self._carry = np.empty(0, dtype=np.float32)
+        self._peaks: List[List[np.ndarray]] = [[] for _ in range(levels)]
+
+    def add(self, samples: np.ndarray):
+        self.sample_count += len(samples)
+        if len(self._carry):
+            samples = np.concatenate([self._carry, samples])
+        whole = len(samples) - len(samples) % self.block
+        if whole:
+            self._reduce(samples[:whole])
+        self._carry = samples[whole:].copy()
+
+    def _reduce(self, samples: np.ndarray):
+        base = self.samples_per_pixel[0]
+        starts = np.arange(0, len(samples), base)
+        lows = np.minimum.reduceat(samples, starts)
+        highs = np.maximum.reduceat(samples, starts)
+        for level, peaks in enumerate(self._peaks):
+            if level:
+                # Each level pairs up the pixels of the one below
+                pairs = np.arange(0, len(lows), 2)
+                lows = np.minimum.reduceat(lows, pairs)
+                highs = np.maximum.reduceat(highs, pairs)
+            interleaved = np.empty(2 * len(lows), dtype=np.int8)
+            interleaved[0::2] = quantize(lows)
+            interleaved[1::2] = quantize(highs)
+            peaks.append(interleaved)
+
+    def finish(self) -> Dict[int, np.ndarray]:
+        """samples per pixel -> interleaved int8 min/max pairs"""
+        if len(self._carry):
+            self._reduce(self._carry)
+            self._carry = self._carry[:0]
+        return {
+            samples_per_pixel: np.concatenate(peaks or [np.empty(0, np.int8)])
+            for samples_per_pixel, peaks in zip(self.samples_per_pixel, self._peaks)
+        }
+
+    @property
+    def duration(self) -> float:
+        return self.sample_count / self.sample_rate
+
+
+def array_chunks(audio: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """Already decoded audio in CHUNK_SECONDS slices, for bounded temporaries"""
+    size = CHUNK_SECONDS * sample_rate
+    for start in range(0, len(audio), size):
+        yield start / sample_rate, audio[start : start + size]
+
+
+def compute_peaks(
+    chunks: Iterable, sample_rate: int = SAMPLE_RATE, levels: int = LEVELS
+) -> PeakPyramid:
+    """Pyramid from (offset, samples) chunks, e.g. iter_audio_chunks"""
+    pyramid = PeakPyramid(sample_rate, levels=levels)
+    for _, samples in chunks:
+        pyramid.add(samples)
+    return pyramid
+
+
+def peaks_path_for(output_path: str, format: str = "bin") -> str:
+    extension = PEAKS_EXTENSION + (".json" if format == "json" else "")
+    return os.path.splitext(output_path)[0] + extension
+
+
+def write_peaks(
+    path: str,
+    pyramid: PeakPyramid,
+    format: str = "bin",
+    metadata: Optional[Dict] = None,
+):
+    """
+    Write the pyramid as a memory-mappable binary (one array per level,
+    fetchable by byte range from the header's index) or as JSON with one
+    audiowaveform-style entry per level.
+    """
+    levels = pyramid.finish()
+    header = {
+        "version": PEAKS_VERSION,
+        "sample_rate": pyramid.sample_rate,
+        "bits": BITS,
+        "channels": 1,
+        "duration": pyramid.duration,
+        "metadata": metadata or {},
+    }
+    if format == "bin":
+        write_arrays(
+            path,
+            PEAKS_MAGIC,
+            {**header, "samples_per_pixel": list(levels)},
+            {f"level_{spp}": peaks for spp, peaks in levels.items()},
+        )
+        return
+
+    header["levels"] = [
+        {
+            "samples_per_pixel": spp,
+            "length": len(peaks) // 2,
+            "data": peaks.tolist(),
+        }
+        for spp, peaks in levels.items()
+    ]
+    partial_path = f"{path}.part"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(header, f, separators=(",", ":"))
+    os.replace(partial_path, path)
+
+
+class PeaksFile(MappedArrays):
+    """Peaks sidecar; each level is a view of interleaved min/max int8 pairs"""
+
+    magic = PEAKS_MAGIC
+    version = PEAKS_VERSION
+    description = "peaks file"
+
+    @property
+    def samples_per_pixel(self) -> List[int]:
+        return self.header["samples_per_pixel"]
+
+    def level(self, samples_per_pixel: int) -> np.ndarray:
+        return self.column(f"level_{samples_per_pixel}").reshape(-1, 2)
@@ -0,0 +1,262 @@
+# Preview renditions - small mono Opus/AAC copies of the media for scrubbing
+import json
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from typing import Dict, Optional, Tuple
+
+from src.core.conversion import file_digest
+
+PREVIEW_DIR = os.environ.get(
+    "WSCRIBE_PREVIEW_DIR", os.path.expanduser("~/.cache/aerolex/previews")
+)
+INDEX_FILE = "index.json"
+# Opus in Ogg carries its encoder delay as pre-skip and AAC in MP4 as an edit
+# list, so decoders drop the priming samples and preview time t is source
+# time t. Fragmented MP4 would lose the edit list, so ffmpeg writes a plain
+# one, moov first, to a seekable file.
+CODECS = {
+    "opus": {
+        "encoder": "libopus",
+        "bitrate": "24k",
+        "sample_rate": 48000,
+        "format": "ogg",
+        "extension": ".opus",
+        "content_type": "audio/ogg",
+        "options": ["-application", "voip"],
+    },
+    "aac": {
+        "encoder": "aac",
+        "bitrate": "32k",
+        "sample_rate": 24000,
+        "format": "mp4",
+        "extension": ".m4a",
+        "content_type": "audio/mp4",
+        "options": ["-movflags", "+faststart"],
+    },
+}
+
+
+def preview_path(
+    digest: str, codec: str, bitrate: Optional[str] = None, cache_dir: str = PREVIEW_DIR
+) -> str:
+    settings = CODECS[codec]
+    bitrate = bitrate or settings["bitrate"]
+    return os.path.join(cache_dir, f"{digest}-{codec}-{bitrate}{settings['extension']}")
+
+
+def _load_index(cache_dir: str) -> Dict:
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_index(cache_dir: str, index: Dict):
+    fd, partial_path = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(partial_path, os.path.join(cache_dir, INDEX_FILE))
+
+
+def source_digest(
+    path: str, cache_dir: str = PREVIEW_DIR, compute: bool = True
+) -> Optional[str]:
+    """
+    Content hash of a source, remembered by path, mtime and size so large
+    recordings are hashed once. Without compute, None if not remembered.
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    index = _load_index(cache_dir)
+    known = index.get(path)
+    if known and (known["mtime_ns"], known["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return known["digest"]
+    if not compute:
+        return None
+    digest = file_digest(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Re-read so concurrent runs lose at most their own entry
+    index = _load_index(cache_dir)
+    index[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": digest}
+    _save_index(cache_dir, index)
+    return digest
+
+
+def find_preview(
+    source: str, cache_dir: str = PREVIEW_DIR, compute: bool = False
+) -> Optional[str]:
+    """Cached preview of a source in any codec and bitrate, Opus first"""
+    digest = source_digest(source, cache_dir, compute)
+    if digest is None or not os.path.isdir(cache_dir):
+        return None
+    names = sorted(
+        name
+        for name in os.listdir(cache_dir)
+        if name.startswith(f"{digest}-") and not name.endswith((".json", ".part"))
+    )
+    names.sort(key=lambda name: not name.startswith(f"{digest}-opus-"))
+    return os.path.join(cache_dir, names[0]) if names else None
+
+
+def _boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """(type, payload start, payload end) of the MP4 boxes in data[start:end]"""
+    end = len(data) if end is None else end
+    while start + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[start : start + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[start + 8 : start + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            return
+        yield kind, start + header, min(start + size, end)
+        start += size
+
+
+def _box(data: bytes, *path: bytes) -> Optional[Tuple[int, int]]:
+    """Payload bounds of the first box along a path, e.g. moov, trak, mdia"""
+    start, end = 0, len(data)
+    for kind in path:
+        found = next((box for box in _boxes(data, start, end) if box[0] == kind), None)
+        if found is None:
+            return None
+        _, start, end = found
+    return start, end
+
+
+def _mp4_priming(path: str, sample_rate: int) -> Optional[int]:
+    """Media time of the first edit list entry, in samples at sample_rate"""
+    with open(path, "rb") as f:
+        data = f.read()
+    elst = _box(data, b"moov", b"trak", b"edts", b"elst")
+    mdhd = _box(data, b"moov", b"trak", b"mdia", b"mdhd")
+    if elst is None or mdhd is None:
+        return None
+    # Version 1 boxes have 64-bit times and durations
+    start = elst[0]
+    if data[start]:
+        media_time = struct.unpack(">q", data[start + 16 : start + 24])[0]
+    else:
+        media_time = struct.unpack(">i", data[start + 12 : start + 16])[0]
+    start = mdhd[0] + (20 if data[mdhd[0]] else 12)
+    timescale = struct.unpack(">I", data[start : start + 4])[0]
+    return round(media_time * sample_rate / timescale)
+
+
+def _opus_pre_skip(path: str) -> Optional[int]:
+    """Pre-skip of the OpusHead packet; always counted at 48 kHz"""
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    offset = head.find(b"OpusHead")
+    if offset < 0:
+        return None
+    return struct.unpack("<H", head[offset + 10 : offset + 12])[0]
+
+
+def priming_samples(path: str, codec: str) -> int:
+    """
+    Encoder delay the preview declares for decoders to drop, in samples at
+    its sample rate. Raises RuntimeError if it declares none: the preview
+    would then play late against the source.
+    """
+    if codec == "opus":
+        priming = _opus_pre_skip(path)
+    else:
+        priming = _mp4_priming(path, CODECS[codec]["sample_rate"])
+    if priming is None:
+        raise RuntimeError(f"{path} does not declare its {codec} encoder delay")
+    return priming
+
+
+def build_preview(
+    source: str,
+    codec: str = "opus",
+    bitrate: Optional[str] = None,
+    cache_dir: str = PREVIEW_DIR,
+    force: bool = False,
+) -> Dict:
+    """
+    Transcode the first audio stream to a mono low-bitrate preview.
+
+    One ffmpeg process decodes, downmixes, resamples and encodes straight
+    into the cache, under a name from the source's content hash, so a
+    renamed or copied recording reuses it. No seek or timestamp filter is
+    applied: the preview decodes to the same sample timeline the
+    transcriber saw. Returns the preview path and whether it was cached.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is required to build previews but was not found")
+    settings = CODECS[codec]
+    bitrate = bitrate or settings["bitrate"]
+    digest = source_digest(source, cache_dir)
+    path = preview_path(digest, codec, bitrate, cache_dir)
+    if os.path.exists(path) and not force:
+        return {"path": path, "digest": digest, "cached": True}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, partial_path = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+    os.close(fd)
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        source,
+        "-map",
+        "0:a:0",
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(settings["sample_rate"]),
+        "-c:a",
+        settings["encoder"],
+        "-b:a",
+        bitrate,
+        *settings["options"],
+        "-f",
+        settings["format"],
+        partial_path,
+    ]
+    try:
+        process = subprocess.run(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        if process.returncode != 0:
+            lines = process.stderr.decode("utf-8", "replace").splitlines()
+            detail = lines[-1] if lines else f"exit status {process.returncode}"
+            raise RuntimeError(f"ffmpeg failed: {detail}")
+        priming = priming_samples(partial_path, codec)
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.unlink(partial_path)
+        raise
+
+    from src.core.audio import get_audio_duration
+
+    # Lets the editor check the preview lines up with the source
+    manifest = {
+        "source": os.path.basename(source),
+        "source_duration": get_audio_duration(source),
+        "digest": digest,
+        "codec": codec,
+        "bitrate": bitrate,
+        "sample_rate": settings["sample_rate"],
+        "channels": 1,
+        # Encoder delay at sample_rate, which decoders drop (pre-skip, edit list)
+        "priming_samples": priming,
+        "content_type": settings["content_type"],
+    }
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return {"path": path, "digest": digest, "cached": False}
@@ -0,0 +1,264 @@
+# Streaming transcript readers - the input side of the writer registry
+import json
+import os
+import re
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.core.formatters import parse_timestamp
+from src.core.models import TranscribedData
+
+# Score given to rows read from formats that do not carry one (SRT, VTT, ...)
+UNKNOWN_SCORE = 0.0
+CONTAINER_FORMAT = "alx"
+READ_CHUNK_SIZE = 1 << 20
+
+READERS: Dict[str, Callable[[str], Iterator[TranscribedData]]] = {}
+
+
+def register_reader(name: str):
+    """Decorator adding a path -> rows function to the reader registry"""
+
+    def decorator(function):
+        READERS[name] = function
+        return function
+
+    return decorator
+
+
+def detect_format(path: str) -> Optional[str]:
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in READERS else None
+
+
+def read_transcript(
+    path: str,
+    format: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Iterator[TranscribedData]:
+    """
+    Rows of a transcript file, read incrementally. With start/end only the
+    segments overlapping that time window (in seconds) are returned.
+    """
+    format = format or detect_format(path)
+    if format not in READERS:
+        raise ValueError(f"Cannot read transcript format of {path}")
+    if start is None and end is None:
+        return READERS[format](path)
+    start = float("-inf") if start is None else start
+    end = float("inf") if end is None else end
+    if format == CONTAINER_FORMAT:
+        return _read_alx_window(path, start, end)
+    return (
+        row
+        for row in READERS[format](path)
+        if row["end"] >= start and row["start"] <= end
+    )
+
+
+def _seconds(value) -> float:
+    return parse_timestamp(value) if isinstance(value, str) else float(value)
+
+
+def _row(record: Dict) -> TranscribedData:
+    """Record as written by the JSON writers (or raw TranscribedData) to a row"""
+    if "header" in record and "original" in record:
+        return _analysis_row(record)
+    row = {
+        "text": record["text"],
+        "start": _seconds(record["start"]),
+        "end": _seconds(record["end"]),
+        "score": record.get("score", UNKNOWN_SCORE),
+        "words": [
+            {
+                "text": word["text"],
+                "start": _seconds(word["start"]),
+                "end": _seconds(word["end"]),
+                "score": word.get("score", UNKNOWN_SCORE),
+            }
+            for word in record.get("words") or []
+        ],
+    }
+    for key in ("speaker", "listener"):
+        if record.get(key):
+            row[key] = record[key]
+    return row
+
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+@register_reader("json")
+def read_json(path: str) -> Iterator[TranscribedData]:
+    return map(_row, json_records(path))
+
+
+def json_records(path: str) -> Iterator[Dict]:
+    """Decode a JSON array one element at a time from a sliding buffer"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(READ_CHUNK_SIZE).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} is not a JSON array")
+        position = 1
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if buffer.startswith("]", position):
+                return
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    # Unterminated array, e.g. from an interrupted run
+                    if buffer[position:].strip():
+                        raise
+                    return
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield record
+
+
+@register_reader("jsonl")
+def read_jsonl(path: str) -> Iterator[TranscribedData]:
+    return map(_row, jsonl_records(path))
+
+
+def jsonl_records(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _text_blocks(path: str) -> Iterator[List[str]]:
+    """Groups of non-empty lines separated by blank lines"""
+    block = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line.strip():
+                block.append(line)
+            elif block:
+                yield block
+                block = []
+    if block:
+        yield block
+
+
+_CUE_TIMING = re.compile(r"^\s*(\S+)\s+-->\s+(\S+)")
+
+
+def _subtitle_rows(path: str) -> Iterator[TranscribedData]:
+    for block in _text_blocks(path):
+        for i, line in enumerate(block):
+            match = _CUE_TIMING.match(line)
+            if match:
+                yield {
+                    "text": " " + " ".join(block[i + 1 :]),
+                    "start": parse_timestamp(match.group(1)),
+                    "end": parse_timestamp(match.group(2)),
+                    "score": UNKNOWN_SCORE,
+                    "words": [],
+                }
+                break
+
+
+@register_reader("srt")
+def read_srt(path: str) -> Iterator[TranscribedData]:
+    return _subtitle_rows(path)
+
+
+@register_reader("vtt")
+def read_vtt(path: str) -> Iterator[TranscribedData]:
+    # The WEBVTT header and NOTE/STYLE blocks have no timing line and are skipped
+    return _subtitle_rows(path)
+
+
+@register_reader("tsv")
+def read_tsv(path: str) -> Iterator[TranscribedData]:
+    with open(path, "r", encoding="utf-8") as f:
+        next(f, None)  # Header
+        for line in f:
+            start, end, text = line.rstrip("\n").split("\t", 2)
+            yield {
+                "text": " " + text,
+                "start": int(start) / 1000,
+                "end": int(end) / 1000,
+                "score": UNKNOWN_SCORE,
+                "words": [],
+            }
+
+
+_LBS_HEADER = re.compile(r"^\{(\S+)\s+\S+\s+(\S+)\s+([\d.]+)\s+([\d.]+)\}")
+
+
+def _header_row(header: str, text: str) -> Optional[TranscribedData]:
+    """Row from a header like {log_id_1 1 log_id_1__ID-1__N8F__00_00_02 2.0 4.5}"""
+    match = _LBS_HEADER.match(header)
+    if not match:
+        return None
+    row = {
+        "text": " " + text.strip(),
+        "start": float(match.group(3)),
+        "end": float(match.group(4)),
+        "score": UNKNOWN_SCORE,
+        "words": [],
+    }
+    row["id"] = match.group(2)
+    # session__speaker__listener__HH_MM_SS
+    identifier = match.group(2).split("__")
+    if len(identifier) >= 3 and identifier[1] != "UNK":
+        row["speaker"] = identifier[1]
+    if len(identifier) >= 3 and identifier[2] != "UNK":
+        row["listener"] = identifier[2]
+    return row
+
+
+def _analysis_row(record: Dict) -> TranscribedData:
+    """Entry of the LLM analysis JSON written by data/proc/llm.py"""
+    row = _header_row(record["header"], record["original"])
+    if row is None:
+        raise ValueError(f"Malformed analysis header: {record['header']}")
+    if record.get("pune"):
+        row["pune"] = record["pune"]
+    return row
+
+
+@register_reader("lbs")
+def read_lbs(path: str) -> Iterator[TranscribedData]:
+    """Label blocks; text is the ORIG line, a filled-in PUNE line is kept too"""
+    for block in _text_blocks(path):
+        fields = {}
+        for line in block[1:]:
+            key, _, value = line.partition(":")
+            if key in ("ORIG", "PUNE") and key not in fields:
+                fields[key] = value.strip()
+        if "ORIG" not in fields:
+            continue
+        row = _header_row(block[0], fields["ORIG"])
+        if row is None:
+            continue
+        if fields.get("PUNE"):
+            row["pune"] = fields["PUNE"]
+        yield row
+
+
+@register_reader(CONTAINER_FORMAT)
+def read_alx(path: str) -> Iterator[TranscribedData]:
+    """Rows straight from the memory-mapped columns"""
+    from src.core.container import TranscriptFile
+
+    with TranscriptFile(path) as transcript:
+        for segment in transcript.to_table(copy=False):
+            yield segment.to_dict()
+
+
+def _read_alx_window(path: str, start: float, end: float) -> Iterator[TranscribedData]:
+    """Only the rows in the window, found through the interval index"""
+    from src.core.container import TranscriptFile
+
+    with TranscriptFile(path) as transcript:
+        for segment in transcript.to_table(copy=False).window(start, end):
+            yield segment.to_dict()
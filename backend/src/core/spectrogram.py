@@ -0,0 +1,240 @@
+# Tiled mel spectrograms - computed once here, fetched tile by tile by the editor
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.core.container import MappedArrays, write_arrays
+
+SPECTROGRAM_MAGIC = b"ALXSPECT"
+SPECTROGRAM_VERSION = 1
+SPECTROGRAM_EXTENSION = ".spec"
+SAMPLE_RATE = 16000
+N_FFT = 512
+HOP_LENGTH = 160  # 10ms columns at the finest level
+N_MELS = 80
+# dB range mapped onto 0-255, relative to a full-scale sine
+DB_RANGE = (-100.0, 0.0)
+TILE_WIDTH = 256
+LEVELS = 6
+CHUNK_SECONDS = 60
+
+
+def mel_filters(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """(n_mels, n_fft // 2 + 1) triangular filters, evenly spaced in HTK mels"""
+    mel_max = 2595 * np.log10(1 + (sample_rate / 2) / 700)
+    hz = 700 * (10 ** (np.linspace(0, mel_max, n_mels + 2) / 2595) - 1)
+    bins = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+    lower, center, upper = hz[:-2, None], hz[1:-1, None], hz[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0, np.minimum(rising, falling)).astype(np.float32)
+
+
+class _LevelTiles:
+    """Columns of one zoom level, spooled to disk a full tile at a time"""
+
+    def __init__(self, n_mels: int, directory: str):
+        self.n_mels = n_mels
+        self.columns = 0
+        self.tiles = 0
+        self._pending = np.empty((n_mels, 0), dtype=np.uint8)
+        self._file = tempfile.TemporaryFile(dir=directory)
+
+    def add(self, columns: np.ndarray):
+        self.columns += columns.shape[1]
+        columns = np.concatenate([self._pending, columns], axis=1)
+        count = columns.shape[1] // TILE_WIDTH
+        if count:
+            tiles = columns[:, : count * TILE_WIDTH].reshape(self.n_mels, count, -1)
+            self._file.write(np.ascontiguousarray(tiles.transpose(1, 0, 2)))
+            self.tiles += count
+        self._pending = columns[:, count * TILE_WIDTH :]
+
+    def finish(self) -> np.ndarray:
+        """All tiles as (tiles, n_mels, TILE_WIDTH), mapped from the spool"""
+        if self._pending.shape[1]:
+            tile = np.zeros((self.n_mels, TILE_WIDTH), dtype=np.uint8)
+            tile[:, : self._pending.shape[1]] = self._pending
+            self._file.write(tile)
+            self.tiles += 1
+            self._pending = self._pending[:, :0]
+        self._file.flush()
+        if not self.tiles:
+            return np.empty((0, self.n_mels, TILE_WIDTH), dtype=np.uint8)
+        return np.memmap(
+            self._file,
+            dtype=np.uint8,
+            mode="r",
+            shape=(self.tiles, self.n_mels, TILE_WIDTH),
+        )
+
+    def close(self):
+        self._file.close()
+
+
+class SpectrogramTiler:
+    """
+    Streaming STFT -> mel -> dB -> uint8, cut into fixed-width time tiles.
+
+    Column i of the finest level is centred on sample i * hop_length. Each
+    further level max-pools pairs of columns, so short transmissions stay
+    visible when zoomed out. Only the FFT overlap and less than a tile per
+    level are held between chunks; finished tiles are spooled to disk.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: int = SAMPLE_RATE,
+        n_fft: int = N_FFT,
+        hop_length: int = HOP_LENGTH,
+        n_mels: int = N_MELS,
+        levels: int = LEVELS,
+    ):
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.sample_count = 0
+        self._frames = 0
+        self._window = np.hanning(n_fft).astype(np.float32)
+        # Power of a full-scale sine through the window is the 0dB reference
+        self._reference = (self._window.sum() / 2) ** 2
+        self._filters = mel_filters(sample_rate, n_fft, n_mels)
+        # Centre the first frame on the first sample
+        self._carry = np.zeros(n_fft // 2, dtype=np.float32)
+        self._odd: List[Optional[np.ndarray]] = [None] * levels
+        self._levels = [_LevelTiles(n_mels, directory) for _ in range(levels)]
+
+    def add(self, samples: np.ndarray):
+        self.sample_count += len(samples)
+        self._frames_from(np.concatenate([self._carry, samples]))
+
+    def _frames_from(self, buffer: np.ndarray, count: Optional[int] = None):
+        if count is None:
+            count = max(0, (len(buffer) - self.n_fft) // self.hop_length + 1)
+        if count:
+            frames = np.lib.stride_tricks.sliding_window_view(buffer, self.n_fft)
+            frames = frames[: count * self.hop_length : self.hop_length]
+            self._add_columns(self._quantize(frames))
+            self._frames += count
+        self._carry = buffer[count * self.hop_length :]
+
+    def _quantize(self, frames: np.ndarray) -> np.ndarray:
+        spectrum = np.fft.rfft(frames * self._window, axis=1)
+        power = (spectrum.real**2 + spectrum.imag**2).astype(np.float32)
+        mel = self._filters @ power.T
+        db = 10 * np.log10(np.maximum(mel / self._reference, 1e-12))
+        low, high = DB_RANGE
+        scaled = (db - low) * (255 / (high - low))
+        return np.clip(np.rint(scaled), 0, 255).astype(np.uint8)
+
+    def _add_columns(self, columns: np.ndarray, final: bool = False):
+        for level, tiles in enumerate(self._levels):
+            if level:
+                # Pair up with the column left over from the previous chunk
+                if self._odd[level] is not None:
+                    columns = np.concatenate([self._odd[level], columns], axis=1)
+                    self._odd[level] = None
+                pairs = columns.shape[1] // 2
+                if columns.shape[1] % 2 and not final:
+                    self._odd[level] = columns[:, -1:]
+                pooled = np.maximum(
+                    columns[:, 0 : 2 * pairs : 2], columns[:, 1 : 2 * pairs : 2]
+                )
+                if columns.shape[1] % 2 and final:
+                    pooled = np.concatenate([pooled, columns[:, -1:]], axis=1)
+                columns = pooled
+            tiles.add(columns)
+
+    def finish(self) -> Dict:
+        """Flush the last frames; returns the header and the tiles per level"""
+        total = -(-self.sample_count // self.hop_length)
+        remaining = total - self._frames
+        needed = (remaining - 1) * self.hop_length + self.n_fft
+        if remaining > 0:
+            buffer = np.zeros(max(needed, len(self._carry)), dtype=np.float32)
+            buffer[: len(self._carry)] = self._carry
+            self._frames_from(buffer, remaining)
+        self._add_columns(np.empty((self.n_mels, 0), dtype=np.uint8), final=True)
+        arrays = {f"level_{i}": tiles.finish() for i, tiles in enumerate(self._levels)}
+
+        header = {
+            "version": SPECTROGRAM_VERSION,
+            "sample_rate": self.sample_rate,
+            "n_fft": self.n_fft,
+            "hop_length": self.hop_length,
+            "n_mels": self.n_mels,
+            "db_range": list(DB_RANGE),
+            "tile_width": TILE_WIDTH,
+            "duration": self.sample_count / self.sample_rate,
+            "levels": [
+                {
+                    "seconds_per_column": (self.hop_length << level) / self.sample_rate,
+                    "columns": tiles.columns,
+                    "tiles": tiles.tiles,
+                }
+                for level, tiles in enumerate(self._levels)
+            ],
+        }
+        return {"header": header, "arrays": arrays}
+
+    def close(self):
+        for tiles in self._levels:
+            tiles.close()
+
+
+def write_spectrogram(
+    path: str,
+    chunks: Iterable,
+    sample_rate: int = SAMPLE_RATE,
+    levels: int = LEVELS,
+    n_mels: int = N_MELS,
+    metadata: Optional[Dict] = None,
+) -> Dict:
+    """
+    Tile the (offset, samples) chunks into a memory-mappable spectrogram file.
+
+    Level k is one array of (tiles, n_mels, tile_width) uint8, lowest mel band
+    first; tile t is a fixed-size slice at offset + t * n_mels * tile_width.
+    Returns the header.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tiler = SpectrogramTiler(directory, sample_rate, n_mels=n_mels, levels=levels)
+    try:
+        for _, samples in chunks:
+            tiler.add(samples)
+        result = tiler.finish()
+        header = {**result["header"], "metadata": metadata or {}}
+        write_arrays(path, SPECTROGRAM_MAGIC, header, result["arrays"])
+        return header
+    finally:
+        tiler.close()
+
+
+class SpectrogramFile(MappedArrays):
+    """Tiled spectrogram; tiles are zero-copy views of the file"""
+
+    magic = SPECTROGRAM_MAGIC
+    version = SPECTROGRAM_VERSION
+    description = "spectrogram file"
+
+    @property
+    def levels(self) -> List[Dict]:
+        return self.header["levels"]
+
+    def tiles(self, level: int) -> np.ndarray:
+        """(tiles, n_mels, tile_width) view of one level"""
+        return self.column(f"level_{level}").reshape(
+            -1, self.header["n_mels"], self.header["tile_width"]
+        )
+
+    def tile(self, level: int, index: int) -> np.ndarray:
+        return self.tiles(level)[index]
+
+    def tile_at(self, level: int, seconds: float) -> int:
+        """Index of the tile covering a point in time"""
+        column = seconds / self.levels[level]["seconds_per_column"]
+        return int(column // self.header["tile_width"])
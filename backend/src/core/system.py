@@ -0,0 +1,38 @@
+# Host introspection helpers - device detection, memory accounting
+import os
+import resource
+import socket
+import sys
+
+
+def detect_device() -> str:
+    """Return "cuda" when CTranslate2 can see a CUDA device, otherwise "cpu" """
+    import ctranslate2
+
+    return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+
+def default_compute_type(device: str) -> str:
+    """Compute type used when nothing better is known for this host"""
+    return "float16" if device == "cuda" else "int8"
+
+
+def host_id() -> str:
+    """Identifier used to key per-host settings such as tuning profiles"""
+    return socket.gethostname()
+
+
+def cpu_count() -> int:
+    """Number of CPUs this process is allowed to run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
@@ -0,0 +1,380 @@
+# Columnar transcript storage - flat NumPy columns instead of a dict per word
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from src.core.formatters import format_timestamps, parse_timestamps
+from src.core.models import TranscribedData, WordTiming
+
+if TYPE_CHECKING:
+    from src.core.intervals import TranscriptIndex
+
+# Array attributes of a TranscriptTable, besides the `text` buffer
+TABLE_COLUMNS = (
+    "segment_start",
+    "segment_end",
+    "segment_score",
+    "segment_text_offset",
+    "segment_text_length",
+    "word_offsets",
+    "word_start",
+    "word_end",
+    "word_score",
+    "word_text_offset",
+    "word_text_length",
+)
+
+
+class WordView:
+    """Read-only view of one word row; also readable like a WordTiming dict"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "TranscriptTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def text(self) -> str:
+        return self.table.word_text(self.index)
+
+    @property
+    def start(self) -> float:
+        return float(self.table.word_start[self.index])
+
+    @property
+    def end(self) -> float:
+        return float(self.table.word_end[self.index])
+
+    @property
+    def score(self) -> float:
+        return float(self.table.word_score[self.index])
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def to_dict(self) -> WordTiming:
+        return {
+            "text": self.text,
+            "start": self.start,
+            "end": self.end,
+            "score": self.score,
+        }
+
+    def __repr__(self) -> str:
+        return f"WordView({self.to_dict()!r})"
+
+
+class SegmentView:
+    """Read-only view of one segment row; also readable like a TranscribedData"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "TranscriptTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def text(self) -> str:
+        return self.table.segment_text(self.index)
+
+    @property
+    def start(self) -> float:
+        return float(self.table.segment_start[self.index])
+
+    @property
+    def end(self) -> float:
+        return float(self.table.segment_end[self.index])
+
+    @property
+    def score(self) -> float:
+        return float(self.table.segment_score[self.index])
+
+    @property
+    def words(self) -> List[WordView]:
+        first, last = self.table.word_range(self.index)
+        return [WordView(self.table, i) for i in range(first, last)]
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def to_dict(self) -> TranscribedData:
+        return {
+            "text": self.text,
+            "start": self.start,
+            "end": self.end,
+            "score": self.score,
+            "words": [word.to_dict() for word in self.words],
+        }
+
+    def __repr__(self) -> str:
+        return f"SegmentView({self.text!r}, {self.start}-{self.end})"
+
+
+class TranscriptTable:
+    """
+    Segments and words stored as columns.
+
+    Times and scores are float64 arrays. `word_offsets[i]:word_offsets[i + 1]`
+    are the words of segment i. All text lives in one string `text`, addressed
+    by (offset, length) spans; repeated strings are interned and share a span.
+    Iterating yields SegmentView rows, which also read like the
+    TranscribedData dicts, so the existing formatters accept a table directly.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        segment_start: np.ndarray,
+        segment_end: np.ndarray,
+        segment_score: np.ndarray,
+        segment_text_offset: np.ndarray,
+        segment_text_length: np.ndarray,
+        word_offsets: np.ndarray,
+        word_start: np.ndarray,
+        word_end: np.ndarray,
+        word_score: np.ndarray,
+        word_text_offset: np.ndarray,
+        word_text_length: np.ndarray,
+    ):
+        self.text = text
+        self.segment_start = segment_start
+        self.segment_end = segment_end
+        self.segment_score = segment_score
+        self.segment_text_offset = segment_text_offset
+        self.segment_text_length = segment_text_length
+        self.word_offsets = word_offsets
+        self.word_start = word_start
+        self.word_end = word_end
+        self.word_score = word_score
+        self.word_text_offset = word_text_offset
+        self.word_text_length = word_text_length
+
+    @property
+    def word_count(self) -> int:
+        return len(self.word_start)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and the text buffer"""
+        columns = sum(getattr(self, name).nbytes for name in TABLE_COLUMNS)
+        return columns + len(self.text)
+
+    def segment_text(self, index: int) -> str:
+        offset = self.segment_text_offset[index]
+        return self.text[offset : offset + self.segment_text_length[index]]
+
+    def word_text(self, index: int) -> str:
+        offset = self.word_text_offset[index]
+        return self.text[offset : offset + self.word_text_length[index]]
+
+    def word_range(self, index: int) -> Tuple[int, int]:
+        return int(self.word_offsets[index]), int(self.word_offsets[index + 1])
+
+    def __len__(self) -> int:
+        return len(self.segment_start)
+
+    @property
+    def index(self) -> "TranscriptIndex":
+        """Interval index over segment and word times, built on first use"""
+        if getattr(self, "_index", None) is None:
+            from src.core.intervals import TranscriptIndex
+
+            self._index = TranscriptIndex(self)
+        return self._index
+
+    def select(self, segments: np.ndarray) -> "TranscriptTable":
+        """Table of the given segment rows and their words, sharing the text"""
+        segments = np.asarray(segments, dtype=np.int64)
+        firsts = self.word_offsets[segments]
+        counts = self.word_offsets[segments + 1] - firsts
+        word_offsets = np.zeros(len(segments) + 1, dtype=np.int64)
+        np.cumsum(counts, out=word_offsets[1:])
+        words = np.repeat(firsts - word_offsets[:-1], counts)
+        words += np.arange(len(words), dtype=np.int64)
+        return TranscriptTable(
+            text=self.text,
+            segment_start=self.segment_start[segments],
+            segment_end=self.segment_end[segments],
+            segment_score=self.segment_score[segments],
+            segment_text_offset=self.segment_text_offset[segments],
+            segment_text_length=self.segment_text_length[segments],
+            word_offsets=word_offsets,
+            word_start=self.word_start[words],
+            word_end=self.word_end[words],
+            word_score=self.word_score[words],
+            word_text_offset=self.word_text_offset[words],
+            word_text_length=self.word_text_length[words],
+        )
+
+    def window(self, start: float, end: float) -> "TranscriptTable":
+        """Segments overlapping [start, end], with their words"""
+        return self.select(self.index.segments_between(start, end))
+
+    def __getitem__(self, index: int) -> SegmentView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return SegmentView(self, index)
+
+    def __iter__(self) -> Iterator[SegmentView]:
+        return (SegmentView(self, i) for i in range(len(self)))
+
+    def to_dicts(self) -> List[TranscribedData]:
+        """Convert to the TypedDict shape used by the formatters and frontend"""
+        return [segment.to_dict() for segment in self]
+
+    def to_records(self) -> List[dict]:
+        """Records in the format_json layout, with HH:MM:SS.mmm timestamps"""
+        segment_starts = format_timestamps(self.segment_start)
+        segment_ends = format_timestamps(self.segment_end)
+        word_starts = format_timestamps(self.word_start)
+        word_ends = format_timestamps(self.word_end)
+        segment_scores = self.segment_score.tolist()
+        word_scores = self.word_score.tolist()
+        offsets = self.word_offsets.tolist()
+        return [
+            {
+                "start": segment_starts[i],
+                "end": segment_ends[i],
+                "text": self.segment_text(i),
+                "score": segment_scores[i],
+                "words": [
+                    {
+                        "start": word_starts[j],
+                        "end": word_ends[j],
+                        "text": self.word_text(j),
+                        "score": word_scores[j],
+                    }
+                    for j in range(offsets[i], offsets[i + 1])
+                ],
+            }
+            for i in range(len(self))
+        ]
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> "TranscriptTable":
+        """Build from format_json records such as src/data/text/log.json"""
+        words = [word for record in records for word in record["words"]]
+        segment_starts = parse_timestamps([r["start"] for r in records]).tolist()
+        segment_ends = parse_timestamps([r["end"] for r in records]).tolist()
+        word_starts = iter(parse_timestamps([w["start"] for w in words]).tolist())
+        word_ends = iter(parse_timestamps([w["end"] for w in words]).tolist())
+        builder = TranscriptBuilder()
+        for record, start, end in zip(records, segment_starts, segment_ends):
+            builder.add_segment(
+                record["text"],
+                start,
+                end,
+                record["score"],
+                [
+                    (w["text"], next(word_starts), next(word_ends), w["score"])
+                    for w in record["words"]
+                ],
+            )
+        return builder.build()
+
+    @classmethod
+    def from_dicts(cls, data: Iterable[TranscribedData]) -> "TranscriptTable":
+        builder = TranscriptBuilder()
+        for segment in data:
+            builder.add_segment(
+                segment["text"],
+                segment["start"],
+                segment["end"],
+                segment["score"],
+                [
+                    (w["text"], w["start"], w["end"], w["score"])
+                    for w in segment["words"]
+                ],
+            )
+        return builder.build()
+
+    @classmethod
+    def from_segments(cls, segments: Iterable) -> "TranscriptTable":
+        """Build from faster-whisper segments, scoring segments by avg_logprob"""
+        builder = TranscriptBuilder()
+        for segment in segments:
+            builder.add_segment(
+                segment.text,
+                segment.start,
+                segment.end,
+                segment.avg_logprob,
+                [
+                    (word.word, word.start, word.end, word.probability)
+                    for word in (segment.words or [])
+                ],
+            )
+        return builder.build()
+
+
+class TranscriptBuilder:
+    """Accumulates rows in compact arrays, then freezes them into a table"""
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._length = 0
+        self._interned: Dict[str, int] = {}
+        self.segment_start = array("d")
+        self.segment_end = array("d")
+        self.segment_score = array("d")
+        self.segment_text_offset = array("q")
+        self.segment_text_length = array("q")
+        self.word_offsets = array("q", [0])
+        self.word_start = array("d")
+        self.word_end = array("d")
+        self.word_score = array("d")
+        self.word_text_offset = array("q")
+        self.word_text_length = array("q")
+
+    def _intern(self, text: str) -> int:
+        offset = self._interned.get(text)
+        if offset is None:
+            offset = self._interned[text] = self._length
+            self._chunks.append(text)
+            self._length += len(text)
+        return offset
+
+    def add_segment(
+        self,
+        text: str,
+        start: float,
+        end: float,
+        score: float,
+        words: Iterable[Tuple[str, float, float, float]] = (),
+    ):
+        """Append a segment and its (text, start, end, score) word rows"""
+        self.segment_start.append(start)
+        self.segment_end.append(end)
+        self.segment_score.append(score)
+        self.segment_text_offset.append(self._intern(text))
+        self.segment_text_length.append(len(text))
+        for word_text, word_start, word_end, word_score in words:
+            self.word_start.append(word_start)
+            self.word_end.append(word_end)
+            self.word_score.append(word_score)
+            self.word_text_offset.append(self._intern(word_text))
+            self.word_text_length.append(len(word_text))
+        self.word_offsets.append(len(self.word_start))
+
+    def build(self) -> TranscriptTable:
+        def column(values: array) -> np.ndarray:
+            # array typecodes "d"/"q" double as NumPy float64/int64 dtypes
+            return np.array(values, dtype=values.typecode)
+
+        return TranscriptTable(
+            text="".join(self._chunks),
+            segment_start=column(self.segment_start),
+            segment_end=column(self.segment_end),
+            segment_score=column(self.segment_score),
+            segment_text_offset=column(self.segment_text_offset),
+            segment_text_length=column(self.segment_text_length),
+            word_offsets=column(self.word_offsets),
+            word_start=column(self.word_start),
+            word_end=column(self.word_end),
+            word_score=column(self.word_score),
+            word_text_offset=column(self.word_text_offset),
+            word_text_length=column(self.word_text_length),
+        )
@@ -0,0 +1,204 @@
+# Decoding configuration sweep and per-host tuning profiles
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from src.core.models import MODELS_DIR, get_model_snapshot
+from src.core.system import cpu_count, host_id, peak_rss_mb
+
+PROFILES_FILE = os.path.join(MODELS_DIR, "tuning_profiles.json")
+
+# Compute types worth trying per device, fastest first
+PREFERRED_COMPUTE_TYPES = {
+    "cpu": ["int8", "int8_float32", "float32"],
+    "cuda": ["float16", "int8_float16", "int8"],
+}
+
+
+@dataclass
+class DecodingConfig:
+    model: str
+    device: str
+    compute_type: str
+    cpu_threads: int
+    num_workers: int
+    beam_size: int
+
+
+@dataclass
+class TrialResult:
+    config: DecodingConfig
+    duration: float = 0.0
+    elapsed: float = 0.0
+    wer: float = 1.0
+    peak_rss_mb: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def realtime_factor(self) -> float:
+        """Processing time per second of audio (lower is faster)"""
+        return self.elapsed / self.duration if self.duration else float("inf")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase and strip punctuation so WER only counts word differences"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_word != hyp_word),  # substitution
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_reference_text(path: str) -> str:
+    """Load a reference transcript from a JSON segment list or plain text"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            return " ".join(segment["text"] for segment in json.load(f))
+        return f.read()
+
+
+def supported_compute_types(device: str) -> List[str]:
+    """Preferred compute types for a device that CTranslate2 can actually run"""
+    import ctranslate2
+
+    available = ctranslate2.get_supported_compute_types(device)
+    return [ct for ct in PREFERRED_COMPUTE_TYPES[device] if ct in available]
+
+
+def default_thread_counts(device: str) -> List[int]:
+    """Thread counts to sweep - a GPU run does not depend on CPU threads"""
+    if device == "cuda":
+        return [0]
+    cores = cpu_count()
+    return sorted({max(1, cores // 2), cores})
+
+
+def candidate_configs(
+    models: Sequence[str],
+    device: str,
+    compute_types: Sequence[str],
+    cpu_threads: Sequence[int],
+    beam_sizes: Sequence[int],
+) -> Iterator[DecodingConfig]:
+    """
+    Cartesian product of every swept decoding option. Workers only help
+    with several transcriptions at once, so a single-stream run keeps one.
+    """
+    for model, compute_type, threads, beam_size in itertools.product(
+        models, compute_types, cpu_threads, beam_sizes
+    ):
+        yield DecodingConfig(
+            model=model,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=threads,
+            num_workers=1,
+            beam_size=beam_size,
+        )
+
+
+def run_trial(
+    config: DecodingConfig, audio_path: str, reference_text: str
+) -> TrialResult:
+    """Transcribe the reference clip once with the given configuration"""
+    from faster_whisper import WhisperModel, decode_audio
+
+    audio = decode_audio(audio_path)
+    duration = len(audio) / 16000
+
+    model = WhisperModel(
+        model_size_or_path=str(get_model_snapshot(config.model)),
+        device=config.device,
+        compute_type=config.compute_type,
+        cpu_threads=config.cpu_threads,
+        num_workers=config.num_workers,
+    )
+
+    start_time = time.perf_counter()
+    segments, _ = model.transcribe(
+        audio,
+        beam_size=config.beam_size,
+        word_timestamps=True,
+        condition_on_previous_text=True,
+    )
+    hypothesis = " ".join(segment.text for segment in segments)
+    elapsed = time.perf_counter() - start_time
+
+    return TrialResult(
+        config=config,
+        duration=duration,
+        elapsed=elapsed,
+        wer=word_error_rate(reference_text, hypothesis),
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def run_trial_isolated(
+    config: DecodingConfig, audio_path: str, reference_text: str
+) -> TrialResult:
+    """Run a trial in a fresh process so peak RSS is measured per configuration"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        try:
+            return pool.submit(run_trial, config, audio_path, reference_text).result()
+        except Exception as e:
+            return TrialResult(config=config, error=str(e))
+
+
+def select_best(results: List[TrialResult], max_wer: float) -> Optional[TrialResult]:
+    """Fastest trial within the WER budget, lowest memory breaking ties"""
+    acceptable = [r for r in results if r.error is None and r.wer <= max_wer]
+    if not acceptable:
+        return None
+    return min(acceptable, key=lambda r: (r.elapsed, r.peak_rss_mb))
+
+
+def load_profiles() -> Dict[str, Dict]:
+    """Load all saved tuning profiles keyed by host"""
+    if os.path.exists(PROFILES_FILE):
+        with open(PROFILES_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def load_profile(host: Optional[str] = None) -> Optional[Dict]:
+    """Load the tuning profile saved for a host (default: this host)"""
+    return load_profiles().get(host or host_id())
+
+
+def save_profile(result: TrialResult, max_wer: float, host: Optional[str] = None):
+    """Persist the winning trial as the tuning profile for a host"""
+    profiles = load_profiles()
+    profiles[host or host_id()] = {
+        **asdict(result.config),
+        "wer": round(result.wer, 4),
+        "max_wer": max_wer,
+        "realtime_factor": round(result.realtime_factor, 4),
+        "peak_rss_mb": result.peak_rss_mb,
+        "tuned_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    os.makedirs(os.path.dirname(PROFILES_FILE), exist_ok=True)
+    with open(PROFILES_FILE, "w") as f:
+        json.dump(profiles, f, indent=2)
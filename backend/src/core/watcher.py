@@ -0,0 +1,274 @@
+# Directory watching for continuously recorded drops - inotify with polling fallback
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+MEDIA_EXTENSIONS = (
+    ".mp3",
+    ".wav",
+    ".flac",
+    ".m4a",
+    ".ogg",
+    ".opus",
+    ".mp4",
+    ".avi",
+    ".mov",
+    ".mkv",
+    ".webm",
+)
+
+
+def list_media_files(directory: str) -> List[str]:
+    """Media files below a directory as sorted paths relative to it"""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        # Skip hidden directories such as manifests and state stores
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            if not name.startswith(".") and name.lower().endswith(MEDIA_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(found)
+
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWakeup:
+    """
+    Wakes the scanner when something changes in a directory.
+
+    Only used as a hint - network shares do not deliver inotify events for
+    remote writes, so the periodic scan stays the source of truth.
+    """
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout: float) -> bool:
+        """Block until events arrive or the timeout passes; True on events"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the queue; the scan decides what actually changed
+        while True:
+            try:
+                data = os.read(self.fd, 64 * _EVENT_HEADER.size)
+            except BlockingIOError:
+                return True
+            if not data:
+                return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWakeup:
+    """Fallback that simply sleeps until the next scan"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(timeout)
+        return False
+
+    def close(self):
+        pass
+
+
+def create_wakeup(directory: str, polling: bool = False):
+    """inotify where available (Linux), periodic polling everywhere else"""
+    if not polling:
+        try:
+            return InotifyWakeup(directory)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWakeup(directory)
+
+
+@dataclass
+class FileState:
+    size: int
+    mtime: float
+    stable_since: float
+
+
+class StabilityTracker:
+    """Report files whose size and mtime have not changed for `settle` seconds"""
+
+    def __init__(self, settle: float):
+        self.settle = settle
+        self.files: Dict[str, FileState] = {}
+
+    def update(self, directory: str, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        seen = set()
+        ready = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+                if not entry.name.lower().endswith(MEDIA_EXTENSIONS):
+                    continue
+                stat = entry.stat()
+                seen.add(entry.path)
+                state = self.files.get(entry.path)
+                if state is None:
+                    # Files untouched for longer than the settle time count as
+                    # complete right away, e.g. a backlog found at startup
+                    age = time.time() - stat.st_mtime
+                    stable_since = now - self.settle if age >= self.settle else now
+                    state = FileState(stat.st_size, stat.st_mtime, stable_since)
+                    self.files[entry.path] = state
+                elif state.size != stat.st_size or state.mtime != stat.st_mtime:
+                    self.files[entry.path] = FileState(stat.st_size, stat.st_mtime, now)
+                    continue
+                if stat.st_size > 0 and now - state.stable_since >= self.settle:
+                    ready.append(entry.path)
+        for path in set(self.files) - seen:
+            del self.files[path]
+        return sorted(ready)
+
+
+class WatchStateDB:
+    """SQLite record of processed files so restarts never redo finished work"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                status TEXT NOT NULL,
+                output TEXT,
+                error TEXT,
+                processed_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def is_processed(self, path: str) -> bool:
+        """True if this exact version of the file was already handled"""
+        stat = os.stat(path)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime FROM processed WHERE path = ?", (path,)
+            ).fetchone()
+        return row is not None and row == (stat.st_size, stat.st_mtime)
+
+    def record(
+        self,
+        path: str,
+        status: str,
+        output: Optional[str] = None,
+        error: Optional[str] = None,
+    ):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Removed while being processed; nothing left to skip next time
+            return
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    stat.st_size,
+                    stat.st_mtime,
+                    status,
+                    output,
+                    error,
+                    time.time(),
+                ),
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class DirectoryWatcher(threading.Thread):
+    """
+    Scan a directory and feed completed, unprocessed files into a bounded queue.
+
+    When the queue is full the file simply stays pending and is offered again
+    on a later scan, so ingest never outruns transcription.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        jobs: queue.Queue,
+        state: WatchStateDB,
+        settle: float = 5.0,
+        interval: float = 2.0,
+        polling: bool = False,
+    ):
+        super().__init__(name="watcher", daemon=True)
+        self.directory = directory
+        self.jobs = jobs
+        self.state = state
+        self.interval = interval
+        self.tracker = StabilityTracker(settle)
+        self.wakeup = create_wakeup(directory, polling)
+        self.in_flight: Set[str] = set()
+        self.deferred = 0
+        self._stop_event = threading.Event()
+
+    def done(self, path: str):
+        """Called by the consumer once a queued file has been handled"""
+        self.in_flight.discard(path)
+
+    def scan(self):
+        self.deferred = 0
+        for path in self.tracker.update(self.directory):
+            try:
+                if path in self.in_flight or self.state.is_processed(path):
+                    continue
+            except FileNotFoundError:
+                continue
+            try:
+                self.jobs.put_nowait(path)
+            except queue.Full:
+                self.deferred += 1
+                continue
+            self.in_flight.add(path)
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                self.scan()
+                self.wakeup.wait(self.interval)
+        finally:
+            self.wakeup.close()
+
+    def stop(self):
+        self._stop_event.set()
+        if not self.is_alive():
+            self.wakeup.close()
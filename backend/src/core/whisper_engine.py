@@ -1,10 +1,8 @@
 # Renamed from transcriber.py - handles whisper model operations
-from typing import List
-
 import numpy as np
 from faster_whisper import WhisperModel
 
-from backend.core.models import TranscribedData
+from src.core.transcript import TranscriptTable
 
 
 class WhisperEngine:  # Renamed from FasterWhisperBackend for clarity
@@ -28,7 +26,7 @@ class WhisperEngine:  # Renamed from FasterWhisperBackend for clarity
             compute_type=self.compute_type,
         )
 
-    def transcribe(self, input: np.ndarray) -> List[TranscribedData]:
+    def transcribe(self, input: np.ndarray) -> TranscriptTable:
         if self.model is None:
             raise RuntimeError("Model not loaded. Call load() first")
 
@@ -37,27 +35,5 @@ class WhisperEngine:  # Renamed from FasterWhisperBackend for clarity
             word_timestamps=True,
         )
 
-        result = []
-        for segment in segments:
-            words = []
-            for word in segment.words:
-                words.append(
-                    {
-                        "text": word.word,
-                        "start": word.start,
-                        "end": word.end,
-                        "score": word.probability,
-                    }
-                )
-
-            result.append(
-                {
-                    "text": segment.text,
-                    "start": segment.start,
-                    "end": segment.end,
-                    "score": segment.avg_logprob,
-                    "words": words,
-                }
-            )
-
-        return result
+        # Columns rather than a dict per word; to_dicts() gives the old shape
+        return TranscriptTable.from_segments(segments)
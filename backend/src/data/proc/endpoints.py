@@ -0,0 +1,329 @@
+# Ollama endpoint pool - least-outstanding balancing, health checks, breakers
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import ollama
+
+DEFAULT_HOST = "http://localhost:11435"
+# Consecutive failures that take an endpoint out of rotation
+FAILURE_THRESHOLD = 3
+# Seconds before a tripped endpoint is given one trial request
+COOLDOWN_SECONDS = 30.0
+# First wait before retrying on an endpoint that already failed the request;
+# doubled on every further attempt
+RETRY_BACKOFF_SECONDS = 2.0
+HEALTH_INTERVAL_SECONDS = 10.0
+HEALTH_TIMEOUT_SECONDS = 2.0
+# Statuses that say something about the node rather than the request:
+# model not pulled there, queue full, server error
+NODE_STATUSES = (404, 429)
+
+
+class NoEndpointAvailable(Exception):
+    pass
+
+
+def hosts_from_env(default: str = DEFAULT_HOST) -> List[str]:
+    """OLLAMA_HOSTS as a comma separated list, else the default host"""
+    hosts = os.environ.get("OLLAMA_HOSTS", "")
+    return [host.strip() for host in hosts.split(",") if host.strip()] or [default]
+
+
+def is_node_failure(error: BaseException) -> bool:
+    """Whether another endpoint might answer where this one failed"""
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code >= 500 or error.status_code in NODE_STATUSES
+    return isinstance(error, (httpx.TransportError, ConnectionError))
+
+
+class Endpoint:
+    """One Ollama server with its own keep-alive connection pool"""
+
+    def __init__(self, host: str, client_options: Dict):
+        if "://" not in host:
+            host = f"http://{host}"
+        self.host = host.rstrip("/")
+        self.outstanding = 0
+        self.failures = 0  # Consecutive
+        self.open_until = 0.0
+        self.trial = False  # Half-open trial request in flight
+        self.healthy = True
+        self.requests = 0
+        self.errors = 0
+        self._client_options = client_options
+        self._client: Optional[ollama.Client] = None
+        self._async_client: Optional[ollama.AsyncClient] = None
+
+    @property
+    def client(self) -> ollama.Client:
+        if self._client is None:
+            self._client = ollama.Client(host=self.host, **self._client_options)
+        return self._client
+
+    @property
+    def async_client(self) -> ollama.AsyncClient:
+        # Made on first use so it belongs to the running event loop
+        if self._async_client is None:
+            self._async_client = ollama.AsyncClient(
+                host=self.host, **self._client_options
+            )
+        return self._async_client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+
+class EndpointPool:
+    """
+    Spreads chat requests over several Ollama servers.
+
+    Each request goes to the available endpoint with the fewest requests in
+    flight. A request that fails on the node (connection, read, 5xx) is
+    retried at once on another endpoint; only when every available one has
+    failed it already does the retry wait, with exponential backoff.
+    FAILURE_THRESHOLD consecutive failures open an endpoint's circuit: it
+    gets no requests for the cooldown, then one trial request that closes
+    the circuit again or reopens it. A background thread probes /api/version
+    and keeps unreachable endpoints out of rotation.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN_SECONDS,
+        health_interval: float = HEALTH_INTERVAL_SECONDS,
+        retry_backoff: float = RETRY_BACKOFF_SECONDS,
+        **client_options,
+    ):
+        if not hosts:
+            raise ValueError("At least one endpoint is required")
+        self.endpoints = [Endpoint(host, client_options) for host in hosts]
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health_interval = health_interval
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def _available(self, endpoint: Endpoint, now: float) -> bool:
+        if not endpoint.healthy:
+            return False
+        if endpoint.failures < self.failure_threshold:
+            return True
+        return now >= endpoint.open_until and not endpoint.trial
+
+    def _select(self, exclude: Sequence[Endpoint]) -> Tuple[Optional[Endpoint], float]:
+        """
+        Claim the least loaded available endpoint, preferring ones not in
+        exclude; else None and the seconds until one may become available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = [e for e in self.endpoints if self._available(e, now)]
+            candidates = [e for e in available if e not in exclude] or available
+            if candidates:
+                # Least outstanding; among idle ones, the least used
+                endpoint = min(candidates, key=lambda e: (e.outstanding, e.requests))
+                endpoint.outstanding += 1
+                endpoint.requests += 1
+                endpoint.trial = endpoint.failures >= self.failure_threshold
+                return endpoint, 0.0
+            reopening = [
+                e.open_until - now
+                for e in self.endpoints
+                if e.healthy and e.open_until > now
+            ]
+            return None, min(reopening, default=self.health_interval)
+
+    def _release(self, endpoint: Endpoint, ok: Optional[bool]):
+        """Return a claimed endpoint; ok None means the outcome says nothing"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.trial = False
+            if ok:
+                endpoint.failures = 0
+                endpoint.open_until = 0.0
+            elif ok is False:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                if endpoint.failures >= self.failure_threshold:
+                    endpoint.open_until = time.monotonic() + self.cooldown
+
+    def _deadline(self, max_wait: Optional[float]) -> float:
+        return time.monotonic() + (self.cooldown if max_wait is None else max_wait)
+
+    def _backoff(
+        self, endpoint: Endpoint, tried: List[Endpoint], attempt: int
+    ) -> float:
+        """Seconds to wait before an attempt: none unless endpoint failed it before"""
+        if endpoint not in tried:
+            return 0.0
+        wait = self.retry_backoff * 2 ** (tried.count(endpoint) - 1)
+        print(f"Retrying {endpoint.host} in {wait:g} seconds... (Attempt {attempt})")
+        return wait
+
+    def _unavailable(self) -> NoEndpointAvailable:
+        hosts = ", ".join(endpoint.host for endpoint in self.endpoints)
+        return NoEndpointAvailable(f"No Ollama endpoint available ({hosts})")
+
+    def acquire(
+        self, exclude: Sequence[Endpoint] = (), max_wait: Optional[float] = None
+    ) -> Endpoint:
+        """Claim an endpoint, waiting up to max_wait (default: the cooldown)"""
+        deadline = self._deadline(max_wait)
+        while True:
+            endpoint, wait = self._select(exclude)
+            if endpoint is not None:
+                return endpoint
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise self._unavailable()
+            time.sleep(min(wait, remaining))
+
+    async def aacquire(
+        self, exclude: Sequence[Endpoint] = (), max_wait: Optional[float] = None
+    ) -> Endpoint:
+        deadline = self._deadline(max_wait)
+        while True:
+            endpoint, wait = self._select(exclude)
+            if endpoint is not None:
+                return endpoint
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise self._unavailable()
+            await asyncio.sleep(min(wait, remaining))
+
+    def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        max_attempts: int = 3,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        **options,
+    ) -> str:
+        """
+        Stream a chat answer and return its text, trying up to max_attempts
+        endpoints. Raises the last node failure, or NoEndpointAvailable.
+        """
+        tried: List[Endpoint] = []
+        for attempt in range(1, max_attempts + 1):
+            endpoint = self.acquire(tried)
+            try:
+                time.sleep(self._backoff(endpoint, tried, attempt))
+                text = ""
+                for chunk in endpoint.client.chat(
+                    model=model, messages=messages, stream=True, **options
+                ):
+                    if chunk.message.content:
+                        text += chunk.message.content
+                        if on_chunk:
+                            on_chunk(chunk.message.content)
+            except BaseException as e:
+                failed = is_node_failure(e)
+                self._release(endpoint, False if failed else None)
+                if not failed or attempt == max_attempts:
+                    raise
+                print(f"\n{endpoint.host} failed: {str(e)}")
+                tried.append(endpoint)
+                continue
+            self._release(endpoint, True)
+            return text
+
+    async def achat(
+        self, model: str, messages: List[Dict], max_attempts: int = 3, **options
+    ) -> str:
+        """chat on the endpoints' async clients"""
+        tried: List[Endpoint] = []
+        for attempt in range(1, max_attempts + 1):
+            endpoint = await self.aacquire(tried)
+            try:
+                await asyncio.sleep(self._backoff(endpoint, tried, attempt))
+                text = ""
+                async for chunk in await endpoint.async_client.chat(
+                    model=model, messages=messages, stream=True, **options
+                ):
+                    if chunk.message.content:
+                        text += chunk.message.content
+            except BaseException as e:
+                failed = is_node_failure(e)
+                self._release(endpoint, False if failed else None)
+                if not failed or attempt == max_attempts:
+                    raise
+                print(f"\n{endpoint.host} failed: {str(e)}")
+                tried.append(endpoint)
+                continue
+            self._release(endpoint, True)
+            return text
+
+    def check_health(self):
+        """Probe every endpoint once and update which are reachable"""
+        with httpx.Client(timeout=HEALTH_TIMEOUT_SECONDS) as http:
+            for endpoint in self.endpoints:
+                try:
+                    http.get(f"{endpoint.host}/api/version").raise_for_status()
+                    healthy = True
+                except httpx.HTTPError:
+                    healthy = False
+                with self._lock:
+                    endpoint.healthy = healthy
+
+    def _health_loop(self):
+        while not self._stop.is_set():
+            self.check_health()
+            self._stop.wait(self.health_interval)
+
+    def start_health_checks(self):
+        if self._health_thread is None:
+            self._stop.clear()
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name="ollama-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def stats(self) -> List[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "host": endpoint.host,
+                    "healthy": endpoint.healthy,
+                    "open": endpoint.failures >= self.failure_threshold
+                    and now < endpoint.open_until,
+                    "outstanding": endpoint.outstanding,
+                    "requests": endpoint.requests,
+                    "errors": endpoint.errors,
+                }
+                for endpoint in self.endpoints
+            ]
+
+    async def aclose(self):
+        """Close the async clients; the next event loop gets new ones"""
+        for endpoint in self.endpoints:
+            await endpoint.aclose()
+
+    def close(self):
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+        for endpoint in self.endpoints:
+            endpoint.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,11 +1,43 @@
+import argparse
+import asyncio
 import json
-import time
+import os
+import tempfile
 from typing import Dict, List, Optional
 
 import httpx
 import ollama
+from endpoints import EndpointPool, NoEndpointAvailable, hosts_from_env
+from llm_cache import CACHE_DIR, ResponseCache, request_key
 from pydantic import BaseModel, Field
 
+MODEL = "llama3.3:70b-instruct-q4_K_M"
+# Ollama options sent with every request; part of the cache key
+CHAT_OPTIONS: Dict = {}
+# Previous messages given to the model as context
+HISTORY_SIZE = 5
+# Blocks analyzed per file
+MAX_BLOCKS = 30
+INTENTION_CODES = (
+    "PSC",
+    "PSR",
+    "PRP",
+    "PRQ",
+    "PRB",
+    "PAC",
+    "ASC",
+    "AGI",
+    "ACR",
+    "END",
+)
+# Failures that leave a message without analysis rather than stop the run
+LLM_ERRORS = (
+    httpx.HTTPError,
+    ConnectionError,
+    ollama.ResponseError,
+    NoEndpointAvailable,
+)
+
 
 class ATCNumbers(BaseModel):
     Csgn: Optional[str] = Field(None, description="Aircraft Callsign")
@@ -224,17 +256,17 @@ def determine_speaker_role(speaker_callsign: str) -> str:
         return "ATC"
 
 
-def analyze_atc_message(
-    message: Dict, conversation_history: List[Dict] = None, max_retries: int = 3
-) -> ATCAnalysis:
-    """Use Ollama to analyze ATC message and generate PUNE and NOTE sections."""
-
-    if conversation_history is None:
-        conversation_history = []
+def empty_analysis() -> ATCAnalysis:
+    """Blank analysis used when the model cannot be reached or answers badly."""
+    return ATCAnalysis(
+        pune="",
+        intentions={code: False for code in INTENTION_CODES},
+        numbers=ATCNumbers(),
+    )
 
-    # Create Ollama client with custom endpoint
-    client = ollama.Client(host="http://localhost:11435")
 
+def build_messages(message: Dict, conversation_history: List[Dict]) -> List[Dict]:
+    """Build the system and user chat messages for one ATC message."""
     # Extract callsign from header
     callsign = extract_callsign_from_header(message["header"])
     # Extract speaker and listener callsigns
@@ -389,55 +421,11 @@ Return ONLY a JSON object with this exact structure (no explanation text, no mar
 }}""",
     }
 
-    messages = [system_message, analysis_prompt]
+    return [system_message, analysis_prompt]
 
-    # Process with streaming and retries
-    print(f"\nAnalyzing: {message['ORIG'][:60]}...")
-
-    attempt = 0
-    while attempt < max_retries:
-        try:
-            full_response = ""
-            for chunk in client.chat(
-                model="llama3.3:70b-instruct-q4_K_M",
-                messages=messages,
-                stream=True,
-            ):
-                if chunk.message.content:
-                    full_response += chunk.message.content
-                    print(".", end="", flush=True)
-
-            print("\nDone!")
-            break
-
-        except (httpx.ReadError, ConnectionError) as e:
-            attempt += 1
-            if attempt < max_retries:
-                wait_time = 2**attempt  # Exponential backoff
-                print(f"\nConnection error: {str(e)}")
-                print(
-                    f"Retrying in {wait_time} seconds... (Attempt {attempt + 1}/{max_retries})"
-                )
-                time.sleep(wait_time)
-            else:
-                print(f"\nFailed after {max_retries} attempts: {str(e)}")
-                return ATCAnalysis(
-                    pune="",
-                    intentions={
-                        "PSC": False,
-                        "PSR": False,
-                        "PRP": False,
-                        "PRQ": False,
-                        "PRB": False,
-                        "PAC": False,
-                        "ASC": False,
-                        "AGI": False,
-                        "ACR": False,
-                        "END": False,
-                    },
-                    numbers=ATCNumbers(),
-                )
 
+def parse_analysis(full_response: str) -> ATCAnalysis:
+    """Validate the model's JSON answer, falling back to an empty analysis."""
     # Debug print
     print("\nFull response from LLM:")
     print(full_response)
@@ -449,22 +437,112 @@ Return ONLY a JSON object with this exact structure (no explanation text, no mar
     except Exception as e:
         print(f"Error parsing response: {str(e)}")
         print(f"Raw response: {full_response}")
-        return ATCAnalysis(
-            pune="",
-            intentions={
-                "PSC": False,
-                "PSR": False,
-                "PRP": False,
-                "PRQ": False,
-                "PRB": False,
-                "PAC": False,
-                "ASC": False,
-                "AGI": False,
-                "ACR": False,
-                "END": False,
-            },
-            numbers=ATCNumbers(),
+        return empty_analysis()
+
+
+def cache_key(messages: List[Dict]) -> str:
+    """Cache key of a request built by build_messages."""
+    system, user = (m["content"] for m in messages)
+    return request_key(MODEL, system, user, CHAT_OPTIONS)
+
+
+def cached_analysis(cache: Optional[ResponseCache], key: str) -> Optional[ATCAnalysis]:
+    """The cached analysis for a request, if there is a valid one."""
+    if cache is None:
+        return None
+    return cache.get(key, validate=lambda value: ATCAnalysis(**value))
+
+
+def store_analysis(cache: Optional[ResponseCache], key: str, analysis: ATCAnalysis):
+    """Cache an analysis; failed ones (no PUNE) are asked again next time."""
+    if cache is not None and analysis.pune:
+        cache.put(key, MODEL, analysis.model_dump())
+
+
+def analyze_atc_message(
+    message: Dict,
+    conversation_history: List[Dict] = None,
+    max_retries: int = 3,
+    pool: Optional[EndpointPool] = None,
+    cache: Optional[ResponseCache] = None,
+) -> ATCAnalysis:
+    """
+    Use Ollama to analyze ATC message and generate PUNE and NOTE sections.
+    A failed request is retried on another endpoint of the pool, up to
+    max_retries attempts in all. With a cache, an identical earlier request
+    is answered from it without calling the server.
+    """
+
+    if conversation_history is None:
+        conversation_history = []
+
+    messages = build_messages(message, conversation_history)
+    key = cache_key(messages)
+    analysis = cached_analysis(cache, key)
+    if analysis is not None:
+        print(f"\nCached: {message['ORIG'][:60]}")
+        return analysis
+
+    # Process with streaming and retries
+    print(f"\nAnalyzing: {message['ORIG'][:60]}...")
+
+    own_pool = pool is None
+    if own_pool:
+        pool = EndpointPool(hosts_from_env())
+    try:
+        full_response = pool.chat(
+            MODEL,
+            messages,
+            max_attempts=max_retries,
+            on_chunk=lambda _: print(".", end="", flush=True),
+            options=CHAT_OPTIONS or None,
         )
+        print("\nDone!")
+    except LLM_ERRORS as e:
+        print(f"\nFailed after {max_retries} attempts: {str(e)}")
+        return empty_analysis()
+    finally:
+        if own_pool:
+            pool.close()
+
+    analysis = parse_analysis(full_response)
+    store_analysis(cache, key, analysis)
+    return analysis
+
+
+async def analyze_atc_message_async(
+    pool: EndpointPool,
+    semaphore: asyncio.Semaphore,
+    message: Dict,
+    conversation_history: List[Dict],
+    max_retries: int = 3,
+    cache: Optional[ResponseCache] = None,
+) -> ATCAnalysis:
+    """
+    Async analyze_atc_message; the semaphore bounds the requests in flight.
+    Progress dots are left out since answers interleave.
+    """
+    messages = build_messages(message, conversation_history)
+    key = cache_key(messages)
+    analysis = cached_analysis(cache, key)
+    if analysis is not None:
+        return analysis
+
+    async with semaphore:
+        try:
+            full_response = await pool.achat(
+                MODEL,
+                messages,
+                max_attempts=max_retries,
+                options=CHAT_OPTIONS or None,
+            )
+        except LLM_ERRORS as e:
+            print(f"\nFailed after {max_retries} attempts: {str(e)}")
+            return empty_analysis()
+
+    analysis = parse_analysis(full_response)
+    store_analysis(cache, key, analysis)
+    return analysis
 
 
 def format_note_section(analysis: ATCAnalysis) -> str:
@@ -500,97 +578,340 @@ def format_note_section(analysis: ATCAnalysis) -> str:
     return note
 
 
-def save_json_analysis(processed_blocks: List[Dict], output_path: str):
-    """Save the analysis results as a JSON file."""
-    json_output = []
+def analysis_record(message: Dict, analysis: ATCAnalysis) -> Dict:
+    """A message and its analysis as saved in the JSON output."""
+    return {
+        "header": message["header"],
+        "original": message["ORIG"],
+        "processed": message["PROC"],
+        "numeric": message["NUMC"],
+        "punctuated": message["PUNC"],
+        "pune": analysis.pune,
+        "intentions": analysis.intentions,
+        "numbers": analysis.numbers.model_dump(),
+    }
 
-    for block in processed_blocks:
-        # Extract relevant information
-        analysis = {
-            "header": block["header"],
-            "original": block["ORIG"],
-            "processed": block["PROC"],
-            "numeric": block["NUMC"],
-            "punctuated": block["PUNC"],
-            "pune": block["analysis"].pune,
-            "intentions": block["analysis"].intentions,
-            "numbers": block["analysis"].numbers.model_dump(),
-        }
-        json_output.append(analysis)
 
-    # Save to JSON file
-    json_path = output_path.replace(".lbs", ".json")
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(json_output, f, indent=2, ensure_ascii=False)
+def format_lbs_block(record: Dict) -> str:
+    """Format an analysis record as a .lbs block."""
+    analysis = ATCAnalysis(
+        pune=record["pune"],
+        intentions=record["intentions"],
+        numbers=ATCNumbers(**record["numbers"]),
+    )
+    new_block = f"{record['header']}\n"
+    new_block += f"ORIG: {record['original']}\n"
+    new_block += f"PROC: {record['processed']}\n"
+    new_block += f"NUMC: {record['numeric']}\n"
+    new_block += f"PUNC: {record['punctuated']}\n"
+    new_block += f"PUNE: {analysis.pune}\n"
+    new_block += "NOTE:\n"
+    new_block += format_note_section(analysis)
+    return new_block
+
+
+def _replace_file(path: str, content: str):
+    """Write a file through a temporary sibling so readers never see half."""
+    fd, partial_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), suffix=".part"
+    )
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(partial_path, path)
+
+
+class Checkpoint:
+    """
+    Analysis results for one output file, saved as they arrive.
+
+    Each record is appended to .<output>.checkpoint.jsonl beside the output
+    and its block to the .lbs, so saving a message costs one short write
+    instead of rewriting everything analyzed so far. consolidate writes the
+    final .lbs and .json in input order and removes the checkpoint. When
+    resuming, records are read back from the checkpoint and any earlier
+    .json output, keyed by header.
+    """
+
+    def __init__(self, output_path: str, resume: bool = False):
+        self.output_path = output_path
+        self.json_path = output_path.replace(".lbs", ".json")
+        directory, name = os.path.split(output_path)
+        self.path = os.path.join(directory, f".{name}.checkpoint.jsonl")
+        self.records: Dict[str, Dict] = {}
+        if resume:
+            self._load()
+        mode = "a" if resume else "w"
+        self._log = open(self.path, mode, encoding="utf-8")
+        self._lbs = open(output_path, mode, encoding="utf-8")
+
+    def _load(self):
+        if os.path.exists(self.json_path):
+            try:
+                with open(self.json_path, "r", encoding="utf-8") as f:
+                    previous = json.load(f)
+            except json.JSONDecodeError:
+                print(f"Warning: ignoring unreadable {self.json_path}")
+                previous = []
+            for record in previous:
+                self.records[record["header"]] = record
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        complete = data[: data.rfind(b"\n") + 1]
+        if len(complete) != len(data):
+            # A record cut short by a crash; drop it and analyze again
+            with open(self.path, "r+b") as f:
+                f.truncate(len(complete))
+        for line in complete.decode("utf-8").splitlines():
+            record = json.loads(line)
+            self.records[record["header"]] = record
+
+    def is_done(self, message: Dict) -> bool:
+        """Analyzed already; failed analyses (no PUNE) are tried again."""
+        record = self.records.get(message["header"])
+        return record is not None and bool(record["pune"])
+
+    def add(self, message: Dict, analysis: ATCAnalysis):
+        record = analysis_record(message, analysis)
+        self.records[record["header"]] = record
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        if self._lbs.tell():
+            self._lbs.write("\n\n")
+        self._lbs.write(format_lbs_block(record))
+        self._lbs.flush()
+
+    def consolidate(self, messages: List[Dict]):
+        """Write the final outputs in input order and drop the checkpoint."""
+        self.close()
+        records = [
+            self.records[message["header"]]
+            for message in messages
+            if message["header"] in self.records
+        ]
+        _replace_file(
+            self.output_path, "\n\n".join(format_lbs_block(r) for r in records)
+        )
+        _replace_file(self.json_path, json.dumps(records, indent=2, ensure_ascii=False))
+        os.unlink(self.path)
 
-    print(f"Saved JSON analysis to {json_path}")
+    def close(self):
+        self._log.close()
+        self._lbs.close()
 
 
-def process_file(input_path: str, output_path: str):
-    """Process the entire ATC transcription file with context."""
+def parse_messages(input_path: str) -> List[Dict]:
+    """Parse the first MAX_BLOCKS blocks of a file, skipping malformed ones."""
     with open(input_path, "r", encoding="utf-8") as f:
         content = f.read()
 
-    # Use the new parsing function
-    blocks = parse_atc_blocks(content)
-    processed_blocks = []
-    json_blocks = []
-    conversation_history = []
-
-    total_blocks = min(30, len(blocks))
-    print(f"\nProcessing {total_blocks} messages...")
-
-    for i, block in enumerate(blocks[:30], 1):
+    messages = []
+    for block in parse_atc_blocks(content)[:MAX_BLOCKS]:
         if not block.strip():
             continue
-
-        print(f"\nMessage {i}/{total_blocks}")
-
         message = parse_atc_block(block)
-        if not message:
-            continue
-
-        # Analyze with conversation history
-        analysis = analyze_atc_message(message, conversation_history)
-
-        # Store message with its analysis
-        message["analysis"] = analysis
-        json_blocks.append(message)
-
-        # Add to conversation history
-        conversation_history.append(message)
-
-        # Keep history manageable
-        if len(conversation_history) > 5:
-            conversation_history.pop(0)
-
-        # Format block for .lbs file
-        new_block = f"{message['header']}\n"
-        new_block += f"ORIG: {message['ORIG']}\n"
-        new_block += f"PROC: {message['PROC']}\n"
-        new_block += f"NUMC: {message['NUMC']}\n"
-        new_block += f"PUNC: {message['PUNC']}\n"
-        new_block += f"PUNE: {analysis.pune}\n"
-        new_block += "NOTE:\n"
-        new_block += format_note_section(analysis)
+        if message:
+            messages.append(message)
+    return messages
+
+
+def history_windows(messages: List[Dict]) -> List[List[Dict]]:
+    """
+    The conversation history each message is analyzed with: the previous
+    HISTORY_SIZE messages. Only their ORIG text is used, so the windows are
+    known before any analysis and the messages can be analyzed in any order.
+    """
+    return [messages[max(0, i - HISTORY_SIZE) : i] for i in range(len(messages))]
+
+
+def process_file(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 1,
+    pool: Optional[EndpointPool] = None,
+    resume: bool = False,
+    cache: Optional[ResponseCache] = None,
+):
+    """
+    Process the entire ATC transcription file with context. With concurrency
+    above 1, that many messages are analyzed at once; see analyze_pending_async.
+    Without a pool, one is made for the hosts in OLLAMA_HOSTS. With resume,
+    messages already in the output are not analyzed again.
+    """
+    if pool is None:
+        with EndpointPool(hosts_from_env()) as pool:
+            pool.start_health_checks()
+            process_file(input_path, output_path, concurrency, pool, resume, cache)
+        return
+
+    messages = parse_messages(input_path)
+    checkpoint = Checkpoint(output_path, resume)
+    try:
+        # Windows come from every message, analyzed before or not
+        pending = [
+            (message, history)
+            for message, history in zip(messages, history_windows(messages))
+            if not checkpoint.is_done(message)
+        ]
+        if resume:
+            print(
+                f"\nResuming: {len(messages) - len(pending)} of {len(messages)} "
+                "messages already analyzed"
+            )
+        if concurrency > 1:
+            asyncio.run(
+                analyze_pending_async(pending, checkpoint, concurrency, pool, cache)
+            )
+        else:
+            analyze_pending(pending, checkpoint, pool, cache)
+    except BaseException:
+        checkpoint.close()
+        raise
+    checkpoint.consolidate(messages)
 
-        processed_blocks.append(new_block)
+    print("\nCompleted! All results saved to:")
+    print(f"- LBS file: {output_path}")
+    print(f"- JSON file: {checkpoint.json_path}")
 
-        # Save progress to both formats
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("\n\n".join(processed_blocks))
 
-        # Save JSON analysis
-        save_json_analysis(json_blocks, output_path)
+def analyze_pending(
+    pending: List,
+    checkpoint: Checkpoint,
+    pool: EndpointPool,
+    cache: Optional[ResponseCache] = None,
+):
+    """Analyze (message, history) pairs one at a time."""
+    total_blocks = len(pending)
+    print(f"\nProcessing {total_blocks} messages...")
 
-        print(f"Saved progress to {output_path}")
+    for i, (message, conversation_history) in enumerate(pending, 1):
+        print(f"\nMessage {i}/{total_blocks}")
 
-    print("\nCompleted! All results saved to:")
-    print(f"- LBS file: {output_path}")
-    print(f"- JSON file: {output_path.replace('.lbs', '.json')}")
+        # Analyze with conversation history
+        analysis = analyze_atc_message(
+            message, conversation_history, pool=pool, cache=cache
+        )
+        checkpoint.add(message, analysis)
+        print(f"Saved progress to {checkpoint.output_path}")
+
+
+async def analyze_pending_async(
+    pending: List,
+    checkpoint: Checkpoint,
+    concurrency: int,
+    pool: EndpointPool,
+    cache: Optional[ResponseCache] = None,
+):
+    """
+    Analyze (message, history) pairs with up to concurrency requests in
+    flight over the pool.
+
+    Every message is submitted at once with its precomputed history window;
+    results are awaited in file order, so the output is written exactly as
+    the sequential path writes it while later messages are still running.
+    Each Ollama server only answers in parallel up to its OLLAMA_NUM_PARALLEL
+    slots, so there is no point going beyond their sum.
+    """
+    total_blocks = len(pending)
+    print(f"\nProcessing {total_blocks} messages, {concurrency} at a time...")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.create_task(
+            analyze_atc_message_async(pool, semaphore, message, history, cache=cache)
+        )
+        for message, history in pending
+    ]
+    try:
+        for i, ((message, _), task) in enumerate(zip(pending, tasks), 1):
+            analysis = await task
+            print(f"\nMessage {i}/{total_blocks}: {message['ORIG'][:60]}")
+            checkpoint.add(message, analysis)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await pool.aclose()
+
+
+def output_path_for(input_path: str) -> str:
+    """dca_proc.lbs -> dca_llm.lbs"""
+    base, ext = os.path.splitext(input_path)
+    if base.endswith("_proc"):
+        base = base[: -len("_proc")]
+    return f"{base}_llm{ext}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze processed ATC transcripts (*_proc.lbs) with an LLM"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["dca_proc.lbs", "dfw_proc.lbs", "log_id_proc.lbs"],
+        help="Input .lbs files; each is written to <name>_llm.lbs and .json",
+    )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Messages analyzed at once (the servers' OLLAMA_NUM_PARALLEL summed)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Keep messages already in the output (by header) and analyze the rest",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help="Cache of validated analyses by request (default: %(default)s); "
+        "invalidate it with llm_cache.py clear",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always ask the server")
+    parser.add_argument(
+        "--host",
+        dest="hosts",
+        action="append",
+        help="Ollama server, repeat for several (default: OLLAMA_HOSTS, "
+        "comma separated, else localhost:11435)",
+    )
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    with EndpointPool(args.hosts or hosts_from_env()) as pool:
+        pool.start_health_checks()
+        for input_path in args.inputs:
+            process_file(
+                input_path,
+                output_path_for(input_path),
+                args.concurrency,
+                pool,
+                args.resume,
+                cache,
+            )
+        print("\nEndpoints:")
+        for endpoint in pool.stats():
+            print(
+                f"- {endpoint['host']}: {endpoint['requests']} requests, "
+                f"{endpoint['errors']} failed"
+            )
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate)"
+        )
+        evicted = cache.evict()
+        if evicted:
+            print(f"Evicted {evicted} least recently used cache entries")
 
 
 if __name__ == "__main__":
-    process_file("dca_proc.lbs", "dca_llm.lbs")
-    process_file("dfw_proc.lbs", "dfw_llm.lbs")
-    process_file("log_id_proc.lbs", "log_id_llm.lbs")
+    main()
@@ -0,0 +1,153 @@
+# LLM response cache - validated analyses stored by a hash of the request
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+CACHE_DIR = os.environ.get(
+    "WSCRIBE_LLM_CACHE_DIR", os.path.expanduser("~/.cache/aerolex/llm")
+)
+# Least recently used entries are evicted beyond this size
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def request_key(model: str, system: str, user: str, options: Dict) -> str:
+    """Content address of a request: everything that shapes the answer"""
+    request = {"model": model, "system": system, "user": user, "options": options}
+    encoded = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Validated analyses on disk, one JSON file per request key, fanned out
+    over subdirectories by the key's first two characters. A hit touches
+    the file, so its mtime orders entries for least-recently-used eviction.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str, validate: Optional[Callable[[Dict], object]] = None):
+        """
+        The cached analysis, passed through validate when given. An entry
+        validate rejects with ValueError is dropped and counts as a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)["analysis"]
+            if validate is not None:
+                value = validate(value)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+            self.misses += 1
+            self.discard(key)
+            return None
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, model: str, analysis: Dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"model": model, "created": time.time(), "analysis": analysis}
+        fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(partial_path, path)
+
+    def discard(self, key: str):
+        """Forget one entry, e.g. one that no longer validates"""
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self) -> Iterator[Tuple[str, os.stat_result]]:
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    yield entry.path, entry.stat()
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Remove least recently used entries until within max_bytes"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for path, stat in entries:
+            if total <= max_bytes:
+                break
+            os.unlink(path)
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def clear(self, model: Optional[str] = None) -> int:
+        """Remove every entry, or only those for one model"""
+        removed = 0
+        for path, _ in list(self._entries()):
+            if model is not None:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        if json.load(f).get("model") != model:
+                            continue
+                except json.JSONDecodeError:
+                    pass
+            os.unlink(path)
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict:
+        entries = list(self._entries())
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(entries),
+            "bytes": sum(stat.st_size for _, stat in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the LLM cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show the number and size of entries")
+    clear = commands.add_parser("clear", help="Invalidate cached analyses")
+    clear.add_argument("--model", help="Only entries for this model")
+    prune = commands.add_parser("prune", help="Evict least recently used entries")
+    prune.add_argument(
+        "--max-mb",
+        type=float,
+        default=MAX_BYTES / (1024 * 1024),
+        help="Size to shrink the cache to (default: %(default)d)",
+    )
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.cache_dir)
+    if args.command == "clear":
+        print(f"Removed {cache.clear(args.model)} entries from {args.cache_dir}")
+    elif args.command == "prune":
+        removed = cache.evict(int(args.max_mb * 1024 * 1024))
+        print(f"Evicted {removed} entries from {args.cache_dir}")
+    stats = cache.stats()
+    print(f"{args.cache_dir}: {stats['entries']} entries, {stats['bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
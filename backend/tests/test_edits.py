@@ -0,0 +1,178 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+import cli
+from src.core.conversion import file_digest, write_rows
+from src.core.edits import (
+    COMPACTING_SUFFIX,
+    EditableTranscript,
+    EditConflict,
+    _hidden_sibling,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+ANNOTATED_LOG = BACKEND_DIR / "src" / "data" / "proc" / "log.json"
+
+# An editor process: saves its patches, retrying on top of others' on conflict
+WRITER = """
+import sys
+
+from src.core import edits
+
+path, name, count = sys.argv[1], sys.argv[2], int(sys.argv[3])
+edits.COMPACT_EVERY = 7
+transcript = edits.EditableTranscript(path)
+saved = 0
+while saved < count:
+    try:
+        transcript.apply(
+            transcript.version, [{"op": "text", "segment": 0, "text": f" {name}"}]
+        )
+        saved += 1
+    except edits.EditConflict:
+        pass
+"""
+
+
+def run_edit(*args):
+    return CliRunner().invoke(cli.cli, ["edit", *map(str, args)])
+
+
+def write_patch(path: Path, version: int, ops) -> Path:
+    path.write_text(json.dumps({"version": version, "ops": ops}), encoding="utf-8")
+    return path
+
+
+def test_compact_keeps_fields_the_writers_drop(tmp_path):
+    transcript = tmp_path / "log.json"
+    shutil.copy(ANNOTATED_LOG, transcript)
+    patch = write_patch(
+        tmp_path / "patch.json", 0, [{"op": "text", "segment": 0, "text": " Edited"}]
+    )
+
+    result = run_edit(transcript, patch, "--compact")
+    assert "its edits stay in the log" in result.output
+    records = json.loads(transcript.read_text(encoding="utf-8"))
+    assert all(record["note"] for record in records)
+
+    editable = EditableTranscript(str(transcript))
+    assert not editable.compactable
+    assert editable.version == 1
+    assert editable.rows[0]["text"] == " Edited"
+
+
+def write_plain(path: Path) -> Path:
+    rows = [
+        {"start": 0.0, "end": 1.0, "text": " One", "score": 0.9, "words": []},
+        {"start": 1.0, "end": 2.0, "text": " two", "score": 0.8, "words": []},
+    ]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    return path
+
+
+def test_compact_rewrites_plain_transcripts(tmp_path):
+    transcript = write_plain(tmp_path / "plain.jsonl")
+    patch = write_patch(tmp_path / "patch.json", 0, [{"op": "merge", "segment": 0}])
+
+    result = run_edit(transcript, patch, "--compact")
+    assert result.exit_code == 0, result.output
+    lines = transcript.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["text"] for line in lines] == [" One two"]
+    assert EditableTranscript(str(transcript)).patches == []
+
+
+def test_retime_cannot_overlap_a_neighbour(tmp_path):
+    path = tmp_path / "three.jsonl"
+    rows = [
+        {"start": float(n), "end": n + 1.0, "text": f" {n}", "score": 1.0}
+        for n in range(3)
+    ]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    transcript = EditableTranscript(str(path))
+
+    for start, end in ((0.5, 2.0), (1.0, 2.9), (0.5, 2.9)):
+        with pytest.raises(ValueError, match="overlap a neighbour"):
+            transcript.apply(
+                0, [{"op": "retime", "segment": 1, "start": start, "end": end}]
+            )
+    assert EditableTranscript(str(path)).version == 0
+
+    ops = [{"op": "retime", "segment": 1, "start": 1.2, "end": 1.8}]
+    assert transcript.apply(0, ops) == 1
+    assert (transcript.rows[1]["start"], transcript.rows[1]["end"]) == (1.2, 1.8)
+
+
+def test_stale_version_from_another_editor_is_rejected(tmp_path):
+    path = str(write_plain(tmp_path / "plain.jsonl"))
+    first, second = EditableTranscript(path), EditableTranscript(path)
+    assert first.apply(0, [{"op": "text", "segment": 0, "text": " First"}]) == 1
+    assert second.is_stale()
+
+    with pytest.raises(EditConflict) as conflict:
+        second.apply(0, [{"op": "text", "segment": 1, "text": " Second"}])
+    assert conflict.value.current == 1
+    assert second.apply(1, [{"op": "text", "segment": 1, "text": " Second"}]) == 2
+
+    texts = [row["text"] for row in EditableTranscript(path).rows]
+    assert texts == [" First", " Second"]
+
+
+def test_concurrent_editor_processes_never_duplicate_a_version(tmp_path):
+    path = write_plain(tmp_path / "plain.jsonl")
+    writers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WRITER, str(path), f"w{n}", "20"],
+            cwd=BACKEND_DIR,
+        )
+        for n in range(3)
+    ]
+    for writer in writers:
+        assert writer.wait(timeout=60) == 0
+
+    transcript = EditableTranscript(str(path))
+    assert transcript.version == 60
+    assert transcript.rows[0]["text"] in (" w0", " w1", " w2")
+
+
+def test_readers_leave_a_compaction_to_the_lock_holder(tmp_path):
+    path = str(write_plain(tmp_path / "plain.jsonl"))
+    pending = _hidden_sibling(path, COMPACTING_SUFFIX)
+    writer = EditableTranscript(path)
+    writer.apply(0, [{"op": "text", "segment": 0, "text": " Edited"}])
+
+    def compact_halfway(swap: bool):
+        # Up to the point where _compact swaps the transcript in
+        loaded = []
+        with writer._lock, writer._locked_log():
+            write_rows(writer.rows, pending, writer.format)
+            writer._start_log(file_digest(pending))
+            reader = threading.Thread(
+                target=lambda: loaded.append(EditableTranscript(path))
+            )
+            reader.start()
+            time.sleep(0.2)
+            assert reader.is_alive()
+            if swap:
+                os.replace(pending, path)
+        reader.join(timeout=10)
+        return loaded[0]
+
+    # A reader waits for the compaction to finish instead of finishing it
+    assert compact_halfway(swap=True).rows[0]["text"] == " Edited"
+
+    # One that died halfway is finished by the next to take the lock
+    writer = EditableTranscript(path)
+    writer.apply(1, [{"op": "text", "segment": 1, "text": " Again"}])
+    transcript = compact_halfway(swap=False)
+    assert not os.path.exists(pending)
+    assert [row["text"] for row in transcript.rows] == [" Edited", " Again"]
+    assert transcript.version == 2 and transcript.patches == []
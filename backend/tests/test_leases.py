@@ -0,0 +1,132 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from src.core.leases import SharedManifest, collect_status, file_key, run_worker
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# A worker node: processes its share of the corpus and logs every file it ran
+WORKER = """
+import sys
+import time
+
+from src.core.leases import SharedManifest, run_worker
+
+root, log_path, node_id = sys.argv[1:4]
+files = [f"rec{{i:02d}}.wav" for i in range({file_count})]
+
+
+def process(relative_path):
+    with open(log_path, "a") as f:
+        f.write(f"{{relative_path}} {{node_id}}\\n")
+    time.sleep(0.02)
+    return {{"duration": 60.0}}
+
+
+manifest = SharedManifest(root, node_id=node_id, lease_seconds=5)
+run_worker(manifest, files, process, poll_interval=0.05)
+"""
+
+
+def test_workers_process_each_file_exactly_once(tmp_path):
+    file_count = 24
+    log_path = tmp_path / "processed.log"
+    workers = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                WORKER.format(file_count=file_count),
+                str(tmp_path / "manifest"),
+                str(log_path),
+                f"node{n}",
+            ],
+            cwd=BACKEND_DIR,
+        )
+        for n in range(4)
+    ]
+    for worker in workers:
+        assert worker.wait(timeout=60) == 0
+
+    processed = [line.split()[0] for line in log_path.read_text().splitlines()]
+    assert sorted(processed) == [f"rec{i:02d}.wav" for i in range(file_count)]
+
+    status = collect_status(str(tmp_path / "manifest"))
+    assert len(status["done"]) == file_count
+    assert status["leases"] == []
+    assert sum(node["files_done"] for node in status["nodes"]) == file_count
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    root = str(tmp_path)
+    dead = SharedManifest(root, node_id="dead", lease_seconds=0.2)
+    assert dead.claim("a.wav")
+
+    live = SharedManifest(root, node_id="live", lease_seconds=0.2)
+    assert not live.claim("a.wav")
+    time.sleep(0.3)
+
+    stats = run_worker(live, ["a.wav"], lambda path: {"duration": 1.0})
+    assert stats["files_done"] == 1
+    done = json.loads((tmp_path / "done" / f"{file_key('a.wav')}.json").read_text())
+    assert done["node"] == "live"
+    # The dead node lost its lease and can no longer extend it
+    assert not dead.renew("a.wav")
+
+
+def test_failed_files_are_skipped_until_retried(tmp_path):
+    manifest = SharedManifest(str(tmp_path), node_id="node", lease_seconds=5)
+
+    def broken(path):
+        raise RuntimeError("bad audio")
+
+    stats = run_worker(manifest, ["a.wav"], broken)
+    assert stats["files_failed"] == 1
+    assert run_worker(manifest, ["a.wav"], broken)["files_failed"] == 0
+
+    stats = run_worker(
+        manifest, ["a.wav"], lambda path: {"duration": 1.0}, retry_failed=True
+    )
+    assert stats["files_done"] == 1
+    assert not manifest.is_failed("a.wav")
+    assert os.listdir(tmp_path / "leases") == []
+
+
+def test_retry_failed_tries_a_failing_file_once_per_run(tmp_path):
+    manifest = SharedManifest(str(tmp_path), node_id="node", lease_seconds=5)
+    attempts = []
+
+    def broken(path):
+        attempts.append(path)
+        raise RuntimeError("bad audio")
+
+    run_worker(manifest, ["a.wav"], broken)
+    stats = run_worker(manifest, ["a.wav"], broken, retry_failed=True)
+    assert stats["files_failed"] == 1
+    assert attempts == ["a.wav", "a.wav"]
+
+
+def test_lost_lease_leaves_the_outcome_to_the_new_owner(tmp_path):
+    root = str(tmp_path)
+    slow = SharedManifest(root, node_id="slow", lease_seconds=0.3)
+    other = SharedManifest(root, node_id="other", lease_seconds=0.3)
+
+    def stalled(path):
+        # Hold the lease past its expiry without renewing, then let the
+        # other node take the file over and finish it
+        slow.renew = lambda relative_path: False
+        time.sleep(0.4)
+        assert other.claim(path)
+        other.complete(path, {"duration": 1.0})
+        raise RuntimeError("interrupted")
+
+    stats = run_worker(slow, ["a.wav"], stalled, poll_interval=0.05)
+    assert stats["files_lost"] == 1
+    assert stats["files_failed"] == 0
+    assert not slow.is_failed("a.wav")
+    done = json.loads((tmp_path / "done" / f"{file_key('a.wav')}.json").read_text())
+    assert done["node"] == "other"
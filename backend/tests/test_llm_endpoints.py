@@ -0,0 +1,170 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ollama
+import pytest
+
+from src.data.proc.endpoints import EndpointPool, NoEndpointAvailable
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers like Ollama's /api/version and streaming /api/chat"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(200, b'{"version": "0.0.0"}', "application/json")
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.chats += 1
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            if server.fail:
+                self._send(
+                    500, b'{"error": "model runner crashed"}', "application/json"
+                )
+                return
+            lines = [
+                {
+                    "model": request["model"],
+                    "message": {"role": "assistant", "content": part},
+                    "done": part == "",
+                }
+                for part in (server.name, "!", "")
+            ]
+            body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+            self._send(200, body, "application/x-ndjson")
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@pytest.fixture
+def stand_ins():
+    servers = []
+
+    def start(name: str, delay: float = 0.0, fail: bool = False) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+        server.daemon_threads = True
+        server.name, server.delay, server.fail = name, delay, fail
+        server.lock = threading.Lock()
+        server.chats = server.in_flight = server.peak = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start, servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def unused_port_host() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_least_outstanding_spreads_concurrent_requests(stand_ins):
+    start, servers = stand_ins
+    pool = EndpointPool([start("a", delay=0.2), start("b", delay=0.2)])
+
+    async def run():
+        try:
+            return await asyncio.gather(*(pool.achat("m", []) for _ in range(6)))
+        finally:
+            await pool.aclose()
+
+    answers = asyncio.run(run())
+    pool.close()
+    assert sorted(answers) == ["a!"] * 3 + ["b!"] * 3
+    assert [server.chats for server in servers] == [3, 3]
+    assert [server.peak for server in servers] == [3, 3]
+
+
+def test_failed_request_moves_to_another_node_and_trips_breaker(stand_ins):
+    start, servers = stand_ins
+    with EndpointPool(
+        [start("bad", fail=True), start("good")], failure_threshold=2, cooldown=0.5
+    ) as pool:
+        # Equally loaded endpoints are taken least used first, so the first
+        # two requests try "bad" before moving on, which opens its circuit
+        answers = [pool.chat("m", []) for _ in range(4)]
+        assert answers == ["good!"] * 4
+        assert servers[0].chats == 2
+        assert pool.stats()[0]["open"]
+
+        # Open: no requests go to it until the cooldown is over
+        pool.chat("m", [])
+        assert servers[0].chats == 2
+
+        # Half open: one trial request, which fails and reopens the circuit
+        time.sleep(0.6)
+        assert pool.chat("m", []) == "good!"
+        assert servers[0].chats == 3
+        assert pool.stats()[0]["open"]
+
+        # Recovered: the next trial closes the circuit again
+        servers[0].fail = False
+        time.sleep(0.6)
+        assert pool.chat("m", []) == "bad!"
+        assert not pool.stats()[0]["open"]
+
+
+def test_health_checks_keep_unreachable_nodes_out(stand_ins):
+    start, servers = stand_ins
+    with EndpointPool([unused_port_host(), start("up")]) as pool:
+        pool.check_health()
+        assert [endpoint["healthy"] for endpoint in pool.stats()] == [False, True]
+        assert [pool.chat("m", []) for _ in range(3)] == ["up!"] * 3
+        assert pool.stats()[0]["requests"] == 0
+
+
+def test_all_nodes_failing_raises(stand_ins):
+    start, _ = stand_ins
+    hosts = [unused_port_host(), start("bad", fail=True)]
+    with EndpointPool(hosts, failure_threshold=1, cooldown=10) as pool:
+        # The last node's error is raised once every attempt has failed
+        with pytest.raises(ollama.ResponseError):
+            pool.chat("m", [], max_attempts=2)
+        assert [endpoint["errors"] for endpoint in pool.stats()] == [1, 1]
+
+        # Both circuits are open; requests wait for one to half open
+        with pytest.raises(NoEndpointAvailable):
+            pool.acquire(max_wait=0.1)
+
+
+def test_retries_back_off_only_without_another_node(stand_ins):
+    start, servers = stand_ins
+    with EndpointPool([start("bad", fail=True)], retry_backoff=0.2) as pool:
+        began = time.monotonic()
+        with pytest.raises(ollama.ResponseError):
+            pool.chat("m", [], max_attempts=3)
+        # 0.2s before the second attempt, 0.4s before the third
+        assert time.monotonic() - began >= 0.6
+        assert servers[0].chats == 3
+
+    hosts = [start("flaky", fail=True), start("good")]
+    with EndpointPool(hosts, retry_backoff=10) as pool:
+        began = time.monotonic()
+        assert pool.chat("m", []) == "good!"
+        assert time.monotonic() - began < 1
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Wall-clock budget for `cli.py --help`, including interpreter startup
+HELP_BUDGET_SECONDS = 1.0
+
+HEAVY_MODULES = [
+    "torch",
+    "faster_whisper",
+    "ctranslate2",
+    "huggingface_hub",
+    "rich",
+    "prompt_toolkit",
+]
+
+LOADED_HEAVY_MODULES = """
+import sys
+import cli
+
+try:
+    cli.cli(sys.argv[1:])
+except SystemExit:
+    pass
+heavy = {heavy!r}
+print("LOADED:" + ",".join(sorted(m for m in heavy if m in sys.modules)))
+"""
+
+
+def run_cli(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", LOADED_HEAVY_MODULES.format(heavy=HEAVY_MODULES)]
+        + list(args),
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_help_stays_under_budget():
+    # Best of three to keep a cold disk cache from failing the run
+    timings = []
+    for _ in range(3):
+        start_time = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "cli.py", "--help"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            check=True,
+        )
+        timings.append(time.perf_counter() - start_time)
+    assert min(timings) < HELP_BUDGET_SECONDS
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ("--help",),
+        ("models", "list"),
+        ("transcribe", "--help"),
+        ("tune", "--help"),
+    ],
+)
+def test_commands_do_not_import_heavy_modules(args):
+    loaded = run_cli(*args).stdout.strip().splitlines()[-1]
+    assert loaded == "LOADED:"
@@ -30,6 +30,24 @@ type ExportSegmentData = {
   text: string;
 };
 
+// Written by the backend's `export --editor-bundle`: integer-ms times in
+// validated order, columns instead of objects, transcript groups precomputed.
+// Words of segment i are words[segments.words[i]..segments.words[i + 1]).
+type EditorBundle = {
+  type: "aerolex-editor-bundle";
+  version: number;
+  groupSize: number;
+  segments: {
+    start: number[];
+    end: number[];
+    score: number[];
+    text: string[];
+    words: number[];
+  };
+  words: { start: number[]; end: number[]; score: number[]; text: string[] };
+  groups: { start: number[]; end: number[]; score: number[]; text: string[] };
+};
+
 type SessionMetadata = {
   mediaFileName: { alias: string; value: string };
   mediaTotalDuration: { alias: string; value: string };
@@ -44,5 +62,6 @@ export type {
   SubtitleNodeData,
   TranscribedData,
   ExportSegmentData,
+  EditorBundle,
   SessionMetadata,
 };
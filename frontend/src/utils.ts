@@ -1,4 +1,5 @@
 import type {
+  EditorBundle,
   ExportSegmentData,
   SubtitleNodeData,
   TranscribedData,
@@ -334,6 +335,70 @@ const subTitleTrackFromSegmentData = (
   return [strack, ttrack];
 };
 
+const isEditorBundle = (data: any): data is EditorBundle => {
+  return data?.type === "aerolex-editor-bundle";
+};
+
+// words [first, last) of an editor bundle, null when there are none, like
+// segments without word timings
+function bundleWords(bundle: EditorBundle, first: number, last: number) {
+  if (first >= last) {
+    return null;
+  }
+  const words = [];
+  for (let j = first; j < last; j++) {
+    words.push({
+      start: bundle.words.start[j],
+      end: bundle.words.end[j],
+      score: bundle.words.score[j],
+      text: bundle.words.text[j],
+    });
+  }
+  return words;
+}
+
+// segments of an editor bundle, times already in ms and in order
+function editorBundleToSegments(bundle: EditorBundle): TranscribedData[] {
+  const { segments } = bundle;
+  return segments.start.map((start, i) => ({
+    start,
+    end: segments.end[i],
+    score: segments.score[i],
+    text: segments.text[i],
+    words: bundleWords(bundle, segments.words[i], segments.words[i + 1]),
+  }));
+}
+
+// Tracks straight from a bundle: no timestamp parsing, order checks or
+// grouping, the backend did all of that when exporting
+const subTitleTrackFromEditorBundle = (
+  bundle: EditorBundle,
+): [SubtitleTrack, SubtitleTrack] => {
+  const strack = new SubtitleTrack();
+  const ttrack = new SubtitleTrack();
+
+  for (let s of editorBundleToSegments(bundle)) {
+    strack.append(segmentToNodeData(s));
+  }
+
+  const { groups, segments, groupSize } = bundle;
+  const count = segments.start.length;
+  for (let g = 0; g < groups.start.length; g++) {
+    const first = segments.words[g * groupSize];
+    const last = segments.words[Math.min((g + 1) * groupSize, count)];
+    ttrack.append(
+      segmentToNodeData({
+        start: groups.start[g],
+        end: groups.end[g],
+        score: groups.score[g],
+        text: groups.text[g],
+        words: bundleWords(bundle, first, last),
+      }),
+    );
+  }
+  return [strack, ttrack];
+};
+
 const formatJSON = (data: ExportSegmentData[]): [string, string] => {
   return [
     JSON.stringify(
@@ -438,7 +503,7 @@ const fileName = (ext: string, transcriptExport: boolean): string => {
 };
 
 const fileParseFn = (fileName: string): any => {
-  let ext = fileName.split(".")[1]; // assuming filename.ext
+  let ext = fileName.split(".").pop(); // filename.ext, or filename.editor.json
   switch (ext) {
     case "json":
       return JSON.parse;
@@ -509,4 +574,7 @@ export {
   SubtitleTrack,
   SubtitleNode,
   subTitleTrackFromSegmentData,
+  isEditorBundle,
+  editorBundleToSegments,
+  subTitleTrackFromEditorBundle,
 };
@@ -8,8 +8,10 @@ import {
   SubtitleNode,
   trackToList,
   exportFormatsFn,
+  editorBundleToSegments,
+  subTitleTrackFromEditorBundle,
 } from "../src/utils";
-import type { TranscribedData } from "../src/types";
+import type { EditorBundle, TranscribedData } from "../src/types";
 
 const lines: TranscribedData[] = [
   {
@@ -74,6 +76,50 @@ describe("subtitle to transcript", () => {
   });
 });
 
+describe("editor bundle", () => {
+  const bundle: EditorBundle = {
+    type: "aerolex-editor-bundle",
+    version: 1,
+    groupSize: 10,
+    segments: {
+      start: [0, 3],
+      end: [3, 6],
+      score: [0.9, 0.7],
+      text: ["abc xyz", "123 456"],
+      words: [0, 2, 4],
+    },
+    words: {
+      start: [0, 1, 3, 4],
+      end: [1, 3, 4, 6],
+      score: [0.9, 0.9, 0.9, 0.9],
+      text: ["abc", "xyz", "123", "456"],
+    },
+    groups: { start: [0], end: [6], score: [0.8], text: ["abc xyz 123 456"] },
+  };
+
+  it("unpacks to the same segments", () => {
+    expect(editorBundleToSegments(bundle)).toStrictEqual(lines);
+  });
+
+  it("builds the same tracks as the segments", () => {
+    const [strack, ttrack] = subTitleTrackFromEditorBundle(bundle);
+    const data = (track: SubtitleTrack) =>
+      Array.from(track.iterate()).map(({ data: { uuid, ...rest } }) => rest);
+    expect(data(strack)).toStrictEqual(
+      lines.map((s) => {
+        const { uuid, ...rest } = segmentToNodeData(s);
+        return rest;
+      }),
+    );
+    expect(data(ttrack)).toStrictEqual(
+      subtitleToTranscriptGroups(lines).map((s) => {
+        const { uuid, ...rest } = segmentToNodeData(s);
+        return rest;
+      }),
+    );
+  });
+});
+
 describe("adding and removing nodes from SubtitleTrack", () => {
   it("Adding and Removing", () => {
     const track = new SubtitleTrack();